@@ -0,0 +1,308 @@
+"""
+개원포화도 HTTP API (Streamlit 없이 포화도 수치 조회)
+
+    uvicorn api_server:app --host 0.0.0.0 --port 8600
+    python api_server.py --port 8600
+
+엔드포인트 (모두 GET):
+  /health                      데이터 버전·결과 저장소 상태
+  /regions                     시도 목록
+  /regions?sido=서울특별시      해당 시도의 시군구 목록
+  /specialties                 진료과목·분자·분모·의료기관 종류 선택지
+  /saturation                  지역·과목별 포화도 표
+  /clinics                     match_key (지역) · 과목의 의원 목록
+
+분석 인자 (/saturation, /clinics 공통 쿼리 파라미터):
+  sido        시도명 (없거나 "전국" 이면 전국 분석 — X-Admin-Password 헤더 필요)
+  sgg         시군구명 (없거나 "전체" 이면 시도 분석)
+  specialty   과목 코드, 쉼표 구분 (기본 01)
+  num / den   분자·분모 컬럼 (기본 총인구수 / clinic_count)
+  year_month  기준 연월 YYYYMM (기본 지난달)
+  cl          의료기관 종별 코드, 쉼표 구분 (기본 31)
+  match_key   /clinics 필수 — /saturation 결과의 match_key
+
+응답 형식: 기본 JSON {"meta": {...}, "rows": [...]}.
+Accept: application/vnd.apache.arrow.stream 또는 ?format=arrow 이면 Arrow IPC 스트림
+(meta 는 스키마 메타데이터 "meta" 에 JSON 으로 포함, pyarrow 필요).
+
+캐시: 결과는 앱과 같은 결과 저장소 디스크 보관 디렉터리(data/cache/results)를 쓰므로
+앱이나 다른 API 프로세스가 이미 계산한 분석은 즉시 응답합니다. 저장소 키에도 데이터 버전이 들어가므로
+DB 재구축(Supabase 는 migrate_to_supabase.py 재적재 — data_version 행 갱신) 후에는
+보관된 이전 결과 대신 다시 계산하고, 이전 ETag 에도 304 를 반환하지 않습니다.
+ETag 는 데이터 버전(modules.analysis.data_version) + 요청 인자로 만들며,
+If-None-Match 가 일치하면 분석 없이 304 를 반환합니다.
+
+분석 실행은 작업 스레드에서 하며 동시 실행 수는 API_WORKERS 로 제한합니다
+(저장소 적중 요청은 제한 없이 처리).
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import anyio
+import pandas as pd
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+ROOT = Path(__file__).parent
+sys.path.insert(0, str(ROOT))
+
+from config import ADMIN_PASSWORD, API_WORKERS, RESULT_STORE_MB  # noqa: E402
+from modules.analysis import (CLINIC_TYPES, DENOMINATORS, NUMERATORS, RESULT_CACHE_DIR,  # noqa: E402
+                              SPECIALTY_SELECT, build_result, clinics_in, data_version,
+                              default_year_month, result_key)
+from modules.hospital_api import HIRA_SIDO_CODES  # noqa: E402
+from modules.population_api import SIDO_CODES, PopulationAPIClient  # noqa: E402
+from modules.result_store import ResultStore  # noqa: E402
+
+ARROW_MIME = "application/vnd.apache.arrow.stream"
+
+# 의원 목록 응답 컬럼 (있는 것만)
+CLINIC_COLUMNS = ["ykiho", "yadmNm", "clCd", "clCdNm", "specialty_cd", "specialty_nm", "addr",
+                  "mdeptSdrCnt", "drTotCnt", "estbDd", "XPos", "YPos", "match_key"]
+
+_store = ResultStore(RESULT_STORE_MB * 1024 * 1024, ttl=3600, persist_dir=RESULT_CACHE_DIR)
+# 새 분석(DataMerger 실행) 동시 실행 수 — 저장소 적중은 이 제한을 거치지 않음
+_compute_limiter = anyio.CapacityLimiter(API_WORKERS)
+_sgg_cache: dict[tuple[str, str], dict[str, str]] = {}
+_sgg_lock = threading.Lock()  # 작업 스레드 간 _sgg_cache 조회·교체 (같은 시도 동시 미스는 한 번만 조회)
+
+
+class APIError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 인자 해석
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _csv(value: str | None, default: tuple[str, ...]) -> tuple[str, ...]:
+    items = tuple(dict.fromkeys(v.strip() for v in (value or "").split(",") if v.strip()))
+    return items or default
+
+
+def _sgg_options(sido_name: str) -> dict[str, str]:
+    """시군구명 → 인구 행정코드 (데이터 버전별 캐시, 작업 스레드에서 호출)"""
+    version = data_version()
+    key = (sido_name, version)
+    with _sgg_lock:
+        if key not in _sgg_cache:
+            df = PopulationAPIClient().get_sgg_list(SIDO_CODES[sido_name])
+            for old in [k for k in _sgg_cache if k[1] != version]:
+                del _sgg_cache[old]
+            _sgg_cache[key] = dict(zip(df["sggNm"], df["admmCd"])) if not df.empty else {}
+        return _sgg_cache[key]
+
+
+def _analysis_params(request: Request) -> tuple:
+    """쿼리 파라미터 → 앱과 같은 params 튜플 (같은 인자면 같은 결과 키)"""
+    q = request.query_params
+    sido_name = q.get("sido") or "전국"
+    sgg_name = q.get("sgg") or "전체"
+    sp_codes = _csv(q.get("specialty"), ("01",))
+    num_col = q.get("num") or NUMERATORS["총 인구수"]
+    den_col = q.get("den") or DENOMINATORS["의원 수"]
+    year_month = q.get("year_month") or default_year_month()
+    cl_codes = _csv(q.get("cl"), (CLINIC_TYPES["의원"],))
+
+    unknown = [c for c in sp_codes if c not in SPECIALTY_SELECT.values()]
+    if unknown:
+        raise APIError(400, f"알 수 없는 과목 코드: {', '.join(unknown)}")
+    if num_col not in NUMERATORS.values():
+        raise APIError(400, f"num 은 {', '.join(NUMERATORS.values())} 중 하나여야 합니다")
+    if den_col not in DENOMINATORS.values():
+        raise APIError(400, f"den 은 {', '.join(DENOMINATORS.values())} 중 하나여야 합니다")
+    if len(year_month) != 6 or not year_month.isdigit():
+        raise APIError(400, "year_month 는 YYYYMM 형식이어야 합니다")
+
+    if sido_name == "전국":
+        if request.headers.get("x-admin-password") != ADMIN_PASSWORD:
+            raise APIError(403, "전국 분석은 X-Admin-Password 헤더가 필요합니다")
+        return ("0000000000", "", "전체", sp_codes, year_month, num_col, den_col, "national", cl_codes)
+    if sido_name not in SIDO_CODES:
+        raise APIError(404, f"알 수 없는 시도: {sido_name}")
+    hira_sido = HIRA_SIDO_CODES.get(sido_name, "")
+    sgg_opts = _sgg_options(sido_name)
+    if sgg_name == "전체" or not sgg_opts:
+        return (SIDO_CODES[sido_name], hira_sido, "전체", sp_codes, year_month, num_col, den_col, "sido", cl_codes)
+    if sgg_name not in sgg_opts:
+        raise APIError(404, f"알 수 없는 시군구: {sido_name} {sgg_name}")
+    return (sgg_opts[sgg_name], hira_sido, sgg_name, sp_codes, year_month, num_col, den_col, "dong", cl_codes)
+
+
+def _get_result(params: tuple) -> dict:
+    """저장소(메모리 → 디스크) 조회, 없으면 계산 — 블로킹, 작업 스레드에서 호출"""
+    # 시도·전국은 앱의 백그라운드 작업과 같이 디스크에도 보관
+    return build_result(_store, params, persist=params[7] != "dong")
+
+
+async def _result(params: tuple) -> dict:
+    res = await run_in_threadpool(_store.get, result_key(params))
+    if res is None:
+        res = await anyio.to_thread.run_sync(_get_result, params, limiter=_compute_limiter)
+    return res
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 응답 (JSON / Arrow, ETag)
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _wants_arrow(request: Request) -> bool:
+    fmt = request.query_params.get("format")
+    if fmt:
+        return fmt == "arrow"
+    return ARROW_MIME in request.headers.get("accept", "")
+
+
+def _etag(request: Request, *parts) -> str:
+    """데이터 버전 + 경로 + 응답 형식 + 요청 인자 (parts 없으면 쿼리 문자열)"""
+    if not parts:
+        parts = tuple(sorted((k, v) for k, v in request.query_params.multi_items() if k != "format"))
+    raw = json.dumps([data_version(), request.url.path, _wants_arrow(request), parts],
+                     ensure_ascii=False, default=list)
+    return f'"{hashlib.md5(raw.encode()).hexdigest()}"'
+
+
+def _not_modified(request: Request, etag: str) -> Response | None:
+    inm = request.headers.get("if-none-match", "")
+    if etag in (t.strip() for t in inm.split(",")) or inm.strip() == "*":
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
+
+
+def _arrow_bytes(df: pd.DataFrame, meta: dict) -> bytes:
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise APIError(406, "Arrow 응답에는 pyarrow 가 필요합니다 (pip install pyarrow)")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                           b"meta": json.dumps(meta, ensure_ascii=False, default=str).encode()})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _table_response(request: Request, df: pd.DataFrame, meta: dict, etag: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _wants_arrow(request):
+        return Response(_arrow_bytes(df, meta), media_type=ARROW_MIME, headers=headers)
+    body = '{"meta": %s, "rows": %s}' % (json.dumps(meta, ensure_ascii=False, default=str),
+                                         df.to_json(orient="records", force_ascii=False))
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def _meta(params: tuple, res: dict, **extra) -> dict:
+    sgg_cd_pop, hira_sido, sgg_name, sp_codes, year_month, num_col, den_col, level, cl_codes = params
+    return {"data_version": data_version(), "analysis_level": level, "sgg_cd_pop": sgg_cd_pop,
+            "sgg_name": sgg_name, "specialties": list(sp_codes), "num": num_col, "den": den_col,
+            "year_month": year_month, "used_year_month": res.get("used_year_month", year_month),
+            "cl": list(cl_codes), **extra}
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 엔드포인트
+# ══════════════════════════════════════════════════════════════════════════════
+
+async def health(request: Request) -> Response:
+    return JSONResponse({"status": "ok", "data_version": data_version(), "store": _store.stats()})
+
+
+async def regions(request: Request) -> Response:
+    etag = _etag(request)
+    if (r := _not_modified(request, etag)) is not None:
+        return r
+    sido_name = request.query_params.get("sido")
+    if not sido_name:
+        df = pd.DataFrame([{"sido_nm": nm, "sido_cd": cd, "hira_sido_cd": HIRA_SIDO_CODES.get(nm, "")}
+                           for nm, cd in SIDO_CODES.items()])
+    else:
+        if sido_name not in SIDO_CODES:
+            raise APIError(404, f"알 수 없는 시도: {sido_name}")
+        opts = await run_in_threadpool(_sgg_options, sido_name)
+        df = pd.DataFrame({"sgg_nm": list(opts), "sgg_cd": list(opts.values())})
+    return _table_response(request, df, {"data_version": data_version(), "sido": sido_name}, etag)
+
+
+async def specialties(request: Request) -> Response:
+    etag = _etag(request)
+    if (r := _not_modified(request, etag)) is not None:
+        return r
+    df = pd.DataFrame({"specialty_nm": list(SPECIALTY_SELECT), "specialty_cd": list(SPECIALTY_SELECT.values())})
+    meta = {"data_version": data_version(), "numerators": NUMERATORS, "denominators": DENOMINATORS,
+            "clinic_types": CLINIC_TYPES}
+    return _table_response(request, df, meta, etag)
+
+
+async def saturation(request: Request) -> Response:
+    params = await run_in_threadpool(_analysis_params, request)
+    etag = _etag(request, params)  # 해석된 인자 기준 (기본 연월이 바뀌면 ETag 도 바뀜)
+    if (r := _not_modified(request, etag)) is not None:
+        return r
+    t = time.perf_counter()
+    res = await _result(params)
+    frames = []
+    for sp_cd in params[3]:
+        df = res["saturation"].get(sp_cd)
+        if df is not None:
+            frames.append(df.assign(specialty_cd=sp_cd))
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    return _table_response(request, df, _meta(params, res, seconds=round(time.perf_counter() - t, 4)), etag)
+
+
+async def clinics(request: Request) -> Response:
+    match_key = request.query_params.get("match_key")
+    if not match_key:
+        raise APIError(400, "match_key 가 필요합니다 (/saturation 결과의 match_key)")
+    params = await run_in_threadpool(_analysis_params, request)
+    etag = _etag(request, params, match_key)
+    if (r := _not_modified(request, etag)) is not None:
+        return r
+    res = await _result(params)
+    hosp_df = res["hospitals"]
+    frames = [clinics_in(hosp_df, res["hospital_index"], match_key, sp_cd) for sp_cd in params[3]]
+    df = pd.concat(frames, ignore_index=True) if frames else hosp_df.iloc[0:0]
+    df = df[[c for c in CLINIC_COLUMNS if c in df.columns]]
+    return _table_response(request, df, _meta(params, res, match_key=match_key), etag)
+
+
+async def _api_error(request: Request, exc: APIError) -> Response:
+    return JSONResponse({"error": exc.message}, status_code=exc.status)
+
+
+app = Starlette(
+    routes=[
+        Route("/health", health),
+        Route("/regions", regions),
+        Route("/specialties", specialties),
+        Route("/saturation", saturation),
+        Route("/clinics", clinics),
+    ],
+    exception_handlers={APIError: _api_error},
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="개원포화도 HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,52 +3,37 @@
 streamlit run app.py
 """
 
+from __future__ import annotations
+
+import hashlib
+import importlib
 import json
 import sys
+import time
 import traceback
-from datetime import datetime, timedelta
 from pathlib import Path
 from urllib.parse import quote
 
-import geopandas as gpd
+import numpy as np
 import pandas as pd
-import plotly.graph_objects as go
 import streamlit as st
 
 ROOT = Path(__file__).parent
 sys.path.insert(0, str(ROOT))
 
-from config import ADMIN_PASSWORD
-from modules.data_merge import (
-    DataMerger,
-    calc_saturation_index,
-    merge_with_population,
-)
+from config import ADMIN_PASSWORD, JOB_WORKERS, RESULT_STORE_MB
 from modules.hospital_api import HIRA_SIDO_CODES, SPECIALTY_CODES as _SP_ALL
 from modules.population_api import SIDO_CODES, PopulationAPIClient
+from modules.jobs import JOB_STAGES, JobQueue
+from modules.result_store import ResultStore
+from modules.analysis import (GEOJSON_PATH, NUMERATORS, RESULT_CACHE_DIR, SPECIALTY_SELECT,
+                              build_result, clinics_in, default_year_month, frame_fingerprint,
+                              result_key, standardize_code)
 
 # ══════════════════════════════════════════════════════════════════════════════
 # 상수 및 설정
 # ══════════════════════════════════════════════════════════════════════════════
 
-_NATIONAL_GEOJSON = ROOT / "data" / "geojson" / "national_dong.geojson"
-_SEOUL_GEOJSON    = ROOT / "data" / "geojson" / "seoul_dong.geojson"
-GEOJSON_PATH = _NATIONAL_GEOJSON if _NATIONAL_GEOJSON.exists() else _SEOUL_GEOJSON
-
-SPECIALTY_SELECT: dict[str, str] = {
-    # ── 의과 ─────────────────────────────────────────────────────────────────
-    "내과":              "01", "신경과":              "02", "정신건강의학과":    "03",
-    "외과":              "04", "정형외과":            "05", "신경외과":          "06",
-    "흉부외과":          "07", "성형외과":            "08", "마취통증의학과":    "09",
-    "산부인과":          "10", "소아청소년과":        "11", "안과":              "12",
-    "이비인후과":        "13", "피부과":              "14", "비뇨의학과":        "15",
-    "영상의학과":        "16", "재활의학과":          "21", "가정의학과":        "23",
-    "응급의학과":        "24", "직업환경의학과":      "25",
-    # ── 치과 ─────────────────────────────────────────────────────────────────
-    "치과":              "49", "치과교정과":          "52", "소아치과":          "53",
-    "치주과":            "54", "치과보존과":          "55", "통합치의학과":      "61",
-}
-
 LEVEL_COLOR = {
     "포화": "#DC2626", "보통": "#D97706", "여유": "#16A34A", "데이터없음": "#9CA3AF",
 }
@@ -56,75 +41,41 @@ LEVEL_COLOR = {
 st.set_page_config(page_title="개원포화도 분석", page_icon="🏥", layout="wide", initial_sidebar_state="expanded")
 
 # ══════════════════════════════════════════════════════════════════════════════
-# CSS (아이콘 보정 포함)
+# 지연 임포트 — GIS·차트 라이브러리는 처음 쓸 때 로드 (사이드바가 먼저 그려지도록)
 # ══════════════════════════════════════════════════════════════════════════════
 
-st.markdown("""
-<style>
-@import url('https://fonts.googleapis.com/css2?family=Noto+Sans+KR:wght@300;400;500;600;700&display=swap');
-html, body, [class*="css"], [class*="st-"] { font-family: 'Noto Sans KR', sans-serif !important; color: #1F2937; }
-section[data-testid="stSidebar"] > div { background: #F9FAFB; padding-top: 1.2rem; }
-[data-testid="stMetric"] { background: #FFFFFF; border: 1.5px solid #E5E7EB; border-radius: 14px; padding: 18px 22px !important; }
-.chart-card { background: #FFFFFF; border: 1.5px solid #E5E7EB; border-radius: 14px; padding: 16px 20px; margin-bottom: 12px; }
-.chart-title { font-size: 13px; font-weight: 600; color: #374151; margin-bottom: 10px; border-left: 3px solid #2563EB; padding-left: 8px; }
-@import url('https://fonts.googleapis.com/variablefonts/materialsymbolsoutlined');
-.material-symbols-outlined, [data-testid="stIconMaterial"] { font-family: 'Material Symbols Outlined' !important; -webkit-font-feature-settings: 'liga'; }
-/* ── 초록 계열 버튼 테마 ── */
-[data-testid="stBaseButton-primary"],
-[data-testid="stBaseButton-primary"] * {
-    background-color: #16A34A !important;
-    border-color: #16A34A !important;
-    color: #FFFFFF !important;
-}
-[data-testid="stBaseButton-primary"]:hover,
-[data-testid="stBaseButton-primary"]:hover * {
-    background-color: #15803D !important;
-    border-color: #15803D !important;
-    color: #FFFFFF !important;
-}
-[data-testid="stBaseButton-primary"]:active,
-[data-testid="stBaseButton-primary"]:active * {
-    background-color: #166534 !important;
-    border-color: #166534 !important;
-    color: #FFFFFF !important;
-}
-/* multiselect 선택 태그 */
-[data-testid="stMultiSelect"] [data-baseweb="tag"] {
-    background-color: #16A34A !important;
-}
-/* link button (네이버 지도 등) */
-[data-testid="stLinkButton"] a,
-[data-testid="stLinkButton"] a * {
-    background-color: #16A34A !important;
-    border-color: #16A34A !important;
-    color: #FFFFFF !important;
-}
-[data-testid="stLinkButton"] a:hover,
-[data-testid="stLinkButton"] a:hover * {
-    background-color: #15803D !important;
-    border-color: #15803D !important;
-    color: #FFFFFF !important;
-}
-</style>
-""", unsafe_allow_html=True)
+@st.cache_resource
+def _import_report() -> dict:
+    """프로세스별 지연 임포트 비용: 모듈명 → (초, 새로 로드된 모듈 수)"""
+    return {}
+
+def _lazy_import(name: str):
+    mod = sys.modules.get(name)
+    if mod is None:
+        n_before = len(sys.modules)
+        t0 = time.perf_counter()
+        mod = importlib.import_module(name)
+        _import_report()[name] = (time.perf_counter() - t0, len(sys.modules) - n_before)
+    return mod
+
+def _gpd():
+    return _lazy_import("geopandas")
+
+def _go():
+    return _lazy_import("plotly.graph_objects")
+
+def _data_merge():
+    return _lazy_import("modules.data_merge")
 
 # ══════════════════════════════════════════════════════════════════════════════
 # 헬퍼 함수
 # ══════════════════════════════════════════════════════════════════════════════
 
-def _standardize_code(code: str) -> str:
-    if not code: return code
-    s = str(code)
-    if s.startswith("41000"): return "36" + s[5:]
-    if s.startswith("42"): return "51" + s[2:]
-    if s.startswith("45"): return "52" + s[2:]
-    return s
-
 @st.cache_resource
 def _load_geojson() -> dict:
     with open(GEOJSON_PATH, encoding="utf-8") as f: gj = json.load(f)
     for f in gj["features"]:
-        f["properties"]["adm_cd2"] = _standardize_code(f["properties"].get("adm_cd2"))
+        f["properties"]["adm_cd2"] = standardize_code(f["properties"].get("adm_cd2"))
     return gj
 
 @st.cache_data(ttl=86400, show_spinner=False)
@@ -135,45 +86,179 @@ def _get_sgg_options(sido_name: str) -> dict[str, str]:
     df = client.get_sgg_list(sido_cd)
     return dict(zip(df["sggNm"], df["admmCd"])) if not df.empty else {}
 
-@st.cache_data(ttl=3600, show_spinner=False)
-def _load_data(sgg_cd_pop, hira_sido_cd, sgg_name, specialty_codes, year_month, num_col, den_col, analysis_level="dong", cl_codes=None) -> dict:
-    merger = DataMerger(GEOJSON_PATH)
-    res = merger.run(sgg_cd_pop=sgg_cd_pop, hira_sido_cd=hira_sido_cd, sgg_name=sgg_name, specialty_codes=list(specialty_codes),
-                     year_month=year_month, num_col=num_col, den_col=den_col, analysis_level=analysis_level, cl_codes=list(cl_codes) if cl_codes else None)
+# ── 공용 결과 저장소 ─────────────────────────────────────────────────────────
+# 결과는 프로세스에 한 벌만 두고 session_state 에는 키만 보관 (세션 수만큼 복사되지 않음)
+
+def _session_id() -> str:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else "local"
+
+def _session_alive(session_id: str) -> bool:
+    try:
+        from streamlit.runtime import Runtime
+        return Runtime.instance().is_active_session(session_id)
+    except Exception:
+        return True
+
+@st.cache_resource
+def _result_store() -> ResultStore:
+    return ResultStore(RESULT_STORE_MB * 1024 * 1024, ttl=3600, is_alive=_session_alive,
+                       persist_dir=RESULT_CACHE_DIR)
+
+def _build_result(store: ResultStore, params: tuple, progress=None, persist: bool = False) -> dict:
+    """저장소에 없으면 load_data 로 계산해 저장 (스크립트 밖 작업 스레드에서도 호출됨)"""
+    _data_merge()
+    if params[7] in ["national", "sido"]: _gpd()  # 지연 임포트 비용 기록
+    return build_result(store, params, geojson_path=GEOJSON_PATH, progress=progress, persist=persist)
+
+def _get_result(params: tuple) -> tuple[str, dict]:
+    """load_data 인자 → (결과 키, 공유 결과). 같은 인자는 세션 간에 같은 객체를 반환."""
+    key = result_key(params)
+    store = _result_store()
+    res = _build_result(store, params)
+    session_id = _session_id()
+    prev_key = st.session_state.get("result_key")
+    if prev_key and prev_key != key:
+        store.release(prev_key, session_id)
+    store.acquire(key, session_id)
+    return key, res
+
+# ── 백그라운드 작업 (전국 분석) ───────────────────────────────────────────────
+# 세션 스크립트를 막지 않고 작업 스레드에서 실행 → 결과는 저장소(디스크 포함)에 기록되어
+# 새로고침·재접속한 세션도 같은 분석을 요청하면 즉시 조회
+
+_BACKGROUND_LEVELS = {"national"}
+_STAGE_LABELS = {
+    "population": "인구 집계", "hospitals": "병의원 조회", "mapping": "공간 매핑",
+    "indices": "지수 산출", "geometry": "경계 병합",
+}
 
-    if res["population"].empty:
+@st.cache_resource
+def _job_queue() -> JobQueue:
+    return JobQueue(max_workers=JOB_WORKERS)
+
+def _submit_job(params: tuple) -> str:
+    store = _result_store()
+    _data_merge(); _gpd()  # 임포트는 스크립트 스레드에서 (지연 임포트 비용 기록)
+    return _job_queue().submit(result_key(params),
+                               lambda progress: _build_result(store, params, progress, persist=True))
+
+@st.fragment(run_every=1.0)
+def _render_job_progress(job_id: str) -> None:
+    job = _job_queue().get(job_id)
+    if job is None or job["status"] == "done":
+        # 완료(또는 기록 정리됨) → 저장소에서 결과를 받아 전체 화면 갱신
+        st.session_state.pop("job_id", None)
         try:
-            curr_dt = datetime.strptime(year_month, "%Y%m")
-            prev_month = (curr_dt.replace(day=1) - timedelta(days=1)).strftime("%Y%m")
-            res = merger.run(sgg_cd_pop=sgg_cd_pop, hira_sido_cd=hira_sido_cd, sgg_name=sgg_name, specialty_codes=list(specialty_codes),
-                             year_month=prev_month, num_col=num_col, den_col=den_col, analysis_level=analysis_level, cl_codes=list(cl_codes) if cl_codes else None)
-            res["used_year_month"] = prev_month
-        except: pass
-    else: res["used_year_month"] = year_month
-    
-    if analysis_level in ["national", "sido"]:
-        gdf = gpd.read_file(GEOJSON_PATH)
-        gdf["adm_cd2"] = gdf["adm_cd2"].apply(_standardize_code)
-        if analysis_level == "national": gdf["dissolve_key"] = gdf["adm_cd2"].str[:2]
-        else:
-            prefix = sgg_cd_pop[:2]
-            sgg_codes = res.get("sgg_codes", set())
-            def _mk(adm_cd: str) -> str:
-                c = adm_cd[:4] + "0"
-                return c if c in sgg_codes else adm_cd[:5]
-            gdf["dissolve_key"] = gdf["adm_cd2"].apply(_mk)
-            gdf = gdf[gdf["dissolve_key"].str.startswith(prefix)].copy()
-        dissolved = gdf.dissolve(by="dissolve_key").reset_index()
-        dissolved["adm_cd2"] = dissolved["dissolve_key"]
-        res["geojson_dissolved"] = json.loads(dissolved.to_json())
-    return res
+            result_key, _ = _get_result(st.session_state["result_params"])
+            st.session_state["result_key"] = result_key
+        except Exception as e:
+            st.error(f"⚠️ 분석 오류: {e}")
+            return
+        st.rerun()
+    if job["status"] == "failed":
+        st.session_state.pop("job_id", None)
+        st.error("⚠️ 분석 오류: 백그라운드 작업이 실패했습니다.")
+        with st.expander("🚨 상세 오류 로그 (개발자 확인용)"):
+            st.code(job["error"])
+        return
+
+    elapsed = time.time() - (job["started"] or job["submitted"])
+    st.markdown("#### ⏳ 전국 분석 진행 중")
+    st.caption(f"{'대기 중' if job['status'] == 'queued' else '실행 중'} · {elapsed:,.0f}초 경과 · "
+               "창을 닫거나 새로고침해도 작업은 계속되며, 같은 조건으로 다시 실행하면 결과를 바로 불러옵니다.")
+    for stage in JOB_STAGES:
+        frac = job["stages"][stage]
+        st.progress(frac, text=f"{_STAGE_LABELS[stage]} — {frac * 100:.0f}%")
+
+# 지도로 보내는 경계 좌표 소수 자릿수 (5자리 ≈ 1.1 m)
+_GEO_PRECISION = 5
+
+def _round_coords(coords, ndigits: int):
+    if coords and isinstance(coords[0], (int, float)):
+        return [round(coords[0], ndigits), round(coords[1], ndigits)]
+    return [_round_coords(c, ndigits) for c in coords]
+
+def _compact_feature(code: str, feature: dict) -> dict:
+    """Plotly 전송용 feature: adm_cd2 속성만 남기고 좌표 반올림"""
+    geom = feature.get("geometry") or {}
+    return {
+        "type": "Feature",
+        "properties": {"adm_cd2": code},
+        "geometry": {"type": geom.get("type"),
+                     "coordinates": _round_coords(geom.get("coordinates", []), _GEO_PRECISION)},
+    }
+
+def _json_bytes(obj) -> int:
+    return len(json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode())
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _region_layer(geo_key: str, codes: tuple, _geojson: dict) -> dict:
+    """
+    분석 대상 지역의 (경량화된) feature 부분집합·코드별 feature·지도 중심을 1회만 계산.
+    geo_key: 경계 데이터 식별자 ("base" 또는 dissolve 결과 해시), codes: 정렬된 지역 코드
+    payload_bytes: 경계 데이터 JSON 크기 (원본, 경량화 후)
+    """
+    code_set = set(codes)
+    source = [f for f in _geojson["features"] if f["properties"].get("adm_cd2") in code_set]
+    by_code = {f["properties"]["adm_cd2"]: _compact_feature(f["properties"]["adm_cd2"], f) for f in source}
+    compact = {"type": "FeatureCollection", "features": list(by_code.values())}
+    try:
+        c = _gpd().GeoDataFrame.from_features(compact["features"]).geometry.centroid
+        center = (float(c.y.mean()), float(c.x.mean()))
+    except:
+        center = (36.5, 127.5)
+    return {
+        "all": compact,
+        "by_code": by_code,
+        "center": center,
+        "payload_bytes": (_json_bytes({"type": "FeatureCollection", "features": source}), _json_bytes(compact)),
+    }
+
+def _map_payload_bytes(si_df: pd.DataFrame, geojson: dict, geo_key: str) -> tuple[int, int]:
+    """디버그용: 현재 지도 경계 데이터 전송량 (원본, 경량화 후)"""
+    loc_col = "match_key" if "match_key" in si_df.columns else "admmCd"
+    codes = tuple(sorted(set(si_df[loc_col].dropna().astype(str))))
+    return _region_layer(geo_key, codes, geojson)["payload_bytes"]
+
+# ── 의원 위치 클러스터 ────────────────────────────────────────────────────────
+# 분석 레벨별 지도 배율·격자 크기(도). 점이 _CLUSTER_EXPAND_MAX개 이하면 클러스터 없이 개별 핀.
+_MAP_ZOOM     = {"dong": 10, "sido": 8, "national": 6}
+_CLUSTER_CELL = {"dong": 0.005, "sido": 0.03, "national": 0.2}
+_CLUSTER_EXPAND_MAX = 50
+
+def _cluster_markers(markers: pd.DataFrame, cell_deg: float) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    의원 좌표를 격자 셀 단위로 집계 → (개별 핀 DataFrame, 클러스터 DataFrame[lat, lon, count])
+    셀에 1곳만 있거나 전체가 _CLUSTER_EXPAND_MAX 이하이면 개별 핀으로 남깁니다.
+    """
+    empty = pd.DataFrame(columns=["lat", "lon", "count"])
+    if len(markers) <= _CLUSTER_EXPAND_MAX:
+        return markers, empty
+    cell = pd.DataFrame({
+        "gx": np.floor(markers["XPos"].to_numpy(dtype=float) / cell_deg).astype("int64"),
+        "gy": np.floor(markers["YPos"].to_numpy(dtype=float) / cell_deg).astype("int64"),
+    }, index=markers.index)
+    size = cell.groupby(["gx", "gy"])["gx"].transform("size")
+    singles = markers[size == 1]
+    multi = markers[size > 1].assign(gx=cell["gx"], gy=cell["gy"])
+    if multi.empty:
+        return singles, empty
+    clusters = multi.groupby(["gx", "gy"]).agg(
+        lat=("YPos", "mean"), lon=("XPos", "mean"), count=("YPos", "size"),
+    ).reset_index(drop=True)
+    return singles, clusters
 
 def _make_choropleth(si_df: pd.DataFrame, geojson: dict,
                      hospital_markers: pd.DataFrame | None = None,
-                     selected_key: str = "") -> go.Figure:
+                     selected_key: str = "", geo_key: str = "base",
+                     analysis_level: str = "dong") -> go.Figure:
+    go = _go()
     loc_col = "match_key" if "match_key" in si_df.columns else "admmCd"
-    codes = set(si_df[loc_col].dropna().astype(str))
-    gj_filtered = {"type": "FeatureCollection", "features": [f for f in geojson["features"] if f["properties"].get("adm_cd2") in codes]}
+    codes = tuple(sorted(set(si_df[loc_col].dropna().astype(str))))
+    layer = _region_layer(geo_key, codes, geojson)
+    gj_filtered = layer["all"]
 
     # saturation_level → 이산 z값 (막대그래프와 동일한 색 체계)
     _LEVEL_Z = {"포화": 0, "보통": 1, "여유": 2, "데이터없음": 3}
@@ -186,26 +271,32 @@ def _make_choropleth(si_df: pd.DataFrame, geojson: dict,
 
     df = si_df.copy()
     df["_z"] = df["saturation_level"].map(_LEVEL_Z).fillna(3)
-    df["_hover_si"] = df.apply(lambda row: "기회 최대" if row["clinic_count"] == 0 and row["총인구수"] > 0
-                               else (f"{row['SI_normalized']:.2f}" if pd.notna(row['SI_normalized']) else "데이터없음"), axis=1)
-    df["_hover_pop"] = df["총인구수"].apply(lambda x: f"{int(x):,}" if pd.notna(x) else "N/A") if "총인구수" in df.columns else "N/A"
-    df["_hover_hh"]  = df["세대수"].apply(lambda x: f"{int(x):,}" if pd.notna(x) else "N/A") if "세대수" in df.columns else "N/A"
-
-    has_income = "income_grade" in df.columns
-    custom_cols = ["행정동명", "_hover_si", "saturation_level", "clinic_count", "specialist_count", "_hover_pop", "_hover_hh"]
+    locations = df[loc_col].astype(str)
+
+    # 숫자는 customdata(실수 배열)로 보내고 서식은 hovertemplate 에서 처리.
+    # 조건부 문구(기회 최대·등급·소득등급)만 hovertext 문자열로 전달
+    num_cols = ["clinic_count", "specialist_count", "총인구수", "세대수"]
+    customdata = np.column_stack([
+        pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=float) if c in df.columns
+        else np.full(len(df), np.nan)
+        for c in num_cols
+    ])
+    si_label = np.select(
+        [(df["clinic_count"] == 0) & (df["총인구수"] > 0), df["SI_normalized"].notna()],
+        ["기회 최대", df["SI_normalized"].map("{:.2f}".format)],
+        default="데이터없음",
+    )
+    hovertext = pd.Series(si_label, index=df.index) + "&nbsp;&nbsp;등급: " + df["saturation_level"].astype(str)
+    if "income_grade" in df.columns:
+        grade = df["income_grade"].where(df["income_grade"].notna() & (df["income_grade"] != ""), "미산출")
+        hovertext = hovertext + "<br>개비공 소득지수: " + grade.astype(str)
     hover_tmpl = (
-        "<b>%{customdata[0]}</b><br>"
-        "포화도 지수: %{customdata[1]}&nbsp;&nbsp;등급: %{customdata[2]}<br>"
-        "의원 수: %{customdata[3]}개&nbsp;&nbsp;전문의 수: %{customdata[4]}명<br>"
-        "총 인구수: %{customdata[5]}명&nbsp;&nbsp;세대수: %{customdata[6]}세대"
+        "<b>%{text}</b><br>"
+        "포화도 지수: %{hovertext}<br>"
+        "의원 수: %{customdata[0]:,.0f}개&nbsp;&nbsp;전문의 수: %{customdata[1]:,.0f}명<br>"
+        "총 인구수: %{customdata[2]:,.0f}명&nbsp;&nbsp;세대수: %{customdata[3]:,.0f}세대"
+        "<extra></extra>"
     )
-    if has_income:
-        df["_hover_income"] = df["income_grade"].apply(
-            lambda x: str(x) if pd.notna(x) and x else "미산출"
-        )
-        custom_cols.append("_hover_income")
-        hover_tmpl += "<br>개비공 소득지수: %{customdata[7]}"
-    hover_tmpl += "<extra></extra>"
 
     _colorbar = dict(
         tickvals=[0.375, 1.125, 1.875, 2.625],
@@ -213,86 +304,82 @@ def _make_choropleth(si_df: pd.DataFrame, geojson: dict,
         title="등급", thickness=14, len=0.5,
     )
 
-    if selected_key:
-        # 레이어 1: 전체 행정동 흐리게 (배경 — 클릭 가능)
-        fig = go.Figure(go.Choroplethmapbox(
-            geojson=gj_filtered, featureidkey="properties.adm_cd2",
-            locations=df[loc_col].astype(str), z=df["_z"],
+    def _layer(mask, gj: dict, opacity: float, line_width: float, showscale: bool) -> go.Choroplethmapbox:
+        return go.Choroplethmapbox(
+            geojson=gj, featureidkey="properties.adm_cd2",
+            locations=locations[mask], z=df["_z"][mask],
             colorscale=_DISCRETE_CS, zmin=0, zmax=3,
             colorbar=_colorbar,
-            marker_opacity=0.2, marker_line_width=0.8, marker_line_color="#FFFFFF",
-            customdata=df[custom_cols].values,
+            marker_opacity=opacity, marker_line_width=line_width, marker_line_color="#FFFFFF",
+            text=df["행정동명"][mask], hovertext=hovertext[mask], customdata=customdata[mask.to_numpy()],
             hovertemplate=hover_tmpl,
-            showscale=False,
-        ))
+            showscale=showscale,
+        )
+
+    everything = pd.Series(True, index=df.index)
+    if selected_key:
+        # 레이어 1: 전체 행정동 흐리게 (배경 — 클릭 가능)
+        fig = go.Figure(_layer(everything, gj_filtered, 0.2, 0.8, False))
         # 레이어 2: 선택된 행정동만 선명하게 (위에 덧그림)
-        df_sel = df[df[loc_col].astype(str) == selected_key]
-        gj_sel = {
-            "type": "FeatureCollection",
-            "features": [f for f in gj_filtered["features"]
-                         if f["properties"].get("adm_cd2") == selected_key],
-        }
-        if not df_sel.empty:
-            fig.add_trace(go.Choroplethmapbox(
-                geojson=gj_sel, featureidkey="properties.adm_cd2",
-                locations=df_sel[loc_col].astype(str), z=df_sel["_z"],
-                colorscale=_DISCRETE_CS, zmin=0, zmax=3,
-                colorbar=_colorbar,
-                marker_opacity=0.88, marker_line_width=2.5, marker_line_color="#FFFFFF",
-                customdata=df_sel[custom_cols].values,
-                hovertemplate=hover_tmpl,
-                showscale=True,
-            ))
+        sel_mask = locations == selected_key
+        sel_feature = layer["by_code"].get(selected_key)
+        gj_sel = {"type": "FeatureCollection", "features": [sel_feature] if sel_feature else []}
+        if sel_mask.any():
+            fig.add_trace(_layer(sel_mask, gj_sel, 0.88, 2.5, True))
     else:
         # 선택 없음: 전체 행정동 일반 표시
-        fig = go.Figure(go.Choroplethmapbox(
-            geojson=gj_filtered, featureidkey="properties.adm_cd2",
-            locations=df[loc_col].astype(str), z=df["_z"],
-            colorscale=_DISCRETE_CS, zmin=0, zmax=3,
-            colorbar=_colorbar,
-            marker_opacity=0.78, marker_line_width=1.2, marker_line_color="#FFFFFF",
-            customdata=df[custom_cols].values,
-            hovertemplate=hover_tmpl,
-            showscale=True,
-        ))
+        fig = go.Figure(_layer(everything, gj_filtered, 0.78, 1.2, True))
 
-    try:
-        gdf_tmp = gpd.GeoDataFrame.from_features(gj_filtered["features"])
-        c = gdf_tmp.geometry.centroid
-        lat, lon = float(c.y.mean()), float(c.x.mean())
-    except:
-        lat, lon = 36.5, 127.5
+    lat, lon = layer["center"]
 
     fig.update_layout(
-        mapbox=dict(style="carto-positron", zoom=10, center=dict(lat=lat, lon=lon), uirevision="map-view"),
+        mapbox=dict(style="carto-positron", zoom=_MAP_ZOOM.get(analysis_level, 10),
+                    center=dict(lat=lat, lon=lon), uirevision="map-view"),
         margin=dict(r=0, t=0, l=0, b=0),
         height=530,
         clickmode="event+select",
     )
 
-    # 의원 위치 핀 (핀 모양)
+    # 의원 위치: 밀집 구역은 격자 클러스터(개수 표시), 나머지는 개별 핀
     if hospital_markers is not None and not hospital_markers.empty:
-        fig.add_trace(go.Scattermapbox(
-            lat=hospital_markers["YPos"].tolist(),
-            lon=hospital_markers["XPos"].tolist(),
-            mode="markers",
-            name="의원 위치",
-            marker=dict(size=16, color="#1D4ED8", opacity=0.95,
-                        allowoverlap=True),
-            customdata=hospital_markers[["yadmNm", "clCdNm", "addr"]].values,
-            hovertemplate=(
-                "<b>%{customdata[0]}</b><br>"
-                "종별: %{customdata[1]}<br>"
-                "주소: %{customdata[2]}"
-                "<extra></extra>"
-            ),
-            showlegend=True,
-        ))
+        pins, clusters = _cluster_markers(hospital_markers, _CLUSTER_CELL.get(analysis_level, 0.005))
+        if not clusters.empty:
+            fig.add_trace(go.Scattermapbox(
+                lat=clusters["lat"].tolist(),
+                lon=clusters["lon"].tolist(),
+                mode="markers+text",
+                name="의원 밀집",
+                marker=dict(size=(14 + 6 * np.log2(clusters["count"])).round(1).tolist(),
+                            color="#1D4ED8", opacity=0.7, allowoverlap=True),
+                text=clusters["count"].astype(str).tolist(),
+                textfont=dict(color="#FFFFFF", size=11),
+                customdata=clusters[["count"]].values,
+                hovertemplate="의원 %{customdata[0]}곳<br>지역을 선택하면 개별 위치 표시<extra></extra>",
+                showlegend=True,
+            ))
+        if not pins.empty:
+            fig.add_trace(go.Scattermapbox(
+                lat=pins["YPos"].tolist(),
+                lon=pins["XPos"].tolist(),
+                mode="markers",
+                name="의원 위치",
+                marker=dict(size=16 if clusters.empty else 9, color="#1D4ED8", opacity=0.95,
+                            allowoverlap=True),
+                customdata=pins[["yadmNm", "clCdNm", "addr"]].values,
+                hovertemplate=(
+                    "<b>%{customdata[0]}</b><br>"
+                    "종별: %{customdata[1]}<br>"
+                    "주소: %{customdata[2]}"
+                    "<extra></extra>"
+                ),
+                showlegend=True,
+            ))
 
     return fig
 
 def _make_scatter_chart(si_df: pd.DataFrame) -> go.Figure:
     """개비공 소득지수(0-100) × 포화도 지수 산점도. 우상단이 최적 입지."""
+    go = _go()
     df = si_df.dropna(subset=["income_score", "SI_normalized"]).copy()
     df = df[(df["saturation_level"] != "데이터없음") & (df["income_score"].notna())]
     if df.empty:
@@ -365,6 +452,7 @@ def _make_scatter_chart(si_df: pd.DataFrame) -> go.Figure:
 
 
 def _make_bar_chart(si_df: pd.DataFrame, si_col: str = "SI_normalized") -> go.Figure:
+    go = _go()
     df = si_df.dropna(subset=[si_col]).copy()
     # 기회 최대(∞→3.0) 구분 표시용으로 원본 보존, 정렬은 정상값 기준
     df_inf = df[df[si_col] == 3.0]
@@ -400,12 +488,52 @@ def _make_bar_chart(si_df: pd.DataFrame, si_col: str = "SI_normalized") -> go.Fi
     )
     return fig
 
+def _make_timing_waterfall(timings: list[dict]) -> go.Figure:
+    """단계별 소요 시간 워터폴 (막대 시작 = 단계 시작 시각)"""
+    go = _go()
+    df = pd.DataFrame(timings)
+    df = df[df["seconds"] > 0]
+    label = df["stage"] + df["cache"].map(lambda c: f" ({c})" if isinstance(c, str) else "")
+    fig = go.Figure(go.Bar(
+        x=df["seconds"], base=df["start"], y=label, orientation="h",
+        marker_color=["#DC2626" if isinstance(e, str) else "#2563EB" for e in df["error"]],
+        customdata=df[["rows_in", "rows_out"]].astype("float").values,
+        hovertemplate="<b>%{y}</b><br>%{x:.3f}초 (시작 %{base:.3f}초)<br>"
+                      "행: %{customdata[0]:,.0f} → %{customdata[1]:,.0f}<extra></extra>",
+    ))
+    fig.update_layout(
+        height=max(160, 26 * len(df) + 60),
+        margin=dict(r=20, t=10, l=10, b=30),
+        plot_bgcolor="white", showlegend=False,
+        xaxis=dict(title="초", showgrid=True, gridcolor="#F3F4F6"),
+        yaxis=dict(autorange="reversed", tickfont=dict(size=11)),
+    )
+    return fig
+
+# ── figure 캐시 ──────────────────────────────────────────────────────────────
+# 키: 포화도 결과 해시 + 선택 행정동 + 표시 중인 의원 목록 해시 → 같은 결과 재표시 시 재계산 없음
+# (밑줄 인자는 해시 대상에서 제외 — 내용은 키가 대표)
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def _cached_choropleth(si_fp: str, geo_key: str, selected_key: str, marker_key: str, analysis_level: str,
+                       _si_df: pd.DataFrame, _geojson: dict, _markers: pd.DataFrame | None) -> go.Figure:
+    return _make_choropleth(_si_df, _geojson, hospital_markers=_markers,
+                            selected_key=selected_key, geo_key=geo_key, analysis_level=analysis_level)
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _cached_bar_chart(si_fp: str, _si_df: pd.DataFrame) -> go.Figure:
+    return _make_bar_chart(_si_df)
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _cached_scatter_chart(si_fp: str, _si_df: pd.DataFrame) -> go.Figure:
+    return _make_scatter_chart(_si_df)
+
 # ══════════════════════════════════════════════════════════════════════════════
 # 병원 상세 팝업
 # ══════════════════════════════════════════════════════════════════════════════
 
 @st.dialog("🏥 병원 상세 정보", width="large")
-def _show_hospital_detail(hosp: pd.Series, all_hosp_df: pd.DataFrame) -> None:
+def _show_hospital_detail(hosp: pd.Series, specialties_by_ykiho: dict) -> None:
     name    = str(hosp.get("yadmNm", "") or "")
     addr    = str(hosp.get("addr", "") or "")
     cl_nm   = str(hosp.get("clCdNm", "") or "")
@@ -418,12 +546,9 @@ def _show_hospital_detail(hosp: pd.Series, all_hosp_df: pd.DataFrame) -> None:
     estb_clean = estb.split()[0].replace("-", "") if estb else ""
     estb_fmt = f"{estb_clean[:4]}-{estb_clean[4:6]}-{estb_clean[6:8]}" if len(estb_clean) >= 8 and estb_clean[:8].isdigit() else "정보 없음"
 
-    # 같은 ykiho를 가진 모든 행에서 진료과목 수집
-    if ykiho and not all_hosp_df.empty and "ykiho" in all_hosp_df.columns:
-        specialties = sorted(
-            all_hosp_df[all_hosp_df["ykiho"] == ykiho]["specialty_nm"].dropna().unique().tolist()
-        )
-    else:
+    # 같은 ykiho의 진료과목 (build_hospital_index 사전 인덱스)
+    specialties = specialties_by_ykiho.get(ykiho, []) if ykiho else []
+    if not specialties:
         sp_fallback = str(hosp.get("specialty_nm", "") or "")
         specialties = [sp_fallback] if sp_fallback else []
 
@@ -459,6 +584,253 @@ def _show_hospital_detail(hosp: pd.Series, all_hosp_df: pd.DataFrame) -> None:
     with btn_col:
         st.link_button("📍 네이버 지도에서 보기", naver_url, use_container_width=True, type="primary")
 
+# ══════════════════════════════════════════════════════════════════════════════
+# 의원 목록 (단일 표 + 서버측 검색·정렬·페이지 — 의원 수와 무관하게 위젯 수 고정)
+# ══════════════════════════════════════════════════════════════════════════════
+
+_CLINIC_PAGE_SIZE = 20
+_CLINIC_SORT = {
+    "의원명순":       ("yadmNm", True),
+    "전문의 많은 순": ("mdeptSdrCnt", False),
+    "개설일 최신순":  ("estbDd", False),
+    "주소순":         ("addr", True),
+}
+
+def _render_clinic_table(clinics: pd.DataFrame, specialties_by_ykiho: dict, key: str) -> None:
+    """선택 행정동 의원 목록. 행을 선택하면 상세 팝업."""
+    q_col, sort_col, page_col = st.columns([4, 2, 1.2])
+    query = q_col.text_input("의원 검색", key=f"clinic_q_{key}", placeholder="의원명·주소 검색",
+                             label_visibility="collapsed").strip()
+    sort_label = sort_col.selectbox("정렬", list(_CLINIC_SORT), key=f"clinic_sort_{key}",
+                                    label_visibility="collapsed")
+
+    view = clinics
+    if query:
+        view = view[view["yadmNm"].astype(str).str.contains(query, case=False, regex=False, na=False) |
+                    view["addr"].astype(str).str.contains(query, case=False, regex=False, na=False)]
+    sort_by, ascending = _CLINIC_SORT[sort_label]
+    if sort_by in view.columns:
+        view = view.sort_values(sort_by, ascending=ascending, kind="stable", na_position="last")
+    view = view.reset_index(drop=True)
+
+    n_pages = max(1, -(-len(view) // _CLINIC_PAGE_SIZE))
+    # 검색어·정렬이 바뀌면 페이지·선택 상태를 새 키로 초기화
+    state_key = f"{key}_{sort_label}_{hashlib.md5(query.encode()).hexdigest()[:8]}"
+    page = page_col.number_input("페이지", min_value=1, max_value=n_pages, value=1, step=1,
+                                 key=f"clinic_page_{state_key}", label_visibility="collapsed",
+                                 disabled=n_pages == 1)
+    offset = (page - 1) * _CLINIC_PAGE_SIZE
+    page_df = view.iloc[offset: offset + _CLINIC_PAGE_SIZE]
+    first = offset + 1 if len(page_df) else 0
+    st.caption(f"{len(view):,}개 중 {first}–{offset + len(page_df)} 표시 · {page}/{n_pages} 페이지 "
+               f"· 행을 선택하면 상세 정보")
+
+    table_key = f"clinic_tbl_{state_key}_{page}"
+    event = st.dataframe(
+        pd.DataFrame({
+            "의원명": page_df["yadmNm"].values,
+            "종별":   page_df["clCdNm"].values,
+            "주소":   page_df["addr"].values,
+            "전문의": pd.to_numeric(page_df["mdeptSdrCnt"], errors="coerce").fillna(0).astype(int).values,
+        }),
+        column_config={"전문의": st.column_config.NumberColumn(format="%d명")},
+        hide_index=True,
+        use_container_width=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        key=table_key,
+    )
+
+    # 같은 선택으로 재실행될 때 팝업이 다시 열리지 않도록 마지막으로 연 행을 기억
+    opened_slot = f"_clinic_opened_{key}"
+    rows = event.selection.rows if event else []
+    if rows and rows[0] < len(page_df):
+        token = (table_key, rows[0])
+        if st.session_state.get(opened_slot) != token:
+            st.session_state[opened_slot] = token
+            _show_hospital_detail(page_df.iloc[rows[0]], specialties_by_ykiho)
+    elif not rows:
+        st.session_state.pop(opened_slot, None)
+
+def _specialty_summary(si_df: pd.DataFrame) -> dict:
+    """과목 요약 지표 (패널 상단 지표·과목 비교표 공용)"""
+    valid_si = si_df[(si_df["SI_normalized"] != 3.0) & si_df["SI_normalized"].notna()]["SI_normalized"]
+    return {
+        "total_clinics": int(si_df["clinic_count"].sum()),
+        "regions":       len(si_df),
+        "avg_si":        valid_si.mean() if not valid_si.empty else float("nan"),
+        "blue_ocean":    int((si_df["clinic_count"] == 0).sum()),
+        "saturated":     int((si_df["saturation_level"] == "포화").sum()),
+    }
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 과목별 결과 패널 (fragment: 지도 클릭·핀 토글·상세 버튼은 해당 탭만 재실행)
+# ══════════════════════════════════════════════════════════════════════════════
+
+@st.fragment
+def _render_specialty_panel(sp_nm: str, res: dict, geojson: dict) -> None:
+    analysis_level = res.get("analysis_level", "dong")
+    hosp_df = res.get("hospitals", pd.DataFrame())
+    hosp_index = res.get("hospital_index") or _data_merge().build_hospital_index(hosp_df)
+
+    sp_cd  = SPECIALTY_SELECT[sp_nm]
+    si_df  = res["saturation"].get(sp_cd)
+    sel_key = f"dong_sel_{sp_nm}"
+
+    if si_df is None or si_df.empty:
+        st.info("해당 과목 데이터가 없습니다.")
+        return
+    si_fp = res.get("fingerprints", {}).get(sp_cd) or frame_fingerprint(si_df)
+
+    # ── 요약 지표 ─────────────────────────────────────────────
+    summ = _specialty_summary(si_df)
+    mc1, mc2, mc3, mc4 = st.columns(4)
+    mc1.metric("총 의원 수",        f"{summ['total_clinics']:,}개")
+    mc2.metric("분석 행정동",        f"{summ['regions']:,}개")
+    mc3.metric("평균 포화도",        f"{summ['avg_si']:.2f}" if not pd.isna(summ["avg_si"]) else "N/A")
+    mc4.metric("기회 지역 (의원 0)", f"{summ['blue_ocean']:,}개")
+
+    st.markdown("---")
+
+    # ── 지도 + 막대그래프 ─────────────────────────────────────
+    col_map, col_bar = st.columns([6, 4], gap="medium")
+
+    with col_map:
+        st.markdown('<p class="chart-title">📍 행정동별 포화도 지도 — 클릭하면 의원 목록 표시</p>', unsafe_allow_html=True)
+
+        # 현재 선택된 행정동 (토글/핀 여부와 무관하게 항상 읽음)
+        current_sel = st.session_state.get(sel_key, "")
+
+        # 의원 위치 핀 토글 — 선택 지역이 있으면 그 지역, 없으면 분석 범위 전체 (밀집 구역은 클러스터)
+        show_markers = st.toggle(
+            "📌 의원 위치 핀 표시",
+            key=f"show_markers_{sp_nm}",
+            help="의원 위치를 지도에 표시합니다. 밀집 구역은 개수로 묶이며, 지역을 클릭하면 해당 지역 의원이 개별 핀으로 표시됩니다.",
+        )
+
+        markers_df = None
+        if show_markers and not hosp_df.empty:
+            _mdf = clinics_in(hosp_df, hosp_index, current_sel or None, sp_cd)
+            _mdf = _mdf[_mdf["XPos"].notna() & (_mdf["XPos"] != 0) &
+                        _mdf["YPos"].notna() & (_mdf["YPos"] != 0)]
+            if not _mdf.empty:
+                markers_df = _mdf
+        marker_key = (hashlib.md5("\n".join(markers_df["ykiho"].astype(str)).encode()).hexdigest()
+                      if markers_df is not None else "")
+        map_fig = _cached_choropleth(si_fp, res.get("geojson_key", "base"), current_sel, marker_key,
+                                     analysis_level, si_df, geojson, markers_df)
+
+        map_event = st.plotly_chart(
+            map_fig,
+            use_container_width=True,
+            on_select="rerun",
+            key=f"map_{sp_nm}",
+            config={
+                "scrollZoom": True,
+                "displayModeBar": True,
+                "displaylogo": False,
+                "modeBarButtonsToRemove": ["toImage", "lasso2d", "select2d"],
+            },
+        )
+        # 선택된 지역 session_state 저장 (Scattermapbox 클릭 시 선택 해제 방지)
+        if (map_event and hasattr(map_event, "selection")
+                and map_event.selection.points):
+            _loc = str(map_event.selection.points[0].get("location", ""))
+            if _loc and _loc != current_sel:  # Choroplethmapbox 폴리곤 클릭만 처리
+                st.session_state[sel_key] = _loc
+                st.rerun(scope="fragment")  # 강조 레이어를 새 선택으로 즉시 반영
+
+    with col_bar:
+        st.markdown('<p class="chart-title">📊 포화도 순위 — 위로 갈수록 기회 많음</p>', unsafe_allow_html=True)
+        st.plotly_chart(
+            _cached_bar_chart(si_fp, si_df),
+            use_container_width=True,
+            key=f"bar_{sp_nm}",
+        )
+
+    # ── 소득 × 포화도 산점도 ──────────────────────────────────
+    has_income_col = ("income_score" in si_df.columns
+                      and si_df["income_score"].notna().any())
+    if has_income_col:
+        st.markdown("---")
+        st.markdown(
+            '<p class="chart-title">📊 개비공 소득지수 × 포화도 입지 분석 '
+            '— 우상단이 최적 입지 (고소득·여유)</p>',
+            unsafe_allow_html=True,
+        )
+        st.plotly_chart(
+            _cached_scatter_chart(si_fp, si_df),
+            use_container_width=True,
+            key=f"scatter_{sp_nm}",
+        )
+
+    # ── 클릭된 행정동 의원 목록 ───────────────────────────────
+    selected_key = st.session_state.get(sel_key, "")
+    if selected_key:
+        mask     = si_df["match_key"].astype(str) == selected_key
+        dong_row = si_df[mask]
+        dong_name = (dong_row["행정동명"].values[0]
+                     if not dong_row.empty and "행정동명" in dong_row.columns
+                     else selected_key)
+        level    = dong_row["saturation_level"].values[0] if not dong_row.empty else ""
+        n_clinic = int(dong_row["clinic_count"].values[0])   if not dong_row.empty else 0
+        n_spec   = int(dong_row["specialist_count"].values[0]) if not dong_row.empty else 0
+        si_val   = dong_row["SI_normalized"].values[0] if not dong_row.empty else None
+        n_pop    = int(dong_row["총인구수"].values[0]) if not dong_row.empty and "총인구수" in dong_row.columns else 0
+        n_hh     = int(dong_row["세대수"].values[0])  if not dong_row.empty and "세대수"  in dong_row.columns else 0
+
+        st.divider()
+        hdr_col, close_col = st.columns([9, 1])
+        with hdr_col:
+            badge_color = LEVEL_COLOR.get(level, "#9CA3AF")
+            st.markdown(
+                f'<h4 style="margin:0;line-height:2">📋 {dong_name} &nbsp;'
+                f'<span style="background:{badge_color};color:white;padding:3px 14px;'
+                f'border-radius:20px;font-size:13px;font-weight:600">{level}</span></h4>',
+                unsafe_allow_html=True,
+            )
+        with close_col:
+            if st.button("✕ 닫기", key=f"close_{sp_nm}"):
+                st.session_state.pop(sel_key, None)
+                st.rerun(scope="fragment")
+
+        income_grade_val = None
+        if not dong_row.empty and "income_grade" in dong_row.columns:
+            _ig = dong_row["income_grade"].values[0]
+            if pd.notna(_ig) and _ig:
+                income_grade_val = str(_ig)
+
+        dm1, dm2, dm3, dm4, dm5, dm6 = st.columns(6)
+        dm1.metric(f"{sp_nm} 의원 수", f"{n_clinic}개")
+        dm2.metric("전문의 수", f"{n_spec}명")
+        si_label = ("기회 최대" if (n_clinic == 0 or si_val == 3.0)
+                    else (f"{si_val:.2f}" if pd.notna(si_val) else "N/A"))
+        dm3.metric("포화도 지수", si_label)
+        dm4.metric("총 인구수", f"{n_pop:,}명")
+        dm5.metric("세대수", f"{n_hh:,}세대")
+        _GRADE_COLOR = {
+            "S": "#7C3AED", "A": "#2563EB",
+            "B": "#16A34A", "C": "#D97706", "D": "#9CA3AF",
+        }
+        if income_grade_val:
+            gc = _GRADE_COLOR.get(income_grade_val, "#9CA3AF")
+            dm6.markdown(
+                f"<div style='font-size:12px;color:#6B7280;margin-bottom:4px'>"
+                f"개비공 소득지수</div>"
+                f"<span style='font-size:28px;font-weight:700;color:{gc}'>"
+                f"{income_grade_val}</span>",
+                unsafe_allow_html=True,
+            )
+
+        if not hosp_df.empty and "match_key" in hosp_df.columns and "specialty_cd" in hosp_df.columns:
+            clinics = clinics_in(hosp_df, hosp_index, selected_key, sp_cd)
+            if clinics.empty:
+                st.info(f"해당 행정동에 {sp_nm} 의원이 없거나, 좌표 미등록으로 지도에 매핑되지 않았습니다.")
+            else:
+                _render_clinic_table(clinics, hosp_index["specialties_by_ykiho"], f"{sp_nm}_{selected_key}")
+        else:
+            st.info("병원 위치 데이터가 없습니다.")
+
 # ══════════════════════════════════════════════════════════════════════════════
 # 사이드바
 # ══════════════════════════════════════════════════════════════════════════════
@@ -488,28 +860,87 @@ with st.sidebar:
     st.markdown("##### 📊 분석 기준")
     denom_type = st.radio("분모", ["의원 수", "전문의 수"], horizontal=True)
     denom_col = "clinic_count" if denom_type == "의원 수" else "specialist_count"
-    num_opts = {"총 인구수": "총인구수", "세대수": "세대수", "20세 이하": "20세이하인구", "20~40세": "20_40세인구", "40~60세": "40_60세인구", "60세 이상": "60세이상인구"}
-    si_mode_label = st.selectbox("분자 (대상 인구)", list(num_opts.keys()), index=0)
-    num_col = num_opts[si_mode_label]
+    si_mode_label = st.selectbox("분자 (대상 인구)", list(NUMERATORS.keys()), index=0)
+    num_col = NUMERATORS[si_mode_label]
 
-    _prev = datetime.now().replace(day=1) - timedelta(days=1)
-    year_month = st.text_input("기준 연월", value=_prev.strftime("%Y%m"))
+    year_month = st.text_input("기준 연월", value=default_year_month())
     cl_opts = st.multiselect("의료기관 종류", options=["의원 (31)", "병원 (21)", "종합병원 (11)"], default=["의원 (31)"])
     cl_codes = tuple(x.split("(")[1].rstrip(")").strip() for x in cl_opts) or ("31",)
 
     run_btn = st.button("🔍  분석 실행", use_container_width=True, type="primary")
     if st.button("🗑️ 캐시 초기화", use_container_width=True):
-        st.cache_data.clear(); st.session_state.clear(); st.rerun()
+        st.cache_data.clear(); _result_store().clear(); st.session_state.clear(); st.rerun()
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CSS (아이콘 보정 포함)
+# ══════════════════════════════════════════════════════════════════════════════
+
+st.markdown("""
+<style>
+@import url('https://fonts.googleapis.com/css2?family=Noto+Sans+KR:wght@300;400;500;600;700&display=swap');
+html, body, [class*="css"], [class*="st-"] { font-family: 'Noto Sans KR', sans-serif !important; color: #1F2937; }
+section[data-testid="stSidebar"] > div { background: #F9FAFB; padding-top: 1.2rem; }
+[data-testid="stMetric"] { background: #FFFFFF; border: 1.5px solid #E5E7EB; border-radius: 14px; padding: 18px 22px !important; }
+.chart-card { background: #FFFFFF; border: 1.5px solid #E5E7EB; border-radius: 14px; padding: 16px 20px; margin-bottom: 12px; }
+.chart-title { font-size: 13px; font-weight: 600; color: #374151; margin-bottom: 10px; border-left: 3px solid #2563EB; padding-left: 8px; }
+@import url('https://fonts.googleapis.com/variablefonts/materialsymbolsoutlined');
+.material-symbols-outlined, [data-testid="stIconMaterial"] { font-family: 'Material Symbols Outlined' !important; -webkit-font-feature-settings: 'liga'; }
+/* ── 초록 계열 버튼 테마 ── */
+[data-testid="stBaseButton-primary"],
+[data-testid="stBaseButton-primary"] * {
+    background-color: #16A34A !important;
+    border-color: #16A34A !important;
+    color: #FFFFFF !important;
+}
+[data-testid="stBaseButton-primary"]:hover,
+[data-testid="stBaseButton-primary"]:hover * {
+    background-color: #15803D !important;
+    border-color: #15803D !important;
+    color: #FFFFFF !important;
+}
+[data-testid="stBaseButton-primary"]:active,
+[data-testid="stBaseButton-primary"]:active * {
+    background-color: #166534 !important;
+    border-color: #166534 !important;
+    color: #FFFFFF !important;
+}
+/* multiselect 선택 태그 */
+[data-testid="stMultiSelect"] [data-baseweb="tag"] {
+    background-color: #16A34A !important;
+}
+/* link button (네이버 지도 등) */
+[data-testid="stLinkButton"] a,
+[data-testid="stLinkButton"] a * {
+    background-color: #16A34A !important;
+    border-color: #16A34A !important;
+    color: #FFFFFF !important;
+}
+[data-testid="stLinkButton"] a:hover,
+[data-testid="stLinkButton"] a:hover * {
+    background-color: #15803D !important;
+    border-color: #15803D !important;
+    color: #FFFFFF !important;
+}
+</style>
+""", unsafe_allow_html=True)
 
 # ══════════════════════════════════════════════════════════════════════════════
 # 메인
 # ══════════════════════════════════════════════════════════════════════════════
 
+run_in_background = False
 if run_btn:
     if analysis_level == "national" and admin_pw_input != ADMIN_PASSWORD:
         st.error("❌ 전국 분석 권한이 없습니다."); st.stop()
     
     sp_codes = tuple(SPECIALTY_SELECT[nm] for nm in selected_sp_names)
+    params = (sgg_cd_pop, hira_sido, sgg_name, sp_codes, year_month, num_col, denom_col, analysis_level, cl_codes)
+    run_in_background = (analysis_level in _BACKGROUND_LEVELS
+                         and _result_store().get(result_key(params)) is None)
+    if run_in_background:
+        st.session_state.update({"job_id": _submit_job(params), "result_params": params, "sp_names": selected_sp_names, "sido_name": sido_name, "sgg_name": sgg_name, "analysis_level": analysis_level})
+
+if run_btn and not run_in_background:
     _LOADING_IMG = "https://lh3.googleusercontent.com/d/1LcNs3lhy8907rWmyRfh_ZcFQdPuF7Spq"
     loading_slot = st.empty()
     loading_slot.markdown(f"""
@@ -539,16 +970,22 @@ if run_btn:
 """, unsafe_allow_html=True)
 
     try:
-        results = _load_data(sgg_cd_pop, hira_sido, sgg_name, sp_codes, year_month, num_col, denom_col, analysis_level, cl_codes)
-        st.session_state.update({"results": results, "sp_names": selected_sp_names, "sido_name": sido_name, "sgg_name": sgg_name, "analysis_level": analysis_level})
+        result_key, _ = _get_result(params)
+        st.session_state.update({"result_key": result_key, "result_params": params, "sp_names": selected_sp_names, "sido_name": sido_name, "sgg_name": sgg_name, "analysis_level": analysis_level})
     except Exception as e:
         st.error(f"⚠️ 분석 오류: {e}")
         with st.expander("🚨 상세 오류 로그 (개발자 확인용)"):
             st.code(traceback.format_exc())
     loading_slot.empty()
 
-if "results" in st.session_state:
-    res = st.session_state["results"]
+if "job_id" in st.session_state:
+    _render_job_progress(st.session_state["job_id"])
+elif "result_key" in st.session_state:
+    res = _result_store().get(st.session_state["result_key"])
+    if res is None:
+        # 메모리 예산·만료로 제거된 결과 → 같은 인자로 재계산
+        with st.spinner("분석 결과를 다시 불러오는 중..."):
+            _, res = _get_result(st.session_state["result_params"])
     pop_df     = res["population"]
     hosp_summary = res["hospital_summary"]
     hosp_df    = res.get("hospitals", pd.DataFrame())
@@ -556,187 +993,46 @@ if "results" in st.session_state:
     sp_names   = st.session_state["sp_names"]
 
     # ── 디버그 (기본 접힘) ─────────────────────────────────────────────
-
-    tabs = st.tabs(sp_names)
-    for tab, sp_nm in zip(tabs, sp_names):
-        with tab:
-            sp_cd  = SPECIALTY_SELECT[sp_nm]
-            si_df  = res["saturation"].get(sp_cd)
-            sel_key = f"dong_sel_{sp_nm}"
-
-            if si_df is None or si_df.empty:
-                st.info("해당 과목 데이터가 없습니다.")
+    debug_box = st.expander("🛠 디버그 정보", expanded=False)
+
+    # 과목이 여러 개면 선택된 과목 하나만 지도·차트·목록을 그리고, 나머지는 요약표로만 표시
+    # (st.tabs 는 보이지 않는 탭까지 모두 그리므로 과목 수만큼 첫 화면이 느려짐)
+    if len(sp_names) > 1:
+        summary_rows = []
+        for nm in sp_names:
+            _si = res["saturation"].get(SPECIALTY_SELECT[nm])
+            if _si is None or _si.empty:
                 continue
-
-            # ── 요약 지표 ─────────────────────────────────────────────
-            total_clinics = int(si_df["clinic_count"].sum())
-            valid_si = si_df[(si_df["SI_normalized"] != 3.0) & si_df["SI_normalized"].notna()]["SI_normalized"]
-            avg_si    = valid_si.mean() if not valid_si.empty else float("nan")
-            blue_ocean = int((si_df["clinic_count"] == 0).sum())
-            saturated  = int((si_df["saturation_level"] == "포화").sum())
-
-            mc1, mc2, mc3, mc4 = st.columns(4)
-            mc1.metric("총 의원 수",        f"{total_clinics:,}개")
-            mc2.metric("분석 행정동",        f"{len(si_df):,}개")
-            mc3.metric("평균 포화도",        f"{avg_si:.2f}" if not pd.isna(avg_si) else "N/A")
-            mc4.metric("기회 지역 (의원 0)", f"{blue_ocean:,}개")
-
-            st.markdown("---")
-
-            # ── 지도 + 막대그래프 ─────────────────────────────────────
-            col_map, col_bar = st.columns([6, 4], gap="medium")
-
-            with col_map:
-                st.markdown('<p class="chart-title">📍 행정동별 포화도 지도 — 클릭하면 의원 목록 표시</p>', unsafe_allow_html=True)
-
-                # 현재 선택된 행정동 (토글/핀 여부와 무관하게 항상 읽음)
-                current_sel = st.session_state.get(sel_key, "")
-
-                # 의원 위치 핀 토글 (dong 분석 전용)
-                show_markers = False
-                if analysis_level == "dong":
-                    show_markers = st.toggle(
-                        "📌 의원 위치 핀 표시",
-                        key=f"show_markers_{sp_nm}",
-                        help="행정동을 클릭한 후 해당 동의 의원 위치를 지도에 표시합니다.",
-                    )
-
-                # 마커 데이터 준비 (토글 ON + 행정동 선택 시)
-                markers_df = None
-                if show_markers and current_sel and not hosp_df.empty:
-                    _mdf = hosp_df[
-                        (hosp_df["match_key"].astype(str) == current_sel) &
-                        (hosp_df["specialty_cd"] == sp_cd) &
-                        (hosp_df["XPos"].notna()) & (hosp_df["XPos"] != 0) &
-                        (hosp_df["YPos"].notna()) & (hosp_df["YPos"] != 0)
-                    ].copy()
-                    if not _mdf.empty:
-                        markers_df = _mdf
-
-                map_event = st.plotly_chart(
-                    _make_choropleth(si_df, geojson,
-                                     hospital_markers=markers_df,
-                                     selected_key=current_sel),
-                    use_container_width=True,
-                    on_select="rerun",
-                    key=f"map_{sp_nm}",
-                    config={
-                        "scrollZoom": True,
-                        "displayModeBar": True,
-                        "displaylogo": False,
-                        "modeBarButtonsToRemove": ["toImage", "lasso2d", "select2d"],
-                    },
-                )
-                # 선택된 지역 session_state 저장 (Scattermapbox 클릭 시 선택 해제 방지)
-                if (map_event and hasattr(map_event, "selection")
-                        and map_event.selection.points):
-                    _loc = str(map_event.selection.points[0].get("location", ""))
-                    if _loc:  # Choroplethmapbox 폴리곤 클릭만 처리
-                        st.session_state[sel_key] = _loc
-
-            with col_bar:
-                st.markdown('<p class="chart-title">📊 포화도 순위 — 위로 갈수록 기회 많음</p>', unsafe_allow_html=True)
-                st.plotly_chart(
-                    _make_bar_chart(si_df),
-                    use_container_width=True,
-                    key=f"bar_{sp_nm}",
-                )
-
-            # ── 소득 × 포화도 산점도 ──────────────────────────────────
-            has_income_col = ("income_score" in si_df.columns
-                              and si_df["income_score"].notna().any())
-            if has_income_col:
-                st.markdown("---")
-                st.markdown(
-                    '<p class="chart-title">📊 개비공 소득지수 × 포화도 입지 분석 '
-                    '— 우상단이 최적 입지 (고소득·여유)</p>',
-                    unsafe_allow_html=True,
-                )
-                st.plotly_chart(
-                    _make_scatter_chart(si_df),
-                    use_container_width=True,
-                    key=f"scatter_{sp_nm}",
-                )
-
-            # ── 클릭된 행정동 의원 목록 ───────────────────────────────
-            selected_key = st.session_state.get(sel_key, "")
-            if selected_key:
-                mask     = si_df["match_key"].astype(str) == selected_key
-                dong_row = si_df[mask]
-                dong_name = (dong_row["행정동명"].values[0]
-                             if not dong_row.empty and "행정동명" in dong_row.columns
-                             else selected_key)
-                level    = dong_row["saturation_level"].values[0] if not dong_row.empty else ""
-                n_clinic = int(dong_row["clinic_count"].values[0])   if not dong_row.empty else 0
-                n_spec   = int(dong_row["specialist_count"].values[0]) if not dong_row.empty else 0
-                si_val   = dong_row["SI_normalized"].values[0] if not dong_row.empty else None
-                n_pop    = int(dong_row["총인구수"].values[0]) if not dong_row.empty and "총인구수" in dong_row.columns else 0
-                n_hh     = int(dong_row["세대수"].values[0])  if not dong_row.empty and "세대수"  in dong_row.columns else 0
-
-                st.divider()
-                hdr_col, close_col = st.columns([9, 1])
-                with hdr_col:
-                    badge_color = LEVEL_COLOR.get(level, "#9CA3AF")
-                    st.markdown(
-                        f'<h4 style="margin:0;line-height:2">📋 {dong_name} &nbsp;'
-                        f'<span style="background:{badge_color};color:white;padding:3px 14px;'
-                        f'border-radius:20px;font-size:13px;font-weight:600">{level}</span></h4>',
-                        unsafe_allow_html=True,
-                    )
-                with close_col:
-                    if st.button("✕ 닫기", key=f"close_{sp_nm}"):
-                        st.session_state.pop(sel_key, None)
-                        st.rerun()
-
-                income_grade_val = None
-                if not dong_row.empty and "income_grade" in dong_row.columns:
-                    _ig = dong_row["income_grade"].values[0]
-                    if pd.notna(_ig) and _ig:
-                        income_grade_val = str(_ig)
-
-                dm1, dm2, dm3, dm4, dm5, dm6 = st.columns(6)
-                dm1.metric(f"{sp_nm} 의원 수", f"{n_clinic}개")
-                dm2.metric("전문의 수", f"{n_spec}명")
-                si_label = ("기회 최대" if (n_clinic == 0 or si_val == 3.0)
-                            else (f"{si_val:.2f}" if pd.notna(si_val) else "N/A"))
-                dm3.metric("포화도 지수", si_label)
-                dm4.metric("총 인구수", f"{n_pop:,}명")
-                dm5.metric("세대수", f"{n_hh:,}세대")
-                _GRADE_COLOR = {
-                    "S": "#7C3AED", "A": "#2563EB",
-                    "B": "#16A34A", "C": "#D97706", "D": "#9CA3AF",
-                }
-                if income_grade_val:
-                    gc = _GRADE_COLOR.get(income_grade_val, "#9CA3AF")
-                    dm6.markdown(
-                        f"<div style='font-size:12px;color:#6B7280;margin-bottom:4px'>"
-                        f"개비공 소득지수</div>"
-                        f"<span style='font-size:28px;font-weight:700;color:{gc}'>"
-                        f"{income_grade_val}</span>",
-                        unsafe_allow_html=True,
-                    )
-
-                if not hosp_df.empty and "match_key" in hosp_df.columns and "specialty_cd" in hosp_df.columns:
-                    clinics = hosp_df[
-                        (hosp_df["match_key"].astype(str) == selected_key) &
-                        (hosp_df["specialty_cd"] == sp_cd)
-                    ].copy().reset_index(drop=True)
-                    if clinics.empty:
-                        st.info(f"해당 행정동에 {sp_nm} 의원이 없거나, 좌표 미등록으로 지도에 매핑되지 않았습니다.")
-                    else:
-                        # 헤더 행
-                        h = st.columns([3, 1.5, 4, 0.8, 0.8])
-                        for txt, col in zip(["의원명", "종별", "주소", "전문의", ""], h):
-                            col.markdown(f"<span style='font-size:11px;font-weight:600;color:#6B7280'>{txt}</span>", unsafe_allow_html=True)
-                        st.markdown("<hr style='margin:2px 0 6px;border-color:#E5E7EB'>", unsafe_allow_html=True)
-                        # 데이터 행
-                        for idx, row in clinics.iterrows():
-                            r = st.columns([3, 1.5, 4, 0.8, 0.8])
-                            r[0].write(row.get("yadmNm", ""))
-                            r[1].write(row.get("clCdNm", ""))
-                            r[2].write(row.get("addr", ""))
-                            r[3].write(f"{int(row.get('mdeptSdrCnt', 0))}명")
-                            if r[4].button("상세", key=f"det_{sp_cd}_{idx}"):
-                                _show_hospital_detail(row, hosp_df)
-                else:
-                    st.info("병원 위치 데이터가 없습니다.")
+            _summ = _specialty_summary(_si)
+            summary_rows.append({
+                "진료과목": nm, "총 의원 수": _summ["total_clinics"],
+                "평균 포화도": round(_summ["avg_si"], 2) if not pd.isna(_summ["avg_si"]) else None,
+                "포화 지역": _summ["saturated"], "기회 지역 (의원 0)": _summ["blue_ocean"],
+            })
+        if summary_rows:
+            st.dataframe(pd.DataFrame(summary_rows), hide_index=True, use_container_width=True)
+        active_sp = st.radio("진료과목 선택", sp_names, horizontal=True, key="active_sp",
+                             label_visibility="collapsed")
+    else:
+        active_sp = sp_names[0] if sp_names else None
+
+    if active_sp:
+        _render_specialty_panel(active_sp, res, geojson)
+
+    with debug_box:
+        _si_active = res["saturation"].get(SPECIALTY_SELECT[active_sp]) if active_sp else None
+        if _si_active is not None and not _si_active.empty:
+            raw_b, compact_b = _map_payload_bytes(_si_active, geojson, res.get("geojson_key", "base"))
+            st.caption(f"지도 경계 데이터: {raw_b / 1024:,.0f} KB → {compact_b / 1024:,.0f} KB "
+                       f"({raw_b / max(compact_b, 1):.1f}배 축소, 좌표 {_GEO_PRECISION}자리)")
+        timings = res.get("timings", [])
+        if timings:
+            st.caption("분석 단계별 소요 시간 (DataMerger.run + 경계 병합)")
+            st.plotly_chart(_make_timing_waterfall(timings), use_container_width=True, key="timing_waterfall")
+            st.dataframe(pd.DataFrame(timings), hide_index=True, use_container_width=True)
+        imports = _import_report()
+        if imports:
+            st.caption("지연 임포트 비용 (이 프로세스에서 처음 로드할 때)")
+            st.dataframe(pd.DataFrame(
+                [{"모듈": name, "초": round(sec, 3), "함께 로드된 모듈 수": n} for name, (sec, n) in imports.items()]
+            ), hide_index=True, use_container_width=True)
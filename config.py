@@ -13,6 +13,26 @@ JUSO_API_KEY = os.getenv("JUSO_API_KEY", "")
 # 온라인 DB (Supabase). 설정 시 SQLite 대신 Supabase 사용
 SUPABASE_DB_URL = os.getenv("SUPABASE_DB_URL", "")
 
+# Supabase PostGIS 공간 연산 사용 (병원→행정동 배정·경계 dissolve 를 SQL 로)
+# migrate_to_supabase.py --postgis 로 행정동 경계(dong_boundary)를 먼저 적재해야 함
+USE_POSTGIS = os.getenv("USE_POSTGIS", "") not in ("", "0")
+
+# 로컬 DB 엔진 (SUPABASE_DB_URL 미설정 시): "sqlite"(기본) 또는 "duckdb"
+# duckdb 는 scripts/build_parquet.py 로 만든 data/parquet/ 를 조회 (pip install duckdb 필요)
+LOCAL_DB_ENGINE = os.getenv("LOCAL_DB_ENGINE", "sqlite").lower()
+
+# 분석 결과 공용 저장소 메모리 상한 (MB, 모든 세션 합계)
+RESULT_STORE_MB = int(os.getenv("RESULT_STORE_MB", "1024"))
+
+# 백그라운드 분석 작업(전국 분석) 동시 실행 수
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))
+
+# DataMerger 인구·병원 조회 동시 실행 수 (전국 분석의 시도별 조회 등)
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "8"))
+
+# HTTP API(api_server.py) 새 분석 동시 실행 수 (저장소 적중 요청은 제한 없음)
+API_WORKERS = int(os.getenv("API_WORKERS", "2"))
+
 # 관리자 설정
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "admin1234")
 
@@ -0,0 +1,238 @@
+"""
+분석 실행·결과 저장 공용 로직 (Streamlit 앱 · HTTP API 공용)
+
+같은 분석 인자(params 튜플)는 같은 결과 키를 가지므로, 앱과 API 가 같은
+결과 저장소 디스크 보관 디렉터리(RESULT_CACHE_DIR)를 쓰면 서로 계산한 결과를 재사용합니다.
+
+params = (sgg_cd_pop, hira_sido_cd, sgg_name, specialty_codes, year_month,
+          num_col, den_col, analysis_level, cl_codes)
+
+GIS 라이브러리(geopandas)·data_merge 는 실제 계산 시점에 임포트합니다.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from modules.db import DB_PATH, PARQUET_MANIFEST, parquet_dir, snapshot_path
+from modules.result_store import ResultStore, estimate_size
+from modules.tracing import Tracer, records_end
+
+BASE_DIR = Path(__file__).parent.parent
+RESULT_CACHE_DIR = BASE_DIR / "data" / "cache" / "results"
+
+_NATIONAL_GEOJSON = BASE_DIR / "data" / "geojson" / "national_dong.geojson"
+_SEOUL_GEOJSON    = BASE_DIR / "data" / "geojson" / "seoul_dong.geojson"
+GEOJSON_PATH = _NATIONAL_GEOJSON if _NATIONAL_GEOJSON.exists() else _SEOUL_GEOJSON
+
+SPECIALTY_SELECT: dict[str, str] = {
+    # ── 의과 ─────────────────────────────────────────────────────────────────
+    "내과":              "01", "신경과":              "02", "정신건강의학과":    "03",
+    "외과":              "04", "정형외과":            "05", "신경외과":          "06",
+    "흉부외과":          "07", "성형외과":            "08", "마취통증의학과":    "09",
+    "산부인과":          "10", "소아청소년과":        "11", "안과":              "12",
+    "이비인후과":        "13", "피부과":              "14", "비뇨의학과":        "15",
+    "영상의학과":        "16", "재활의학과":          "21", "가정의학과":        "23",
+    "응급의학과":        "24", "직업환경의학과":      "25",
+    # ── 치과 ─────────────────────────────────────────────────────────────────
+    "치과":              "49", "치과교정과":          "52", "소아치과":          "53",
+    "치주과":            "54", "치과보존과":          "55", "통합치의학과":      "61",
+}
+
+# 분자 (대상 인구) 표시명 → 컬럼, 분모 표시명 → 컬럼
+NUMERATORS = {"총 인구수": "총인구수", "세대수": "세대수", "20세 이하": "20세이하인구",
+              "20~40세": "20_40세인구", "40~60세": "40_60세인구", "60세 이상": "60세이상인구"}
+DENOMINATORS = {"의원 수": "clinic_count", "전문의 수": "specialist_count"}
+
+# 의료기관 종류 표시명 → 종별 코드
+CLINIC_TYPES = {"의원": "31", "병원": "21", "종합병원": "11"}
+
+
+def standardize_code(code: str) -> str:
+    """경계 파일의 구 행정코드 → 현행 코드 (세종 41000→36, 강원 42→51, 전북 45→52)"""
+    if not code: return code
+    s = str(code)
+    if s.startswith("41000"): return "36" + s[5:]
+    if s.startswith("42"): return "51" + s[2:]
+    if s.startswith("45"): return "52" + s[2:]
+    return s
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """DataFrame 내용(컬럼명 포함) 해시 — 같은 결과면 같은 값"""
+    h = hashlib.md5("|".join(map(str, df.columns)).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return h.hexdigest()
+
+
+def default_year_month() -> str:
+    """기준 연월 기본값 — 지난달 (YYYYMM)"""
+    return (datetime.now().replace(day=1) - timedelta(days=1)).strftime("%Y%m")
+
+
+# PostgreSQL data_version 행 조회 주기 (초) — 요청마다 조회하지 않음, 재적재 반영은 최대 이만큼 늦음
+PG_VERSION_TTL = 5.0
+_pg_version_cache: dict[str, tuple[float, str]] = {}  # 접속 URL → (조회 시각, 버전)
+_pg_version_lock = threading.Lock()
+
+
+def _pg_data_version(db_url: str) -> str:
+    """migrate_to_supabase.py 가 기록한 적재 버전 (data_version 테이블이 없으면 빈 문자열)"""
+    with _pg_version_lock:
+        cached = _pg_version_cache.get(db_url)
+        if cached is not None and time.monotonic() - cached[0] < PG_VERSION_TTL:
+            return cached[1]
+        import psycopg2
+        conn = psycopg2.connect(db_url)
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT to_regclass('data_version') IS NOT NULL")
+                version = ""
+                if cur.fetchone()[0]:
+                    cur.execute("SELECT version FROM data_version WHERE id = 1")
+                    row = cur.fetchone()
+                    version = row[0] if row else ""
+        finally:
+            conn.close()
+        _pg_version_cache[db_url] = (time.monotonic(), version)
+        return version
+
+
+def data_version(geojson_path: str | Path = GEOJSON_PATH) -> str:
+    """
+    원천 데이터 버전 문자열 (HTTP ETag·결과 저장소 키).
+    DATA_VERSION 환경변수가 있으면 그 값(고정), 없으면 경계 파일과 SQLite 파일(스냅샷 포함) 또는
+    Parquet manifest 의 수정 시각·크기로 만듭니다. Supabase 사용 시에는 migrate_to_supabase.py 가 적재
+    트랜잭션에서 갱신하는 data_version 행을 읽습니다 (PG_VERSION_TTL 초 동안 프로세스 내 재사용).
+    """
+    override = os.getenv("DATA_VERSION", "")
+    if override:
+        return override
+    from config import LOCAL_DB_ENGINE, SUPABASE_DB_URL
+    if SUPABASE_DB_URL:
+        parts, files = ["pg", _pg_data_version(SUPABASE_DB_URL)], [Path(geojson_path)]
+    elif LOCAL_DB_ENGINE == "duckdb":
+        parts, files = ["duckdb"], [Path(geojson_path), parquet_dir(DB_PATH) / PARQUET_MANIFEST]
+    else:
+        parts, files = ["sqlite"], [Path(geojson_path), DB_PATH, snapshot_path(DB_PATH)]
+    for p in files:
+        if p.exists():
+            st = p.stat()
+            parts.append(f"{p.name}:{st.st_mtime_ns}:{st.st_size}")
+    return hashlib.md5("|".join(parts).encode()).hexdigest()[:16]
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 분석 실행
+# ══════════════════════════════════════════════════════════════════════════════
+
+def dissolve_boundaries(geojson_path: str | Path, analysis_level: str, prefix: str = "", sgg_codes=()):
+    """
+    행정동 경계 → 분석 단위 경계 (geopandas dissolve, data_merge.dissolve_boundaries_pg 와 같은 규칙).
+    national: 시도(앞 2자리), sido: 구→시 통합 시군구 키 (prefix 시도만)
+    Returns: GeoDataFrame[dissolve_key, geometry, adm_cd2(= dissolve_key), ...]
+    """
+    import geopandas as gpd
+    gdf = gpd.read_file(geojson_path)
+    gdf["adm_cd2"] = gdf["adm_cd2"].apply(standardize_code)
+    if analysis_level == "national": gdf["dissolve_key"] = gdf["adm_cd2"].str[:2]
+    else:
+        def _mk(adm_cd: str) -> str:
+            c = adm_cd[:4] + "0"
+            return c if c in sgg_codes else adm_cd[:5]
+        gdf["dissolve_key"] = gdf["adm_cd2"].apply(_mk)
+        gdf = gdf[gdf["dissolve_key"].str.startswith(prefix[:2])].copy()
+    dissolved = gdf.dissolve(by="dissolve_key").reset_index()
+    dissolved["adm_cd2"] = dissolved["dissolve_key"]
+    return dissolved
+
+
+def load_data(sgg_cd_pop, hira_sido_cd, sgg_name, specialty_codes, year_month, num_col, den_col,
+              analysis_level="dong", cl_codes=None, geojson_path: str | Path = GEOJSON_PATH,
+              progress=None) -> dict:
+    """DataMerger 실행 + (시도/전국) 경계 dissolve + figure 캐시용 지문"""
+    from modules.data_merge import DataMerger
+
+    merger = DataMerger(geojson_path)
+    res = merger.run(sgg_cd_pop=sgg_cd_pop, hira_sido_cd=hira_sido_cd, sgg_name=sgg_name, specialty_codes=list(specialty_codes),
+                     year_month=year_month, num_col=num_col, den_col=den_col, analysis_level=analysis_level, cl_codes=list(cl_codes) if cl_codes else None, progress=progress)
+
+    if res["population"].empty:
+        try:
+            curr_dt = datetime.strptime(year_month, "%Y%m")
+            prev_month = (curr_dt.replace(day=1) - timedelta(days=1)).strftime("%Y%m")
+            res = merger.run(sgg_cd_pop=sgg_cd_pop, hira_sido_cd=hira_sido_cd, sgg_name=sgg_name, specialty_codes=list(specialty_codes),
+                             year_month=prev_month, num_col=num_col, den_col=den_col, analysis_level=analysis_level, cl_codes=list(cl_codes) if cl_codes else None, progress=progress)
+            res["used_year_month"] = prev_month
+        except: pass
+    else: res["used_year_month"] = year_month
+
+    if analysis_level in ["national", "sido"]:
+        from modules.data_merge import dissolve_boundaries_pg, postgis_enabled
+        if progress: progress("geometry", 0.0)
+        tracer = Tracer("analysis.load_data", offset=records_end(res.get("timings", [])))
+        with tracer.stage("geometry") as rec:
+            if postgis_enabled():
+                # 경계 dissolve 를 PostGIS 에서 (ST_Union) — 경계 파일·geopandas 불필요
+                rec["cache"] = "postgis"
+                gj = dissolve_boundaries_pg(analysis_level, sgg_cd_pop[:2], res.get("sgg_codes", set()))
+                gj_text = json.dumps(gj)
+                rec["rows_out"] = len(gj["features"])
+            else:
+                dissolved = dissolve_boundaries(geojson_path, analysis_level, sgg_cd_pop[:2],
+                                                res.get("sgg_codes", set()))
+                gj_text = dissolved.to_json()
+                rec["rows_out"] = len(dissolved)
+            res["geojson_dissolved"] = json.loads(gj_text)
+            res["geojson_key"] = hashlib.md5(gj_text.encode()).hexdigest()
+            res["geojson_bytes"] = len(gj_text) * 4  # 파싱된 dict 는 JSON 텍스트의 약 4배
+        res["timings"] = res.get("timings", []) + tracer.records
+        if progress: progress("geometry", 1.0)
+
+    # figure 캐시 키: 과목별 포화도 결과 해시 (결과당 1회 계산)
+    res["fingerprints"] = {sp_cd: frame_fingerprint(df) for sp_cd, df in res.get("saturation", {}).items()
+                           if df is not None}
+    return res
+
+
+# ── 공용 결과 저장소 ─────────────────────────────────────────────────────────
+
+def result_key(params: tuple, geojson_path: str | Path = GEOJSON_PATH) -> str:
+    """load_data 인자 + 데이터 버전 → 저장소 키. DB 재구축 후에는 디스크 보관분도 다른 키가 되어 다시 계산."""
+    return hashlib.md5(repr((data_version(geojson_path), params)).encode()).hexdigest()
+
+
+def build_result(store: ResultStore, params: tuple, geojson_path: str | Path = GEOJSON_PATH,
+                 progress=None, persist: bool = False) -> dict:
+    """저장소(디스크 보관 포함)에 없으면 load_data 로 계산해 저장. 같은 키 동시 요청은 한 번만 계산."""
+    key = result_key(params, geojson_path)
+
+    def _build() -> dict:
+        res = load_data(*params, geojson_path=geojson_path, progress=progress)
+        blobs = {}
+        if "geojson_dissolved" in res:
+            # 같은 경계(시도/전국 dissolve)는 과목·연월이 달라도 한 벌만 보관
+            res["geojson_dissolved"] = store.intern(res["geojson_key"], res["geojson_dissolved"],
+                                                    res.pop("geojson_bytes"))
+            blobs["geojson_dissolved"] = res["geojson_key"]
+        size = estimate_size({k: v for k, v in res.items() if k != "geojson_dissolved"})
+        return store.put(key, res, size=size, blobs=blobs, persist=persist)
+
+    return store.get_or_create(key, _build)
+
+
+def clinics_in(hosp_df: pd.DataFrame, hosp_index: dict, match_key: str | None, sp_cd: str) -> pd.DataFrame:
+    """(지역, 과목) 의원 행 — 전체 스캔 대신 사전 인덱스의 행 위치로 조회. match_key=None 이면 전체 지역"""
+    if match_key is None:
+        parts = [v for (_, cd), v in hosp_index["rows_by_key"].items() if cd == sp_cd]
+        pos = np.sort(np.concatenate(parts)) if parts else None
+    else:
+        pos = hosp_index["rows_by_key"].get((match_key, sp_cd))
+    return hosp_df.iloc[pos] if pos is not None else hosp_df.iloc[0:0]
@@ -2,10 +2,11 @@
 동 단위 데이터 병합 및 포화도 지수 산출 모듈
 """
 
+import functools
 import os
-import sqlite3
 import warnings
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import geopandas as gpd
@@ -13,6 +14,9 @@ import numpy as np
 import pandas as pd
 from shapely.geometry import Point
 
+from modules.db import connect_local, read_sql
+from modules.tracing import Tracer
+
 warnings.filterwarnings("ignore", category=UserWarning)
 
 _NATIONAL_GEOJSON = Path(__file__).parent.parent / "data" / "geojson" / "national_dong.geojson"
@@ -25,9 +29,34 @@ def _get_conn():
     if SUPABASE_DB_URL:
         import psycopg2
         return psycopg2.connect(SUPABASE_DB_URL)
-    return sqlite3.connect(_DB_PATH)
+    return connect_local(_DB_PATH)
 
 def _get_hira_to_pop_map():
+    """
+    HIRA 시군구코드 → 인구 시군구코드(5자리).
+    region_crosswalk(데이터 기반, create_local_db.py 생성)가 있으면 사용하고,
+    없으면 수기 매핑 HIRA_SGG_MAP으로 폴백.
+    """
+    try:
+        conn = _get_conn()
+        try:
+            xw = read_sql(
+                """
+                SELECT hira_sggu_cd, pop_sgg_cd, COUNT(*) AS n
+                FROM region_crosswalk
+                WHERE hira_sggu_cd IS NOT NULL
+                GROUP BY hira_sggu_cd, pop_sgg_cd
+                """,
+                conn,
+            )
+        finally:
+            conn.close()
+        if not xw.empty:
+            # 하나의 HIRA 코드가 여러 인구 시군구에 걸치면 행정동 수가 가장 많은 쪽 채택
+            xw = xw.sort_values("n", ascending=False).drop_duplicates("hira_sggu_cd")
+            return dict(zip(xw["hira_sggu_cd"].astype(str), xw["pop_sgg_cd"].astype(str)))
+    except Exception:
+        pass
     from modules.hospital_api import HIRA_SGG_MAP
     return {str(v): str(k) for k, v in HIRA_SGG_MAP.items()}
 
@@ -46,163 +75,255 @@ def _safe_val(row, col):
     return val
 
 # ── 아파트 평당가 보강 ─────────────────────────────────────────────────────────
-def enrich_with_apt_price(si_df: pd.DataFrame, analysis_level: str) -> pd.DataFrame:
+# analysis_level → match_key 길이 (hjd_cd 앞 N자리)
+_MK_LEN = {"dong": 10, "sido": 5, "national": 2}
+
+_PRICE_COLS = ["avg_price_per_pyeong", "med_price_per_pyeong",
+               "p25_price_per_pyeong", "p75_price_per_pyeong"]
+
+
+def _read_price_rows(conn) -> tuple[pd.DataFrame, bool]:
+    """
+    행정동(hjd_cd)별로 묶을 법정동 단위 아파트 거래 원본 행 → (DataFrame, 스케치 여부).
+    apt_price_sketch 가 있으면 법정동·월 스케치 행, 없으면 apt_price_bjd 행(price_sum 계산)을 반환합니다.
     """
-    si_df에 avg_price_per_pyeong (아파트 평당가, 만원/평) 컬럼을 추가.
+    try:
+        sk = read_sql(
+            """
+            SELECT DISTINCT r.hjd_cd, s.bjd_cd, s.ym, s.trade_count, s.price_sum, s.sketch
+            FROM region_code_mapping r
+            JOIN apt_price_sketch s ON r.bjd_cd = s.bjd_cd
+            WHERE r.hjd_cd IS NOT NULL AND LENGTH(r.hjd_cd) = 10
+            """,
+            conn,
+        )
+        return sk, True
+    except Exception:
+        try:
+            conn.rollback()  # PostgreSQL: 실패한 트랜잭션 해제 후 폴백 쿼리 실행
+        except Exception:
+            pass  # DuckDB: 실패한 조회는 트랜잭션을 남기지 않음
+
+    bjd = read_sql(
+        """
+        SELECT DISTINCT r.hjd_cd, a.bjd_cd, a.avg_price_per_pyeong, a.trade_count
+        FROM region_code_mapping r
+        JOIN apt_price_bjd a ON r.bjd_cd = a.bjd_cd
+        WHERE r.hjd_cd IS NOT NULL AND LENGTH(r.hjd_cd) = 10
+        """,
+        conn,
+    )
+    bjd["price_sum"] = bjd["avg_price_per_pyeong"] * bjd["trade_count"]
+    return bjd, False
+
+
+def _price_stats_from_rows(rows: pd.DataFrame, has_sketch: bool, mk_len: int,
+                           quantiles: bool = True) -> pd.DataFrame:
+    """
+    _read_price_rows 결과 → hjd_cd 앞 mk_len자리(match_key)별 평당가 통계.
+    같은 법정동이 한 match_key 안의 여러 행정동에 걸쳐 있어도 한 번만 합산합니다.
+    quantiles=False 면 분위수(스케치 병합)를 생략하고 거래량 가중 평균만 계산합니다.
+    """
+    rows = rows.assign(match_key=rows["hjd_cd"].astype(str).str[:mk_len])
+    rows = rows.drop_duplicates(["match_key", "bjd_cd", "ym"] if has_sketch else ["match_key", "bjd_cd"])
+
+    out = rows.groupby("match_key", as_index=False)[["price_sum", "trade_count"]].sum()
+    out["avg_price_per_pyeong"] = (out["price_sum"] / out["trade_count"]).round(0)
+    out = out.rename(columns={"trade_count": "apt_trade_count"})
+    if not (has_sketch and quantiles):
+        return out[["match_key", "avg_price_per_pyeong", "apt_trade_count"]]
+
+    from modules.price_sketch import explode_sketches, sketch_quantiles
+    q = sketch_quantiles(explode_sketches(rows, "match_key"), "match_key")
+    q = q.rename(columns={"q25": "p25_price_per_pyeong", "q50": "med_price_per_pyeong",
+                          "q75": "p75_price_per_pyeong"})
+    for col in ["med_price_per_pyeong", "p25_price_per_pyeong", "p75_price_per_pyeong"]:
+        q[col] = q[col].round(0)
+    out = out.merge(q, on="match_key", how="left")
+    return out[["match_key"] + _PRICE_COLS + ["apt_trade_count"]]
+
+
+def _load_price_stats(conn, mk_len: int) -> pd.DataFrame:
+    """
+    hjd_cd 앞 mk_len자리(match_key)별 아파트 평당가 통계.
+
+    apt_price_sketch(법정동·월 스케치)가 있으면 match_key 단위로 스케치를 병합하여
+    거래량 가중 평균 + 중위/25%/75% 분위수를 산출합니다.
+    스케치 테이블이 없으면 apt_price_bjd 기반 거래량 가중 평균만 반환합니다.
+
+    Returns: DataFrame[match_key, avg/med/p25/p75_price_per_pyeong, apt_trade_count]
+    """
+    rows, has_sketch = _read_price_rows(conn)
+    return _price_stats_from_rows(rows, has_sketch, mk_len)
+
+
+def _minmax_score(v: pd.Series, lo: float, hi: float) -> pd.Series:
+    """[lo, hi] → 0~100 (모든 값이 같으면 중간값 50)"""
+    if not hi > lo:
+        return pd.Series(50.0, index=v.index)
+    return (v - lo) / (hi - lo) * 100
+
+
+def enrich_with_apt_price(si_df: pd.DataFrame, analysis_level: str,
+                          stats: pd.DataFrame | None = None) -> pd.DataFrame:
+    """
+    si_df에 아파트 평당가(만원/평) 컬럼을 추가.
+      avg_price_per_pyeong             : 거래량 가중 평균
+      med/p25/p75_price_per_pyeong     : 분위수 (apt_price_sketch 있을 때만)
+      apt_trade_count                  : 거래 건수
     apt_price_bjd 테이블이 없거나 오류 발생 시 원본 DataFrame 그대로 반환.
 
     조인 체인:
-      dong    : si_df.match_key(10자리 hjd_cd) → region_code_mapping.hjd_cd → bjd_cd → apt_price_bjd
-      sido    : si_df.match_key(5자리 sgg)      → hjd_cd[:5] 기준 평균
-      national: si_df.match_key(2자리 sido)     → hjd_cd[:2] 기준 평균
+      dong    : si_df.match_key(10자리 hjd_cd) → region_code_mapping.hjd_cd → bjd_cd → apt_price_*
+      sido    : si_df.match_key(5자리 sgg)      → hjd_cd[:5] 기준 스케치 병합
+      national: si_df.match_key(2자리 sido)     → hjd_cd[:2] 기준 스케치 병합
+    stats: 미리 계산한 _load_price_stats 결과 (없으면 DB 에서 계산 — load_price_tables 참고)
     """
     try:
-        conn = _get_conn()
-        # apt_price_bjd 테이블 존재 여부 확인 (SQLite/PostgreSQL 공통 방식)
-        try:
-            price_map = pd.read_sql_query(
-                """
-                SELECT r.hjd_cd,
-                       CAST(
-                           SUM(a.avg_price_per_pyeong * a.trade_count) * 1.0
-                           / SUM(a.trade_count)
-                       AS INTEGER) AS avg_price_per_pyeong
-                FROM region_code_mapping r
-                JOIN apt_price_bjd a ON r.bjd_cd = a.bjd_cd
-                WHERE r.hjd_cd IS NOT NULL AND LENGTH(r.hjd_cd) = 10
-                GROUP BY r.hjd_cd
-                """,
-                conn,
-            )
-        except Exception:
+        if stats is None:
+            conn = _get_conn()
+            try:
+                stats = _load_price_stats(conn, _MK_LEN.get(analysis_level, 10))
+            except Exception:
+                conn.close()
+                return si_df
             conn.close()
-            return si_df
-        conn.close()
 
-        price_map["hjd_cd"] = price_map["hjd_cd"].astype(str)
+        stats = stats.assign(match_key=stats["match_key"].astype(str))
         df = si_df.copy()
-
-        if analysis_level == "dong":
-            merge_df = price_map.rename(columns={"hjd_cd": "match_key"})
-            df = df.merge(merge_df, on="match_key", how="left")
-
-        elif analysis_level == "sido":
-            # match_key = 5자리 sgg 코드 → hjd_cd 앞 5자리로 집계
-            price_map["mk5"] = price_map["hjd_cd"].str[:5]
-            sgg_agg = (
-                price_map.groupby("mk5", as_index=False)["avg_price_per_pyeong"]
-                .mean()
-                .round(0)
-            )
-            sgg_agg["avg_price_per_pyeong"] = sgg_agg["avg_price_per_pyeong"].astype(int)
-            sgg_agg = sgg_agg.rename(columns={"mk5": "match_key"})
-            df = df.merge(sgg_agg, on="match_key", how="left")
-
-        elif analysis_level == "national":
-            # match_key = 2자리 sido 코드 → hjd_cd 앞 2자리로 집계
-            price_map["mk2"] = price_map["hjd_cd"].str[:2]
-            sido_agg = (
-                price_map.groupby("mk2", as_index=False)["avg_price_per_pyeong"]
-                .mean()
-                .round(0)
-            )
-            sido_agg["avg_price_per_pyeong"] = sido_agg["avg_price_per_pyeong"].astype(int)
-            sido_agg = sido_agg.rename(columns={"mk2": "match_key"})
-            df = df.merge(sido_agg, on="match_key", how="left")
-
-        return df
+        df["match_key"] = df["match_key"].astype(str)
+        return df.merge(stats, on="match_key", how="left")
 
     except Exception:
         return si_df
 
 
 # ── 개비공 소득지수 산출 ────────────────────────────────────────────────────────
-def calc_income_index(si_df: pd.DataFrame, analysis_level: str) -> pd.DataFrame:
+def income_grade_table(conn, analysis_level: str,
+                       price_rows: tuple[pd.DataFrame, bool] | None = None) -> pd.DataFrame:
     """
-    개비공 소득지수 산출 및 S/A/B/C/D 등급 부여.
+    전국 match_key별 개비공 복합지수·등급표 (분석 지역과 무관 — 레벨마다 한 번 계산해 재사용 가능).
 
-    복합지수 = 평당가_로그스코어 × 0.7 + 경제활동연령비율_스코어 × 0.3
-    전국 전체 데이터 기준으로 정규화 → 분석 지역과 무관하게 일관된 등급 체계.
-    아파트 거래 데이터 없는 동(avg_price_per_pyeong IS NULL or 0)은 income_grade=None.
+    평당가 로그 정규화의 min/max 는 행정동 단위 평당가 분포 기준(기존 등급 체계 유지)이고,
+    sgg/sido 단위 평당가는 행정동 점수의 평균이 아닌 거래량 가중 평균 평당가를 같은 척도로 환산합니다.
+    경제활동연령비율 점수는 행정동 점수의 평균입니다.
+    price_rows: 이미 읽은 _read_price_rows 결과 (없으면 conn 으로 조회)
+
+    Returns: DataFrame[mk, composite, income_grade]
     """
-    if "avg_price_per_pyeong" not in si_df.columns:
-        return si_df
-    try:
-        conn = _get_conn()
+    mk_len = _MK_LEN.get(analysis_level, 10)
+
+    # 1) 행정동별·레벨별 거래량 가중평균 평당가 (원본 행은 한 번만 조회)
+    rows, has_sketch = price_rows if price_rows is not None else _read_price_rows(conn)
+    price_dong = _price_stats_from_rows(rows, has_sketch, 10, quantiles=False)
+    price_all = (price_dong if mk_len == 10 else _price_stats_from_rows(rows, has_sketch, mk_len, quantiles=False))
+    price_all = price_all.rename(columns={"match_key": "mk", "avg_price_per_pyeong": "price"})[["mk", "price"]]
+
+    # 2) 전국 행정동별 경제활동 연령 비율 (30~59세 / total_pop)
+    age_all = read_sql(
+        """
+        SELECT adm_cd,
+               CAST(age_30_39 + age_40_49 + age_50_59 AS DOUBLE PRECISION)
+               / NULLIF(total_pop, 0) AS active_ratio
+        FROM population_age
+        WHERE total_pop > 0
+        """,
+        conn,
+    )
+
+    # 3) 로그 정규화 (평당가 — 고왜도 완화, 행정동 분포 기준 min-max)
+    def _log_p(v):
+        return np.log2(v.clip(lower=1).astype(float))
+
+    dong_log = _log_p(price_dong["avg_price_per_pyeong"].dropna())
+    price_all["price_score"] = _minmax_score(_log_p(price_all["price"]), dong_log.min(), dong_log.max())
+
+    # 4) 경제활동 비율 min-max 정규화
+    age_all["active_score"] = _minmax_score(age_all["active_ratio"],
+                                            age_all["active_ratio"].min(), age_all["active_ratio"].max())
+
+    # 5) match_key 생성 (analysis_level에 따라 앞 N자리)
+    age_all["mk"] = age_all["adm_cd"].astype(str).str[:mk_len]
+
+    # 6) 집계 (평당가는 1)에서 레벨 단위로 산출됨, 연령비율은 여러 행정동 평균)
+    price_agg = price_all[["mk", "price_score"]]
+    age_agg   = age_all.groupby("mk")["active_score"].mean().reset_index()
+
+    # 7) 복합 지수
+    global_df = price_agg.merge(age_agg, on="mk", how="outer")
+    global_df["composite"] = (
+        global_df["price_score"].fillna(0) * 0.7 +
+        global_df["active_score"].fillna(0) * 0.3
+    )
+
+    # 8) 전국 기준 quintile 분위수 → S/A/B/C/D
+    valid_comp = global_df["composite"].dropna()
+    t20, t40, t60, t80 = valid_comp.quantile([0.2, 0.4, 0.6, 0.8]).values
+
+    def _grade(v):
+        if pd.isna(v):
+            return None
+        if v >= t80:
+            return "S"
+        if v >= t60:
+            return "A"
+        if v >= t40:
+            return "B"
+        if v >= t20:
+            return "C"
+        return "D"
 
-        # 1) 전국 hjd_cd별 가중평균 평당가
-        price_all = pd.read_sql_query(
-            """
-            SELECT r.hjd_cd,
-                   CAST(SUM(a.avg_price_per_pyeong * a.trade_count) * 1.0
-                        / SUM(a.trade_count) AS INTEGER) AS price
-            FROM region_code_mapping r
-            JOIN apt_price_bjd a ON r.bjd_cd = a.bjd_cd
-            WHERE r.hjd_cd IS NOT NULL AND LENGTH(r.hjd_cd) = 10
-            GROUP BY r.hjd_cd
-            """,
-            conn,
-        )
+    global_df["income_grade"] = global_df["composite"].apply(_grade)
+    return global_df[["mk", "composite", "income_grade"]]
 
-        # 2) 전국 행정동별 경제활동 연령 비율 (30~59세 / total_pop)
-        age_all = pd.read_sql_query(
-            """
-            SELECT adm_cd,
-                   CAST(age_30_39 + age_40_49 + age_50_59 AS REAL)
-                   / NULLIF(total_pop, 0) AS active_ratio
-            FROM population_age
-            WHERE total_pop > 0
-            """,
-            conn,
-        )
+
+def load_price_tables(analysis_level: str) -> tuple[pd.DataFrame | None, pd.DataFrame | None]:
+    """
+    (평당가 통계, 소득 등급표) — enrich_with_apt_price(stats=...)·calc_income_index(grade_table=...) 용.
+    둘 다 전국 기준이라 분석 지역과 무관하므로, 같은 레벨의 여러 지역을 분석할 때 한 번만 계산해 재사용합니다.
+    평당가 원본 행은 한 번만 조회합니다. 계산에 실패한 쪽은 None (해당 보강 생략 — 기존과 같은 결과).
+    """
+    try:
+        conn = _get_conn()
+    except Exception:
+        return None, None
+    try:
+        try:
+            price_rows = _read_price_rows(conn)
+            stats = _price_stats_from_rows(*price_rows, _MK_LEN.get(analysis_level, 10))
+        except Exception:
+            return None, None
+        try:
+            grade_table = income_grade_table(conn, analysis_level, price_rows=price_rows)
+        except Exception:
+            grade_table = None
+        return stats, grade_table
+    finally:
         conn.close()
 
-        # 3) 로그 정규화 (평당가 — 고왜도 완화)
-        price_all["log_p"] = np.log2(price_all["price"].clip(lower=1).astype(float))
-        p_min, p_max = price_all["log_p"].min(), price_all["log_p"].max()
-        price_all["price_score"] = (price_all["log_p"] - p_min) / (p_max - p_min) * 100
-
-        # 4) 경제활동 비율 min-max 정규화
-        r_min, r_max = age_all["active_ratio"].min(), age_all["active_ratio"].max()
-        age_all["active_score"] = (age_all["active_ratio"] - r_min) / (r_max - r_min) * 100
-
-        # 5) match_key 생성 (analysis_level에 따라 앞 N자리)
-        mk_len = {"dong": 10, "sido": 5, "national": 2}.get(analysis_level, 10)
-        price_all["mk"] = price_all["hjd_cd"].str[:mk_len]
-        age_all["mk"]   = age_all["adm_cd"].str[:mk_len]
-
-        # 6) 집계 (sido/national은 여러 행정동 평균)
-        price_agg = price_all.groupby("mk")["price_score"].mean().reset_index()
-        age_agg   = age_all.groupby("mk")["active_score"].mean().reset_index()
-
-        # 7) 복합 지수
-        global_df = price_agg.merge(age_agg, on="mk", how="outer")
-        global_df["composite"] = (
-            global_df["price_score"].fillna(0) * 0.7 +
-            global_df["active_score"].fillna(0) * 0.3
-        )
 
-        # 8) 전국 기준 quintile 분위수 → S/A/B/C/D
-        valid_comp = global_df["composite"].dropna()
-        t20, t40, t60, t80 = valid_comp.quantile([0.2, 0.4, 0.6, 0.8]).values
+def calc_income_index(si_df: pd.DataFrame, analysis_level: str,
+                      grade_table: pd.DataFrame | None = None) -> pd.DataFrame:
+    """
+    개비공 소득지수 산출 및 S/A/B/C/D 등급 부여.
 
-        def _grade(v):
-            if pd.isna(v):
-                return None
-            if v >= t80:
-                return "S"
-            if v >= t60:
-                return "A"
-            if v >= t40:
-                return "B"
-            if v >= t20:
-                return "C"
-            return "D"
-
-        global_df["income_grade"] = global_df["composite"].apply(_grade)
+    복합지수 = 평당가_로그스코어 × 0.7 + 경제활동연령비율_스코어 × 0.3
+    전국 전체 데이터 기준으로 정규화 → 분석 지역과 무관하게 일관된 등급 체계 (income_grade_table).
+    아파트 거래 데이터 없는 동(avg_price_per_pyeong IS NULL or 0)은 income_grade=None.
+    grade_table: 미리 계산한 income_grade_table 결과 (없으면 DB 에서 계산)
+    """
+    if "avg_price_per_pyeong" not in si_df.columns:
+        return si_df
+    try:
+        if grade_table is None:
+            conn = _get_conn()
+            try:
+                grade_table = income_grade_table(conn, analysis_level)
+            finally:
+                conn.close()
 
         # 9) si_df에 조인
-        grade_map = global_df.set_index("mk")[["composite", "income_grade"]]
+        grade_map = grade_table.set_index("mk")[["composite", "income_grade"]]
         df = si_df.copy()
         df["income_score"] = df["match_key"].map(grade_map["composite"])
         df["income_grade"] = df["match_key"].map(grade_map["income_grade"])
@@ -256,8 +377,235 @@ def calc_saturation_index(merged_df: pd.DataFrame, num_col: str, den_col: str) -
     df["saturation_level"] = df.apply(_level, axis=1)
     return df
 
-def map_hospitals_to_dong(hospital_df: pd.DataFrame, geojson_path: str | Path = _DEFAULT_GEOJSON) -> pd.DataFrame:
-    gdf_dong = gpd.read_file(geojson_path)
+# ── PostgreSQL 서버측 포화도 집계 ──────────────────────────────────────────────
+# 병원×과목 행을 내려받지 않고 match_key 산출 · 인구 조인 · SI_raw · 평균 정규화를 SQL 에서 수행
+# → 지역×과목당 1행만 전송. 병원→행정동 배정은 hospital_dong 테이블 사용
+#   (migrate_to_supabase.py 가 같은 경계 파일로 map_hospitals_to_dong 결과를 적재).
+# match_key 규칙은 DataMerger._map_hospitals 의 _finalize_key 와 같음.
+
+# 분자 컬럼 → (population_house h / population_age a) 컬럼 합
+_POP_NUM_COLS = {
+    "총인구수":     ["h.total_pop"],
+    "세대수":       ["h.households"],
+    "20세이하인구": ["a.age_0_9", "a.age_10_19"],
+    "20_40세인구":  ["a.age_20_29", "a.age_30_39"],
+    "40_60세인구":  ["a.age_40_49", "a.age_50_59"],
+    "60세이상인구": ["a.age_60_69", "a.age_70_79", "a.age_80_89", "a.age_90_99", "a.age_100_plus"],
+}
+
+
+def _pg_num(col: str) -> str:
+    """숫자·문자 컬럼 모두 float8 로 (빈 값 0)"""
+    return f"COALESCE(NULLIF(({col})::text, '')::float8, 0)"
+
+
+def _pg_float(v: float) -> str:
+    return "'Infinity'::float8" if v == float("inf") else repr(float(v))
+
+
+def saturation_sql_pg(analysis_level: str, num_col: str, den_col: str) -> str:
+    """
+    서버측 포화도 집계 SQL (psycopg2 %s 파라미터).
+    파라미터 순서: 인구 조건(dong·sido 2개, national 시도 앞 2자리 배열 1개),
+                   HIRA 시도 코드 배열, 종별 코드 배열, 과목 코드 배열, 과목 코드 배열
+    결과: match_key, specialty_cd, clinic_count, specialist_count, SI_raw, SI_normalized, saturation_level
+    """
+    if num_col not in _POP_NUM_COLS or den_col not in ("clinic_count", "specialist_count"):
+        raise ValueError(f"서버측 집계 미지원 컬럼: {num_col} / {den_col}")
+    num = " + ".join(_pg_num(c) for c in _POP_NUM_COLS[num_col])
+    pop_from = "population_house h LEFT JOIN population_age a ON a.adm_cd = h.adm_cd"
+
+    ctes = []
+    if analysis_level == "dong":
+        # 시군구 내 행정동 (population_api lv=3 과 같은 조건)
+        ctes.append(f"""pop AS (
+            SELECT h.adm_cd AS mk, SUM({num}) AS n FROM {pop_from}
+            WHERE h.adm_cd LIKE %s AND h.adm_cd <> %s GROUP BY 1)""")
+        mk_adm = "h2.pref || substr(h2.adm, 3, 8)"
+        mk_fallback = "NULL"
+    elif analysis_level == "sido":
+        # 시도 내 시군구 목록(get_sgg_list) → 행정동 합계를 구→시 통합 키로 집계
+        ctes.append("""sgg AS (
+            SELECT DISTINCT substr(adm_cd, 1, 5) AS c5 FROM population_house
+            WHERE adm_cd LIKE %s AND adm_cd <> %s)""")
+        ctes.append(f"""pop AS (
+            SELECT CASE WHEN substr(h.adm_cd, 1, 4) || '0' IN (SELECT c5 FROM sgg)
+                        THEN substr(h.adm_cd, 1, 4) || '0' ELSE substr(h.adm_cd, 1, 5) END AS mk,
+                   SUM({num}) AS n
+            FROM {pop_from}
+            WHERE substr(h.adm_cd, 1, 5) IN (SELECT c5 FROM sgg) AND h.adm_cd <> substr(h.adm_cd, 1, 5) || '00000'
+            GROUP BY 1)""")
+        mk_adm = """CASE WHEN h2.pref || substr(h2.adm, 3, 2) || '0' IN (SELECT c5 FROM sgg)
+                         THEN h2.pref || substr(h2.adm, 3, 2) || '0' ELSE h2.pref || substr(h2.adm, 3, 3) END"""
+        mk_fallback = "xw.pop_sgg_cd"
+    else:
+        # 시도별 시군구 행 합계 (population_api lv=2)
+        ctes.append(f"""pop AS (
+            SELECT substr(h.adm_cd, 1, 2) AS mk, SUM({num}) AS n FROM {pop_from}
+            WHERE right(h.adm_cd, 5) = '00000' AND h.adm_cd <> substr(h.adm_cd, 1, 2) || '00000000'
+              AND substr(h.adm_cd, 1, 2) = ANY(%s)
+            GROUP BY 1)""")
+        mk_adm = "h2.pref"
+        mk_fallback = "substr(xw.pop_sgg_cd, 1, 2)"
+
+    # HIRA 시군구 → 인구 시군구 (행정동 수가 가장 많은 쪽, _get_hira_to_pop_map 과 같음)
+    ctes.append("""xw AS (
+        SELECT DISTINCT ON (hira_sggu_cd) hira_sggu_cd::text AS hira_sggu_cd, pop_sgg_cd::text AS pop_sgg_cd
+        FROM (SELECT hira_sggu_cd, pop_sgg_cd, COUNT(*) AS n FROM region_crosswalk
+              WHERE hira_sggu_cd IS NOT NULL GROUP BY 1, 2) t
+        ORDER BY hira_sggu_cd, n DESC)""")
+    ctes.append("""h1 AS (
+        SELECT s.dgsbjt_cd::text AS specialty_cd, i.sigungu_cd::text AS sggu,
+               NULLIF(d.adm_cd2::text, '') AS adm,
+               COALESCE(trunc(CASE WHEN s.dr_cnt::text ~ '^\\s*[-+]?[0-9]*\\.?[0-9]+\\s*$'
+                                   THEN s.dr_cnt::text::numeric END), 0) AS dr
+        FROM hospital_info i
+        JOIN hospital_specialty s ON s.ykiho = i.ykiho
+        LEFT JOIN hospital_dong d ON d.ykiho = i.ykiho
+        WHERE i.sido_cd::text = ANY(%s) AND i.cl_cd::text = ANY(%s) AND s.dgsbjt_cd::text = ANY(%s))""")
+    ctes.append("""h2 AS (
+        SELECT h1.*, CASE WHEN left(adm, 5) = '41000' THEN '36' WHEN left(adm, 2) = '42' THEN '51'
+                          WHEN left(adm, 2) = '45' THEN '52' ELSE left(adm, 2) END AS pref
+        FROM h1)""")
+    ctes.append(f"""hs AS (
+        SELECT CASE WHEN h2.adm IS NOT NULL THEN {mk_adm} ELSE {mk_fallback} END AS mk, h2.specialty_cd,
+               COUNT(*) AS clinic_count, SUM(h2.dr) AS specialist_count
+        FROM h2 LEFT JOIN xw ON xw.hira_sggu_cd = h2.sggu
+        GROUP BY 1, 2)""")
+    ctes.append("""j AS (
+        SELECT pop.mk, sp.cd, pop.n,
+               COALESCE(hs.clinic_count, 0)::bigint AS clinic_count,
+               COALESCE(hs.specialist_count, 0)::bigint AS specialist_count
+        FROM pop CROSS JOIN unnest(%s::text[]) AS sp(cd)
+        LEFT JOIN hs ON hs.mk = pop.mk AND hs.specialty_cd = sp.cd)""")
+    # calc_saturation_index 와 같은 규칙: n=0 → 0, d=0 → ∞, 정규화는 유한값 평균 기준 (과목별 창)
+    ctes.append(f"""si AS (
+        SELECT j.*, CASE WHEN n = 0 THEN 0::float8 WHEN {den_col} = 0 THEN 'Infinity'::float8
+                         ELSE n / {den_col} END AS si_raw
+        FROM j)""")
+    ctes.append("""nm AS (
+        SELECT si.*, COALESCE(AVG(NULLIF(si_raw, 'Infinity'::float8)) OVER (PARTITION BY cd), 1.0) AS mean_si
+        FROM si)""")
+    ctes.append("""nz AS (
+        SELECT nm.*, CASE WHEN si_raw = 'Infinity'::float8 THEN 3.0
+                          WHEN mean_si > 0 THEN si_raw / mean_si ELSE 1.0 END AS si_norm
+        FROM nm)""")
+    levels = " ".join(f"WHEN si_norm >= {lo} AND si_norm < {_pg_float(hi)} THEN '{name}'"
+                      for name, (lo, hi) in SATURATION_LEVELS.items())
+    return "WITH " + ",\n".join(ctes) + f"""
+    SELECT mk AS match_key, cd AS specialty_cd, clinic_count, specialist_count,
+           si_raw AS "SI_raw", si_norm AS "SI_normalized",
+           CASE WHEN n = 0 THEN '데이터없음' WHEN {den_col} = 0 THEN '여유' {levels} ELSE '포화' END AS saturation_level
+    FROM nz"""
+
+
+def calc_saturation_pg(conn, sgg_cd_pop: str, hira_sido_cd: str, specialty_codes: list[str],
+                       cl_codes: list[str] | None, num_col: str, den_col: str, analysis_level: str) -> pd.DataFrame:
+    """서버측 집계 실행 → DataFrame[match_key, specialty_cd, clinic_count, specialist_count, SI_raw, SI_normalized, saturation_level]"""
+    from modules.hospital_api import HIRA_SIDO_CODES
+    from modules.population_api import SIDO_CODES
+
+    if analysis_level == "dong":
+        pop_params = [f"{sgg_cd_pop[:5]}%", f"{sgg_cd_pop[:5]}00000"]
+    elif analysis_level == "sido":
+        pop_params = [f"{sgg_cd_pop[:2]}%00000", f"{sgg_cd_pop[:2]}00000000"]
+    else:
+        pop_params = [[c[:2] for c in SIDO_CODES.values()]]
+    sido_cds = list(HIRA_SIDO_CODES.values()) if analysis_level == "national" else [hira_sido_cd]
+    cl_codes = list(cl_codes) if cl_codes else ["31", "21", "11"]  # get_hospitals_multi 기본값과 같음
+    params = pop_params + [sido_cds, cl_codes, list(specialty_codes), list(specialty_codes)]
+    df = read_sql(saturation_sql_pg(analysis_level, num_col, den_col), conn, params=params)
+    for col in ["clinic_count", "specialist_count"]:
+        df[col] = df[col].astype("int64")
+    df["match_key"] = df["match_key"].astype(str)
+    return df
+
+
+def attach_saturation(pop_df: pd.DataFrame, sat_rows: pd.DataFrame, specialty_cd: str) -> pd.DataFrame:
+    """서버측 집계 결과를 인구 표에 붙임 — merge_with_population + calc_saturation_index 와 같은 컬럼 구성"""
+    rows = sat_rows[sat_rows["specialty_cd"] == specialty_cd].drop(columns="specialty_cd")
+    df = pop_df.copy()
+    df["match_key"] = df["match_key"].astype(str)
+    df = df.merge(rows, on="match_key", how="left")
+    for col in ["clinic_count", "specialist_count"]:
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype(int)
+    return df
+
+
+# ── PostGIS 공간 연산 (선택, config.USE_POSTGIS) ──────────────────────────────
+# migrate_to_supabase.py --postgis 가 행정동 경계를 dong_boundary(geometry, GiST 인덱스)에 적재하고
+# hospital_dong 을 ST_Within 으로 산출 → 앱 서버는 경계 파일 없이 SQL 결과만 받음
+
+def postgis_enabled() -> bool:
+    from config import SUPABASE_DB_URL, USE_POSTGIS
+    return bool(SUPABASE_DB_URL) and USE_POSTGIS
+
+
+# standardize_code 와 같은 규칙 (세종 41000→36, 강원 42→51, 전북 45→52)
+_PG_STD_CODE = """CASE WHEN left(adm_cd2, 5) = '41000' THEN '36' || substr(adm_cd2, 6)
+                       WHEN left(adm_cd2, 2) = '42' THEN '51' || substr(adm_cd2, 3)
+                       WHEN left(adm_cd2, 2) = '45' THEN '52' || substr(adm_cd2, 3) ELSE adm_cd2 END"""
+
+
+def map_hospitals_to_dong_pg(hospital_df: pd.DataFrame) -> pd.DataFrame:
+    """map_hospitals_to_dong 과 같은 결과 형태 — adm_cd2 를 hospital_dong(PostGIS 산출)에서 조회"""
+    hospital_df = hospital_df.copy()
+    if hospital_df.empty or "ykiho" not in hospital_df.columns:
+        hospital_df["adm_cd2"] = None
+        return hospital_df
+    conn = _get_conn()
+    try:
+        dong = read_sql("SELECT ykiho, adm_cd2 FROM hospital_dong WHERE ykiho = ANY(%s)", conn,
+                        params=[hospital_df["ykiho"].astype(str).unique().tolist()])
+    finally:
+        conn.close()
+    return hospital_df.drop(columns="adm_cd2", errors="ignore").merge(dong, on="ykiho", how="left")
+
+
+def dissolve_boundaries_pg(analysis_level: str, prefix: str = "", sgg_codes=()) -> dict:
+    """
+    analysis.load_data 의 경계 dissolve 를 SQL(ST_Union)로 수행.
+    national: 시도(앞 2자리), sido: 구→시 통합 시군구 키 (prefix 시도만)
+    Returns: GeoJSON FeatureCollection dict (properties.adm_cd2 = dissolve_key)
+    """
+    if analysis_level == "national":
+        key, where, params = "left(adm_cd2, 2)", "", []
+    else:
+        key = "CASE WHEN left(adm_cd2, 4) || '0' = ANY(%s) THEN left(adm_cd2, 4) || '0' ELSE left(adm_cd2, 5) END"
+        where, params = "WHERE left(dissolve_key, 2) = %s", [sorted(sgg_codes), prefix[:2]]
+    sql = f"""
+    WITH b AS (SELECT {_PG_STD_CODE} AS adm_cd2, geom FROM dong_boundary),
+         k AS (SELECT {key} AS dissolve_key, geom FROM b)
+    SELECT dissolve_key, ST_AsGeoJSON(ST_Union(geom)) AS geometry
+    FROM k {where}
+    GROUP BY dissolve_key
+    ORDER BY dissolve_key
+    """
+    conn = _get_conn()
+    try:
+        df = read_sql(sql, conn, params=params or None)
+    finally:
+        conn.close()
+    return {"type": "FeatureCollection", "features": [
+        {"id": str(i), "type": "Feature", "properties": {"dissolve_key": k, "adm_cd2": k}, "geometry": json.loads(g)}
+        for i, (k, g) in enumerate(zip(df["dissolve_key"], df["geometry"]))]}
+
+
+@functools.lru_cache(maxsize=4)
+def _read_dong_polygons(path: str, mtime: float) -> gpd.GeoDataFrame:
+    return gpd.read_file(path)[["adm_cd2", "adm_nm", "geometry"]]
+
+def _dong_polygons(geojson_path: str | Path) -> tuple[gpd.GeoDataFrame, bool]:
+    """행정동 경계 (파일 경로·수정시각 기준 프로세스 캐시) → (GeoDataFrame, 캐시 적중 여부)"""
+    path = Path(geojson_path)
+    hits = _read_dong_polygons.cache_info().hits
+    gdf = _read_dong_polygons(str(path), path.stat().st_mtime)
+    return gdf, _read_dong_polygons.cache_info().hits > hits
+
+def map_hospitals_to_dong(hospital_df: pd.DataFrame, geojson_path: str | Path = _DEFAULT_GEOJSON,
+                          gdf_dong: gpd.GeoDataFrame | None = None) -> pd.DataFrame:
+    if gdf_dong is None:
+        gdf_dong, _ = _dong_polygons(geojson_path)
     hospital_df = hospital_df.copy()
     for col in ["XPos", "YPos"]:
         if col not in hospital_df.columns: hospital_df[col] = 0.0
@@ -276,138 +624,322 @@ def map_hospitals_to_dong(hospital_df: pd.DataFrame, geojson_path: str | Path =
     combined = combined.loc[:, ~combined.columns.duplicated(keep="first")]
     return combined
 
-class DataMerger:
-    def __init__(self, geojson_path: str | Path = _DEFAULT_GEOJSON):
-        self.geojson_path = Path(geojson_path)
+def _standard_adm_cd(adm: str) -> str:
+    """경계 파일 행정동 코드 → 인구 데이터 코드 체계 (세종 41000→36, 강원 42→51, 전북 45→52)"""
+    if adm.startswith("41000"): return "36" + adm[2:]
+    if adm.startswith("42"): return "51" + adm[2:]
+    if adm.startswith("45"): return "52" + adm[2:]
+    return adm
 
-    def run(self, sgg_cd_pop: str, hira_sido_cd: str, sgg_name: str = "", specialty_codes: list[str] | None = None,
-            year_month: str = "202412", cl_codes: list[str] | None = None,
-            num_col: str = "총인구수", den_col: str = "clinic_count",
-            analysis_level: str = "dong") -> dict:
-        from modules.population_api import PopulationAPIClient, SIDO_CODES
-        from modules.hospital_api import HospitalAPIClient, HIRA_SIDO_CODES, HIRA_SGG_MAP, HOSPITAL_COLUMNS
+def build_hospital_index(hosp_df: pd.DataFrame) -> dict:
+    """
+    병원 목록 조회용 사전 인덱스 (결과 산출 시 1회 생성)
+      specialties_by_ykiho: ykiho → 정렬된 진료과목명 리스트 (상세 팝업)
+      rows_by_key: (match_key, specialty_cd) → hosp_df 행 위치 배열 (지도 핀·의원 목록)
+    """
+    index = {"specialties_by_ykiho": {}, "rows_by_key": {}}
+    if hosp_df.empty or "ykiho" not in hosp_df.columns:
+        return index
+    if "specialty_nm" in hosp_df.columns:
+        sp = hosp_df[["ykiho", "specialty_nm"]].dropna().drop_duplicates().sort_values("specialty_nm")
+        index["specialties_by_ykiho"] = sp.groupby("ykiho")["specialty_nm"].agg(list).to_dict()
+    if "match_key" in hosp_df.columns and "specialty_cd" in hosp_df.columns:
+        keys = hosp_df[["match_key", "specialty_cd"]].reset_index(drop=True)
+        keys["match_key"] = keys["match_key"].where(keys["match_key"].isna(), keys["match_key"].astype(str))
+        index["rows_by_key"] = keys.groupby(["match_key", "specialty_cd"]).indices
+    return index
 
-        pop_client = PopulationAPIClient()
-        hosp_client = HospitalAPIClient()
-        hira_to_pop = _get_hira_to_pop_map()
+class DataMerger:
+    def __init__(self, geojson_path: str | Path = _DEFAULT_GEOJSON, max_workers: int | None = None):
+        """
+        max_workers: 인구·병원 조회 동시 실행 수 (None 이면 config.FETCH_WORKERS)
+        """
+        self.geojson_path = Path(geojson_path)
+        self._price_tables: dict[str, tuple] = {}  # analysis_level → load_price_tables 결과 (인스턴스 수명 동안 재사용)
+        if max_workers is None:
+            from config import FETCH_WORKERS
+            max_workers = FETCH_WORKERS
+        self.max_workers = max(1, max_workers)
+
+    # ── 1. 인구 데이터 수집 ────────────────────────────────────────────────────
+    def _collect_population(self, tracer: Tracer, pool: ThreadPoolExecutor, report, pop_client,
+                            sgg_cd_pop: str, year_month: str, analysis_level: str) -> tuple[pd.DataFrame, set, dict]:
+        """
+        Returns: (pop_df, existing_sgg_codes, city_name_lookup)
+        national/sido 의 시도·시군구별 조회는 pool 에서 동시에 실행하고, 결과는 대상 순서대로 합칩니다.
+        """
+        from modules.population_api import SIDO_CODES
 
         # sido _finalize_key에서 사용할 구→시 코드 집합 (non-sido 경우 빈 집합)
         existing_sgg_codes: set = set()
         city_name_lookup: dict = {}
 
-        # 1. 인구 데이터 수집
-        if analysis_level in ["national", "sido"]:
-            targets = SIDO_CODES.items() if analysis_level == "national" else [("", sgg_cd_pop)]
-            if analysis_level == "sido":
-                sgg_list = pop_client.get_sgg_list(sgg_cd_pop)
-                targets = [(row["sggNm"], row["admmCd"]) for _, row in sgg_list.iterrows()]
-                # sido 전용: 구→시 통합 룩업 빌드
-                existing_sgg_codes = set(str(r["admmCd"])[:5] for _, r in sgg_list.iterrows())
-                for _, r in sgg_list.iterrows():
-                    c10 = str(r["admmCd"])
-                    c5 = c10[:4] + "0"
-                    if c10[:5] == c5:  # 5번째 자리 == "0" → city-level entry
-                        city_name_lookup[c5] = r["sggNm"]
-            frames = []
-            for idx, (name, code) in enumerate(targets):
-                try:
-                    # national: sido 코드 → lv="2"(시군구 레벨) 사용
-                    # sido:     sgg 코드  → lv="3"(행정동 레벨) 사용
-                    _lv = "2" if analysis_level == "national" else "3"
-                    df = pop_client.get_merged(code, year_month, lv=_lv)
-                except Exception:
-                    continue  # 개별 구/시도 실패 시 건너뛰고 계속 진행
-                if not df.empty:
-                    for c in df.columns:
-                        if c not in ["admmCd", "행정동명", "통계년월", "시도명", "시군구명", "match_key"]:
-                            df[c] = pd.to_numeric(df[c], errors='coerce').fillna(0)
-                    num_df = df.select_dtypes(include=['number'])
-                    if num_df.empty: continue
-                    summ = num_df.sum().to_frame().T
-                    if analysis_level == "national":
-                        summ["행정동명"] = name if name else df["시도명"].iloc[0]
-                        summ["match_key"] = str(code)[:2]
-                    else:  # sido
-                        city_5 = str(code)[:4] + "0"
-                        if city_5 in existing_sgg_codes:
-                            summ["match_key"] = city_5
-                            summ["행정동명"] = city_name_lookup.get(city_5, name)
-                        else:
-                            summ["match_key"] = str(code)[:5]
+        with tracer.stage("population") as rec:
+            if analysis_level in ["national", "sido"]:
+                targets = SIDO_CODES.items() if analysis_level == "national" else [("", sgg_cd_pop)]
+                if analysis_level == "sido":
+                    sgg_list = pop_client.get_sgg_list(sgg_cd_pop)
+                    targets = [(row["sggNm"], row["admmCd"]) for _, row in sgg_list.iterrows()]
+                    # sido 전용: 구→시 통합 룩업 빌드
+                    existing_sgg_codes = set(str(r["admmCd"])[:5] for _, r in sgg_list.iterrows())
+                    for _, r in sgg_list.iterrows():
+                        c10 = str(r["admmCd"])
+                        c5 = c10[:4] + "0"
+                        if c10[:5] == c5:  # 5번째 자리 == "0" → city-level entry
+                            city_name_lookup[c5] = r["sggNm"]
+                targets = list(targets)
+                # national: sido 코드 → lv="2"(시군구 레벨) 사용
+                # sido:     sgg 코드  → lv="3"(행정동 레벨) 사용
+                _lv = "2" if analysis_level == "national" else "3"
+                futures = [pool.submit(pop_client.get_merged, code, year_month, lv=_lv) for _, code in targets]
+                frames = []
+                for idx, ((name, code), fut) in enumerate(zip(targets, futures)):
+                    try:
+                        df = fut.result()
+                    except Exception as e:
+                        tracer.error("population", e, target=str(code))
+                        continue  # 개별 구/시도 실패 시 건너뛰고 계속 진행
+                    finally:
+                        report("population", (idx + 1) / len(targets))
+                    if not df.empty:
+                        for c in df.columns:
+                            if c not in ["admmCd", "행정동명", "통계년월", "시도명", "시군구명", "match_key"]:
+                                df[c] = pd.to_numeric(df[c], errors='coerce').fillna(0)
+                        num_df = df.select_dtypes(include=['number'])
+                        if num_df.empty: continue
+                        summ = num_df.sum().to_frame().T
+                        if analysis_level == "national":
                             summ["행정동명"] = name if name else df["시도명"].iloc[0]
-                    summ["admmCd"] = str(code)
-                    frames.append(summ)
-            pop_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
-            # sido 분석: 같은 match_key 행 집계 (구→시 통합, 부천시 코드 불일치 포함)
-            if not pop_df.empty and analysis_level == "sido":
-                num_cols = pop_df.select_dtypes(include='number').columns.tolist()
-                name_first = pop_df.groupby("match_key")["행정동명"].first()
-                pop_df = pop_df.groupby("match_key", as_index=False)[num_cols].sum()
-                pop_df["행정동명"] = pop_df["match_key"].map(name_first)
-        else:
-            pop_df = pop_client.get_merged(sgg_cd_pop, year_month, lv="3")
-            if not pop_df.empty:
-                pop_df["match_key"] = pop_df["admmCd"].astype(str)
-
-        # 2. 병원 데이터 수집 (DB 직접 조회)
-        # DB는 sido_cd 단위로 조회 후 spatial join(GPS)으로 행정동 배정
-        # → HIRA_SGG_MAP 기반 sgg 코드 루프 불필요 (Excel 코드와 불일치 문제 해결)
-        h_frames = []
-        if analysis_level == "national":
-            for sido_cd in HIRA_SIDO_CODES.values():
-                try:
-                    df = hosp_client.get_hospitals_multi(sido_cd, sgg_cd=None, specialty_codes=specialty_codes, cl_codes=cl_codes)
-                    if not df.empty: h_frames.append(df)
-                except: pass
-        else:
-            # sido / dong 공통: sido_cd 한 번에 조회, sgg 구분은 spatial join이 처리
+                            summ["match_key"] = str(code)[:2]
+                        else:  # sido
+                            city_5 = str(code)[:4] + "0"
+                            if city_5 in existing_sgg_codes:
+                                summ["match_key"] = city_5
+                                summ["행정동명"] = city_name_lookup.get(city_5, name)
+                            else:
+                                summ["match_key"] = str(code)[:5]
+                                summ["행정동명"] = name if name else df["시도명"].iloc[0]
+                        summ["admmCd"] = str(code)
+                        frames.append(summ)
+                pop_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+                # sido 분석: 같은 match_key 행 집계 (구→시 통합, 부천시 코드 불일치 포함)
+                if not pop_df.empty and analysis_level == "sido":
+                    num_cols = pop_df.select_dtypes(include='number').columns.tolist()
+                    name_first = pop_df.groupby("match_key")["행정동명"].first()
+                    pop_df = pop_df.groupby("match_key", as_index=False)[num_cols].sum()
+                    pop_df["행정동명"] = pop_df["match_key"].map(name_first)
+            else:
+                pop_df = pop_client.get_merged(sgg_cd_pop, year_month, lv="3")
+                if not pop_df.empty:
+                    pop_df["match_key"] = pop_df["admmCd"].astype(str)
+            report("population", 1.0)
+            rec["rows_out"] = len(pop_df)
+        return pop_df, existing_sgg_codes, city_name_lookup
+
+    # ── 2. 병원 데이터 수집 ────────────────────────────────────────────────────
+    def _collect_hospitals(self, tracer: Tracer, pool: ThreadPoolExecutor, report, hosp_client,
+                           hira_sido_cd: str, specialty_codes, cl_codes, analysis_level: str,
+                           hospitals: pd.DataFrame | None) -> pd.DataFrame:
+        """
+        DB는 sido_cd 단위로 조회 후 spatial join(GPS)으로 행정동 배정
+        → HIRA_SGG_MAP 기반 sgg 코드 루프 불필요 (Excel 코드와 불일치 문제 해결)
+        national 의 시도별 조회는 pool 에서 동시에 실행합니다.
+        """
+        from modules.hospital_api import HIRA_SIDO_CODES, HOSPITAL_COLUMNS
+
+        with tracer.stage("hospitals", cache="shared" if hospitals is not None else None) as rec:
+            h_frames = []
+            if hospitals is not None:
+                h_frames.append(hospitals)
+            else:
+                # sido / dong 은 sido_cd 한 번에 조회, sgg 구분은 spatial join이 처리
+                sido_cds = list(HIRA_SIDO_CODES.values()) if analysis_level == "national" else [hira_sido_cd]
+                futures = [pool.submit(hosp_client.get_hospitals_multi, sido_cd, sgg_cd=None,
+                                       specialty_codes=specialty_codes, cl_codes=cl_codes) for sido_cd in sido_cds]
+                for idx, (sido_cd, fut) in enumerate(zip(sido_cds, futures)):
+                    try:
+                        df = fut.result()
+                        if not df.empty: h_frames.append(df)
+                    except Exception as e:
+                        tracer.error("hospitals", e, sido_cd=sido_cd)
+                    report("hospitals", (idx + 1) / len(sido_cds))
+
+            # h_frames가 비어있으면 컬럼 스키마를 보존한 빈 DataFrame 사용 (pd.DataFrame()은 컬럼 없음)
+            hosp_all = pd.concat(h_frames, ignore_index=True) if h_frames else pd.DataFrame(columns=HOSPITAL_COLUMNS)
+            report("hospitals", 1.0)
+            rec["rows_out"] = len(hosp_all)
+        return hosp_all
+
+    # ── 서버측 집계 (PostgreSQL) ─────────────────────────────────────────────
+    def _aggregate_on_server(self, tracer: Tracer, report, sgg_cd_pop: str, hira_sido_cd: str, specialty_codes,
+                             cl_codes, num_col: str, den_col: str, analysis_level: str) -> pd.DataFrame | None:
+        """calc_saturation_pg 실행. 실패(hospital_dong 미적재 등)하면 기록 후 None → 호출측이 pandas 경로로 폴백"""
+        with tracer.stage("server_aggregate") as rec:
             try:
-                df = hosp_client.get_hospitals_multi(hira_sido_cd, sgg_cd=None, specialty_codes=specialty_codes, cl_codes=cl_codes)
-                if not df.empty: h_frames.append(df)
-            except: pass
-        
-        # h_frames가 비어있으면 컬럼 스키마를 보존한 빈 DataFrame 사용 (pd.DataFrame()은 컬럼 없음)
-        hosp_all = pd.concat(h_frames, ignore_index=True) if h_frames else pd.DataFrame(columns=HOSPITAL_COLUMNS)
-
-        # 3. 매핑 및 집계
-        hosp_mapped = map_hospitals_to_dong(hosp_all, self.geojson_path)
-        
+                conn = _get_conn()
+                try:
+                    sat_rows = calc_saturation_pg(conn, sgg_cd_pop, hira_sido_cd, specialty_codes, cl_codes,
+                                                  num_col, den_col, analysis_level)
+                finally:
+                    conn.close()
+            except Exception as e:
+                tracer.error("server_aggregate", e)
+                return None
+            rec["rows_out"] = len(sat_rows)
+        report("hospitals", 1.0)
+        return sat_rows
+
+    # ── 3. 매핑 및 집계 ────────────────────────────────────────────────────────
+    def _map_hospitals(self, tracer: Tracer, report, hosp_all: pd.DataFrame, hospitals: pd.DataFrame | None,
+                       analysis_level: str, existing_sgg_codes: set, hira_to_pop: dict) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """Returns: (hosp_mapped, hosp_summary) — 병원별 match_key 배정 후 (지역, 과목) 집계"""
+        with tracer.stage("mapping", rows_in=len(hosp_all)) as rec:
+            if hospitals is not None:
+                rec["cache"] = "shared"
+                hosp_mapped = hosp_all.copy()
+            elif postgis_enabled():
+                rec["cache"] = "postgis"
+                hosp_mapped = map_hospitals_to_dong_pg(hosp_all)
+            else:
+                gdf_dong, hit = _dong_polygons(self.geojson_path)
+                rec["cache"] = "hit" if hit else "miss"
+                hosp_mapped = map_hospitals_to_dong(hosp_all, self.geojson_path, gdf_dong=gdf_dong)
+            rec["rows_out"] = int(hosp_mapped["adm_cd2"].notna().sum()) if "adm_cd2" in hosp_mapped.columns else 0
+        report("mapping", 0.5)
+    
         def _finalize_key(row):
             adm = str(_safe_val(row, "adm_cd2")) if pd.notna(_safe_val(row, "adm_cd2")) else ""
             if adm:
-                if adm.startswith("41000"): pref = "36"
-                elif adm.startswith("42"): pref = "51"
-                elif adm.startswith("45"): pref = "52"
-                else: pref = adm[:2]
+                adm = _standard_adm_cd(adm)
+                pref = adm[:2]
                 if analysis_level == "national": return pref
                 if analysis_level == "sido":
                     city_5 = pref + adm[2:4] + "0"
                     return city_5 if city_5 in existing_sgg_codes else pref + adm[2:5]
                 return pref + adm[2:10]
-            
+        
             p_sgg = hira_to_pop.get(str(_safe_val(row, "sgguCd")))
             if p_sgg:
                 if analysis_level == "national": return str(p_sgg[:2])
                 if analysis_level == "sido": return str(p_sgg)
             return None
 
-        # 중복 컬럼 방어 처리 (geopandas sjoin 후 발생 가능)
-        if hosp_mapped.columns.duplicated().any():
-            hosp_mapped = hosp_mapped.loc[:, ~hosp_mapped.columns.duplicated(keep="first")]
-        _key_result = hosp_mapped.apply(_finalize_key, axis=1)
-        if isinstance(_key_result, pd.DataFrame):
-            _key_result = _key_result.iloc[:, 0]
-        hosp_mapped["match_key"] = _key_result
-        hosp_summary = hosp_mapped.dropna(subset=["match_key"]).groupby(["match_key", "specialty_cd", "specialty_nm"], as_index=False).agg(
-            clinic_count=("ykiho", "count"), specialist_count=("mdeptSdrCnt", "sum")
-        )
+        with tracer.stage("finalize_key", rows_in=len(hosp_mapped)) as rec:
+            # 중복 컬럼 방어 처리 (geopandas sjoin 후 발생 가능)
+            if hosp_mapped.columns.duplicated().any():
+                hosp_mapped = hosp_mapped.loc[:, ~hosp_mapped.columns.duplicated(keep="first")]
+            _key_result = hosp_mapped.apply(_finalize_key, axis=1)
+            if isinstance(_key_result, pd.DataFrame):
+                _key_result = _key_result.iloc[:, 0]
+            hosp_mapped["match_key"] = _key_result
+            hosp_summary = hosp_mapped.dropna(subset=["match_key"]).groupby(["match_key", "specialty_cd", "specialty_nm"], as_index=False).agg(
+                clinic_count=("ykiho", "count"), specialist_count=("mdeptSdrCnt", "sum")
+            )
+            rec["rows_out"] = int(hosp_mapped["match_key"].notna().sum())
+        report("mapping", 1.0)
+        return hosp_mapped, hosp_summary
+
+    def run(self, sgg_cd_pop: str, hira_sido_cd: str, sgg_name: str = "", specialty_codes: list[str] | None = None,
+            year_month: str = "202412", cl_codes: list[str] | None = None,
+            num_col: str = "총인구수", den_col: str = "clinic_count",
+            analysis_level: str = "dong", progress=None, hospitals: pd.DataFrame | None = None,
+            summary_only: bool = False) -> dict:
+        """
+        progress: 선택. progress(stage, fraction) 형태로 단계별 진행률(0~1)을 받는 콜백
+                  stage ∈ "population", "hospitals", "mapping", "indices"
+                  (인구·병원 단계는 동시에 진행되므로 두 단계의 보고가 섞여 들어옴)
+        hospitals: 선택. 이미 조회·공간 매핑된 병원 목록 (hira_sido_cd 시도 전체, map_hospitals_to_dong 결과).
+                   주면 병원 조회·공간 매핑을 건너뜀 — 같은 시도의 여러 시군구를 연달아 분석할 때 재사용
+        summary_only: 지역별 포화도만 필요할 때(병원 목록·hospital_index 불필요) True.
+                   Supabase(PostgreSQL) 사용 시 집계를 서버에서 수행해 지역×과목 행만 전송하고
+                   (calc_saturation_pg), 실패하면 기존 pandas 경로로 폴백.
+                   반환 "hospitals" 는 빈 표, "hospital_index" 는 빈 인덱스 (생성 생략)
+        평당가 통계·소득 등급표(전국 기준)는 레벨마다 인스턴스에 한 번만 읽어 두고 재사용합니다
+        — 같은 인스턴스로 여러 지역을 연달아 분석할 때(scripts/batch_report.py) 지역마다 다시 읽지 않음.
+        반환 dict 의 "timings" 에 단계별 소요 시간·행 수 기록 (modules.tracing)
+
+        1·2단계(인구·병원 조회)는 서로 독립이라 동시에 실행하며, 그 안의 시도·시군구별 조회도
+        max_workers 크기의 스레드 풀에서 병렬로 실행합니다 (SQLite·Supabase 모두 호출마다 별도 연결).
+        개별 조회 실패는 tracer.error 로 기록하고 나머지로 계속 진행합니다.
+        """
+        from config import SUPABASE_DB_URL
+        from modules.population_api import PopulationAPIClient
+        from modules.hospital_api import HospitalAPIClient, HOSPITAL_COLUMNS
+
+        def _report(stage: str, fraction: float) -> None:
+            if progress is not None:
+                progress(stage, min(max(fraction, 0.0), 1.0))
+
+        tracer = Tracer("DataMerger.run")
+        pop_client = PopulationAPIClient()
+        hosp_client = HospitalAPIClient()
+
+        # 조회 작업은 fetch_pool(크기 제한)에서만 실행하고, 단계 조율은 별도 스레드 2개가 맡음
+        # → 조율 스레드가 조회 작업 자리를 차지하지 않으므로 풀 크기와 무관하게 교착 없음
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="merge-fetch") as fetch_pool, \
+                ThreadPoolExecutor(max_workers=2, thread_name_prefix="merge-stage") as stage_pool:
+            xw_future = fetch_pool.submit(_get_hira_to_pop_map)
+            if summary_only and hospitals is None and SUPABASE_DB_URL:
+                sat_future = stage_pool.submit(self._aggregate_on_server, tracer, _report, sgg_cd_pop, hira_sido_cd,
+                                               specialty_codes, cl_codes, num_col, den_col, analysis_level)
+                hosp_future = None
+            else:
+                sat_future = None
+                hosp_future = stage_pool.submit(self._collect_hospitals, tracer, fetch_pool, _report, hosp_client,
+                                                hira_sido_cd, specialty_codes, cl_codes, analysis_level, hospitals)
+            pop_future = stage_pool.submit(self._collect_population, tracer, fetch_pool, _report, pop_client,
+                                           sgg_cd_pop, year_month, analysis_level)
+            pop_df, existing_sgg_codes, city_name_lookup = pop_future.result()
+            sat_rows = sat_future.result() if sat_future is not None else None
+            if sat_rows is None:
+                hosp_all = hosp_future.result() if hosp_future is not None else \
+                    self._collect_hospitals(tracer, fetch_pool, _report, hosp_client, hira_sido_cd,
+                                            specialty_codes, cl_codes, analysis_level, None)
+            hira_to_pop = xw_future.result()
+
+        if sat_rows is not None:
+            # 3. 서버측 집계 결과 사용 — 병원 행은 내려받지 않음
+            hosp_mapped = pd.DataFrame(columns=HOSPITAL_COLUMNS + ["adm_cd2", "match_key"])
+            hosp_summary = sat_rows.loc[sat_rows["clinic_count"] > 0,
+                                        ["match_key", "specialty_cd", "clinic_count", "specialist_count"]].reset_index(drop=True)
+            _report("mapping", 1.0)
+        else:
+            hosp_mapped, hosp_summary = self._map_hospitals(tracer, _report, hosp_all, hospitals, analysis_level,
+                                                            existing_sgg_codes, hira_to_pop)
 
         # 4. 결과 산출 + 아파트 평당가 보강
-        results = {cd: calc_saturation_index(merge_with_population(pop_df, hosp_summary, cd), num_col, den_col) for cd in specialty_codes}
-        results = {
-            cd: calc_income_index(enrich_with_apt_price(df, analysis_level), analysis_level)
-            for cd, df in results.items()
-        }
+        frames = {}
+        for idx, cd in enumerate(specialty_codes):
+            _report("indices", idx / (len(specialty_codes) + 1))
+            with tracer.stage(f"saturation:{cd}", rows_in=len(pop_df)) as rec:
+                if sat_rows is not None:
+                    frames[cd] = attach_saturation(pop_df, sat_rows, cd)
+                else:
+                    frames[cd] = calc_saturation_index(merge_with_population(pop_df, hosp_summary, cd), num_col, den_col)
+                rec["rows_out"] = len(frames[cd])
+        # 보강은 match_key 기준 행 단위 조인 → 과목별 결과를 쌓아 한 번에 (평당가·소득 기준표 1회 조회)
+        with tracer.stage("enrich", rows_in=sum(len(df) for df in frames.values())) as rec:
+            stacked = pd.concat([df.assign(_sp_cd=cd) for cd, df in frames.items()], ignore_index=True) \
+                if frames else pd.DataFrame(columns=["match_key", "_sp_cd"])
+            rec["cache"] = "hit" if analysis_level in self._price_tables else "miss"
+            if rec["cache"] == "miss":
+                self._price_tables[analysis_level] = load_price_tables(analysis_level)
+            stats, grade_table = self._price_tables[analysis_level]
+            if stats is not None:
+                stacked = enrich_with_apt_price(stacked, analysis_level, stats=stats)
+                if grade_table is not None:
+                    stacked = calc_income_index(stacked, analysis_level, grade_table=grade_table)
+            results = {cd: stacked[stacked["_sp_cd"] == cd].drop(columns="_sp_cd").reset_index(drop=True)
+                       for cd in frames}
+            rec["rows_out"] = len(stacked)
+        _report("indices", 1.0)
+        if summary_only:
+            # 지역별 포화도만 반환 — 병원 목록·조회 인덱스는 만들지 않음
+            hosp_mapped, hosp_index = hosp_mapped.iloc[0:0], build_hospital_index(hosp_mapped.iloc[0:0])
+        else:
+            with tracer.stage("hospital_index", rows_in=len(hosp_mapped)):
+                hosp_index = build_hospital_index(hosp_mapped)
         return {"population": pop_df, "hospitals": hosp_mapped, "hospital_summary": hosp_summary,
+                "hospital_index": hosp_index,
                 "saturation": results, "analysis_level": analysis_level,
-                "sgg_codes": existing_sgg_codes}
+                "sgg_codes": existing_sgg_codes, "timings": tracer.records}
@@ -0,0 +1,115 @@
+"""
+로컬 DB 연결 헬퍼 (SQLite / DuckDB)
+
+scripts/build_snapshot.py 가 만든 서빙용 스냅샷(saturation.snapshot.db)이 원본보다 최신이면
+읽기 전용·immutable(잠금 없음)·mmap 모드로 열고, 없으면 원본 DB를 일반 모드로 엽니다.
+스냅샷은 항상 새 파일로 만든 뒤 원자적으로 교체되므로, 이미 열린 연결은 이전 파일을 계속 읽습니다.
+
+config.LOCAL_DB_ENGINE="duckdb" 이면 scripts/build_parquet.py 가 만든 Parquet 파일(data/parquet/)을
+DuckDB(열 지향·임베디드)로 조회합니다. 테이블명은 같은 이름의 뷰로 노출되므로 SQL 은 그대로입니다.
+"""
+
+import functools
+import json
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+
+from modules import query_profiler
+
+BASE_DIR = Path(__file__).parent.parent
+DB_PATH = BASE_DIR / "data" / "saturation.db"
+
+# 읽기 전용 연결의 메모리 맵 크기 (DB 파일보다 크면 전체가 매핑됨)
+MMAP_SIZE = 512 * 1024 * 1024
+
+
+def snapshot_path(db_path: str | Path = DB_PATH) -> Path:
+    """saturation.db → saturation.snapshot.db"""
+    return Path(db_path).with_suffix(".snapshot.db")
+
+
+def parquet_dir(db_path: str | Path = DB_PATH) -> Path:
+    """data/saturation.db → data/parquet/ (DuckDB 백엔드용 테이블별 Parquet)"""
+    return Path(db_path).parent / "parquet"
+
+
+PARQUET_MANIFEST = "_manifest.json"
+
+
+def _fresh_snapshot(db_path: Path) -> Path | None:
+    snap = snapshot_path(db_path)
+    if not snap.exists():
+        return None
+    if db_path.exists() and snap.stat().st_mtime < db_path.stat().st_mtime:
+        return None  # 원본 재구축 후 스냅샷 미갱신 → 원본 사용
+    return snap
+
+
+def connect_sqlite(db_path: str | Path = DB_PATH) -> sqlite3.Connection:
+    """스냅샷 우선 SQLite 연결. 둘 다 없으면 FileNotFoundError."""
+    db_path = Path(db_path)
+    snap = _fresh_snapshot(db_path)
+    if snap is not None:
+        conn = sqlite3.connect(f"{snap.as_uri()}?mode=ro&immutable=1", uri=True,
+                               check_same_thread=False)
+        conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        return conn
+    if not db_path.exists():
+        raise FileNotFoundError(f"로컬 DB를 찾을 수 없습니다: {db_path}")
+    return sqlite3.connect(db_path)
+
+
+@functools.lru_cache(maxsize=2)
+def _duckdb_database(directory: str, manifest_mtime: int):
+    """Parquet 디렉터리 → 테이블별 뷰를 둔 인메모리 DuckDB (프로세스당 1개, 재빌드 시 새로 생성)"""
+    import duckdb
+    manifest = json.loads((Path(directory) / PARQUET_MANIFEST).read_text(encoding="utf-8"))
+    db = duckdb.connect(":memory:")
+    for table in manifest["tables"]:
+        path = (Path(directory) / f"{table}.parquet").as_posix().replace("'", "''")
+        db.execute(f'CREATE VIEW "{table}" AS SELECT * FROM read_parquet(\'{path}\')')
+    return db
+
+
+def connect_duckdb(directory: str | Path) -> "duckdb.DuckDBPyConnection":
+    """
+    DuckDB 연결 (같은 인메모리 DB 의 커서 — 스레드마다 따로 열어도 뷰·메타데이터 공유).
+    Parquet 이 없으면 FileNotFoundError.
+    """
+    manifest = Path(directory) / PARQUET_MANIFEST
+    if not manifest.exists():
+        raise FileNotFoundError(f"Parquet 데이터를 찾을 수 없습니다: {directory} "
+                                "(python scripts/build_parquet.py 를 먼저 실행하세요)")
+    return _duckdb_database(str(Path(directory).resolve()), manifest.stat().st_mtime_ns).cursor()
+
+
+def connect_local(db_path: str | Path = DB_PATH):
+    """로컬 모드 연결 — config.LOCAL_DB_ENGINE 이 "duckdb" 면 Parquet(DuckDB), 아니면 SQLite(스냅샷 우선)"""
+    from config import LOCAL_DB_ENGINE
+    if LOCAL_DB_ENGINE == "duckdb":
+        return connect_duckdb(parquet_dir(db_path))
+    return connect_sqlite(db_path)
+
+
+def is_duckdb(conn) -> bool:
+    return type(conn).__module__.lstrip("_").startswith("duckdb")  # 확장 모듈명은 "_duckdb"
+
+
+def execute_sql(query: str, conn, params=None) -> pd.DataFrame:
+    """pd.read_sql_query 와 동일. DuckDB 는 자체 DataFrame 변환(열 단위)을 사용"""
+    if is_duckdb(conn):
+        return conn.execute(query, params or []).df()
+    return pd.read_sql_query(query, conn, params=params)
+
+
+def read_sql(query: str, conn, params=None) -> pd.DataFrame:
+    """
+    데이터 모듈 공용 조회 (pd.read_sql_query 와 동일).
+    쿼리 프로파일러(modules/query_profiler.py)가 켜져 있으면 시간·행 수·실행계획 대상으로 기록합니다.
+    """
+    prof = query_profiler.active()
+    if prof is None:
+        return execute_sql(query, conn, params)
+    return prof.read_sql(query, conn, params)
@@ -2,10 +2,11 @@
 건강보험심사평가원 병의원 데이터 수집 모듈 (로컬 DB버전)
 """
 
-import sqlite3
 import pandas as pd
 import os
 
+from modules.db import connect_local, read_sql
+
 # DB 경로 설정
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DB_PATH = os.path.join(BASE_DIR, 'data', 'saturation.db')
@@ -15,12 +16,11 @@ def _get_conn():
     if SUPABASE_DB_URL:
         import psycopg2
         return psycopg2.connect(SUPABASE_DB_URL)
-    if not os.path.exists(DB_PATH):
-        raise FileNotFoundError(f"로컬 DB를 찾을 수 없습니다: {DB_PATH}")
-    return sqlite3.connect(DB_PATH)
+    # 서빙 스냅샷이 있으면 읽기 전용·immutable·mmap 모드로 연결 (LOCAL_DB_ENGINE=duckdb 면 Parquet)
+    return connect_local(DB_PATH)
 
 def _ph():
-    """플레이스홀더: SQLite=?, PostgreSQL=%s"""
+    """플레이스홀더: SQLite·DuckDB=?, PostgreSQL=%s"""
     from config import SUPABASE_DB_URL
     return "%s" if SUPABASE_DB_URL else "?"
 
@@ -57,7 +57,9 @@ HOSPITAL_COLUMNS = [
     "estbDd",
 ]
 
-# 인구API 시군구 코드(앞5자리) → HIRA 시군구 코드(6자리) 매핑 테이블 유지는 필요하지만, DB에서 시군구 코드를 뽑아낼 수도 있습니다. (하위 호환성을 위해 남겨둠)
+# 인구API 시군구 코드(앞5자리) → HIRA 시군구 코드(6자리) 수기 매핑.
+# create_local_db.py가 데이터에서 생성하는 region_crosswalk 테이블이 우선이며,
+# 이 사전은 region_crosswalk가 없는 구 DB용 폴백으로만 사용됩니다.
 HIRA_SGG_MAP = {
     "11110": "110016", "11140": "110017", "11170": "110014", "11200": "110011",
     "11215": "110023", "11230": "110007", "11260": "110019", "11290": "110012",
@@ -162,7 +164,7 @@ class HospitalAPIClient:
             params.append(sgg_cd)
             
         with _get_conn() as conn:
-            df = pd.read_sql_query(query, conn, params=params)
+            df = read_sql(query, conn, params=params)
             
         if df.empty:
             return pd.DataFrame(columns=HOSPITAL_COLUMNS)
@@ -216,7 +218,7 @@ class HospitalAPIClient:
             params.append(sgg_cd)
             
         with _get_conn() as conn:
-            df = pd.read_sql_query(query, conn, params=params)
+            df = read_sql(query, conn, params=params)
             
         if df.empty:
             return pd.DataFrame(columns=HOSPITAL_COLUMNS)
@@ -230,21 +232,26 @@ class HospitalAPIClient:
 
     def get_sgg_list(self, sido_cd: str) -> dict[str, str]:
         # sido_cd (심평원 시도코드) 에 속하는 시군구를 반환
-        query = f"SELECT DISTINCT sigungu_cd, addr FROM hospital_info WHERE sido_cd = {_ph()}"
+        # sgg_nm: 적재 시 주소 2번째 단어("서울특별시 종로구 ..." → "종로구")로 저장된 컬럼
+        p = _ph()
         with _get_conn() as conn:
-            df = pd.read_sql_query(query, conn, params=[sido_cd])
-            
+            try:
+                df = read_sql(
+                    f"SELECT DISTINCT sigungu_cd, sgg_nm FROM hospital_info WHERE sido_cd = {p}",
+                    conn, params=[sido_cd])
+            except Exception:
+                # 구 DB 호환: sgg_nm 컬럼 없음 → 주소에서 추출
+                try:
+                    conn.rollback()  # PostgreSQL: 실패한 트랜잭션 해제
+                except Exception:
+                    pass  # DuckDB: 활성 트랜잭션 없음
+                df = read_sql(
+                    f"SELECT DISTINCT sigungu_cd, addr FROM hospital_info WHERE sido_cd = {p}",
+                    conn, params=[sido_cd])
+                df["sgg_nm"] = df["addr"].astype(str).str.split().str[1]
+
+        df = df.dropna(subset=["sgg_nm"])
+        df = df[df["sgg_nm"] != ""]
         if df.empty:
             return {}
-            
-        res = {}
-        for _, row in df.iterrows():
-            cd = str(row['sigungu_cd'])
-            addr = str(row['addr'])
-            # 주소에서 "서울특별시 종로구 어쩌고" -> "종로구" 추출
-            parts = addr.split()
-            if len(parts) > 1:
-                sgg_nm = parts[1]
-                res[sgg_nm] = cd
-                
-        return res
+        return dict(zip(df["sgg_nm"], df["sigungu_cd"].astype(str)))
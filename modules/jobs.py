@@ -0,0 +1,97 @@
+"""
+백그라운드 분석 작업 큐
+
+전국 분석처럼 오래 걸리는 실행을 Streamlit 스크립트 밖의 작업 스레드 풀에서 돌립니다.
+세션은 작업 id 만 들고 진행률을 주기적으로 조회하므로, 실행 중 새로고침하거나
+다른 세션에서 같은 분석을 요청해도 작업이 버려지거나 중복 실행되지 않습니다.
+
+작업 함수 fn(progress) 는 progress(stage, fraction) 으로 단계별 진행률(0~1)을 보고하고,
+결과는 직접 결과 저장소에 넣습니다 (큐는 상태만 관리).
+"""
+
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+# 분석 단계 (DataMerger.run 4단계 + 앱의 경계 dissolve)
+JOB_STAGES = ("population", "hospitals", "mapping", "indices", "geometry")
+
+
+class JobQueue:
+    def __init__(self, max_workers: int = 1, keep: int = 50):
+        """
+        max_workers: 동시에 실행할 작업 수
+        keep: 완료·실패 작업 기록 보관 개수 (오래된 것부터 삭제)
+        """
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis-job")
+        self._lock = threading.Lock()
+        self._jobs: OrderedDict[str, dict] = OrderedDict()
+        self._active_by_key: dict[str, str] = {}
+        self._keep = keep
+
+    def submit(self, key: str, fn: Callable[[Callable[[str, float], None]], None]) -> str:
+        """같은 key 의 작업이 대기·실행 중이면 새로 만들지 않고 그 작업 id 를 반환"""
+        with self._lock:
+            active = self._active_by_key.get(key)
+            if active is not None:
+                return active
+            job_id = uuid.uuid4().hex[:12]
+            self._jobs[job_id] = {
+                "id": job_id, "key": key, "status": "queued",
+                "stages": {s: 0.0 for s in JOB_STAGES}, "reported": set(), "stage": None,
+                "error": None, "submitted": time.time(), "started": None, "finished": None,
+            }
+            self._active_by_key[key] = job_id
+            self._trim()
+        self._pool.submit(self._run, job_id, fn)
+        return job_id
+
+    def get(self, job_id: str) -> dict | None:
+        """작업 상태 스냅샷 (복사본)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return {**job, "stages": dict(job["stages"]), "reported": set(job["reported"])} if job else None
+
+    def find(self, key: str) -> dict | None:
+        """key 로 대기·실행 중인 작업 조회"""
+        with self._lock:
+            job_id = self._active_by_key.get(key)
+        return self.get(job_id) if job_id else None
+
+    def _run(self, job_id: str, fn) -> None:
+        def progress(stage: str, fraction: float) -> None:
+            with self._lock:
+                job = self._jobs[job_id]
+                if stage in job["stages"]:
+                    # 보고 없이 지나간 앞 단계는 완료로 간주 (건너뛴 단계가 0% 로 남지 않도록)
+                    # — 동시에 진행 중인 단계(인구·병원 조회)는 자체 보고를 유지
+                    for s in JOB_STAGES[:JOB_STAGES.index(stage)]:
+                        if s not in job["reported"]:
+                            job["stages"][s] = 1.0
+                    job["stages"][stage] = fraction
+                    job["reported"].add(stage)
+                job["stage"] = stage
+
+        with self._lock:
+            job = self._jobs[job_id]
+            job["status"], job["started"] = "running", time.time()
+        try:
+            fn(progress)
+            status, error = "done", None
+        except Exception as e:
+            status, error = "failed", f"{e}\n{traceback.format_exc()}"
+        with self._lock:
+            job = self._jobs[job_id]
+            job["status"], job["error"], job["finished"] = status, error, time.time()
+            if status == "done":
+                job["stages"] = {s: 1.0 for s in JOB_STAGES}
+            self._active_by_key.pop(job["key"], None)
+
+    def _trim(self) -> None:
+        finished = [j for j, job in self._jobs.items() if job["status"] in ("done", "failed")]
+        for j in finished[:max(0, len(self._jobs) - self._keep)]:
+            del self._jobs[j]
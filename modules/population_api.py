@@ -2,10 +2,11 @@
 행정안전부 행정동별 주민등록 인구 데이터 수집 모듈 (로컬 DB버전)
 """
 
-import sqlite3
 import pandas as pd
 import os
 
+from modules.db import connect_local, read_sql
+
 # DB 경로 설정
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DB_PATH = os.path.join(BASE_DIR, 'data', 'saturation.db')
@@ -15,9 +16,8 @@ def _get_conn():
     if SUPABASE_DB_URL:
         import psycopg2
         return psycopg2.connect(SUPABASE_DB_URL)
-    if not os.path.exists(DB_PATH):
-        raise FileNotFoundError(f"로컬 DB를 찾을 수 없습니다: {DB_PATH}")
-    return sqlite3.connect(DB_PATH)
+    # 서빙 스냅샷이 있으면 읽기 전용·immutable·mmap 모드로 연결 (LOCAL_DB_ENGINE=duckdb 면 Parquet)
+    return connect_local(DB_PATH)
 
 SIDO_CODES = {
     "서울특별시": "1100000000", "부산광역시": "2600000000", "대구광역시": "2700000000",
@@ -28,6 +28,30 @@ SIDO_CODES = {
     "경상남도": "4800000000", "제주특별자치도": "5000000000",
 }
 
+def split_adm_nm(adm_nm: pd.Series) -> pd.DataFrame:
+    """
+    행정기관명 → (sido_nm, sgg_nm, dong_nm) 벡터화 분리.
+      "서울특별시 종로구 사직동"          → ("서울특별시", "종로구", "사직동")
+      "경기도 수원시 장안구 파장동"        → ("경기도", "수원시", "파장동")
+      "서울특별시 종로구"                 → ("서울특별시", "종로구", "")
+    create_local_db.py 적재 시 컬럼으로 저장되며, 구 DB(컬럼 없음) 조회 시 폴백으로도 사용.
+    """
+    parts = adm_nm.fillna("").astype(str).str.split()
+    n = parts.str.len()
+    return pd.DataFrame({
+        "sido_nm": parts.str[0].fillna(""),
+        "sgg_nm": parts.str[1].fillna(""),
+        "dong_nm": parts.str[-1].where(n > 2, "").fillna(""),
+    }, index=adm_nm.index)
+
+
+def _ensure_name_cols(df: pd.DataFrame) -> pd.DataFrame:
+    """sido_nm/sgg_nm/dong_nm 컬럼이 없는 구 DB 호환용"""
+    if "sgg_nm" not in df.columns:
+        df[["sido_nm", "sgg_nm", "dong_nm"]] = split_adm_nm(df["adm_nm"])
+    return df
+
+
 class PopulationAPIClient:
     def __init__(self, request_delay: float = 0.0):
         # DB 기반이므로 delay는 무시하지만 호환성을 위해 유지
@@ -39,18 +63,26 @@ class PopulationAPIClient:
         기존 반환 컬럼: admmCd, ctpvNm, sggNm
         """
         prefix = sido_cd[:2]
-        query = f"SELECT adm_cd, adm_nm FROM population_house WHERE adm_cd LIKE '{prefix}%00000' AND adm_cd != '{prefix}00000000'"
-        
+        where = f"WHERE adm_cd LIKE '{prefix}%00000' AND adm_cd != '{prefix}00000000'"
+
+        # 목록에 필요한 컬럼만 조회 (DuckDB 백엔드는 읽는 Parquet 컬럼도 이만큼으로 줄어듦)
         with _get_conn() as conn:
-            df = pd.read_sql_query(query, conn)
-            
+            try:
+                df = read_sql(f"SELECT adm_cd, sido_nm, sgg_nm FROM population_house {where}", conn)
+            except Exception:
+                # 구 DB 호환: sido_nm/sgg_nm 컬럼 없음 → adm_nm 에서 분리 (_ensure_name_cols)
+                try:
+                    conn.rollback()  # PostgreSQL: 실패한 트랜잭션 해제
+                except Exception:
+                    pass  # DuckDB: 활성 트랜잭션 없음
+                df = read_sql(f"SELECT adm_cd, adm_nm FROM population_house {where}", conn)
+
         if df.empty:
             return pd.DataFrame()
             
-        # ctpvNm (시도명), sggNm (시군구명) 분리
-        df['ctpvNm'] = df['adm_nm'].apply(lambda x: x.split()[0] if isinstance(x, str) else "")
-        df['sggNm'] = df['adm_nm'].apply(lambda x: x.split()[1] if isinstance(x, str) and len(x.split()) > 1 else "")
-        df.rename(columns={'adm_cd': 'admmCd'}, inplace=True)
+        # ctpvNm (시도명), sggNm (시군구명) — 적재 시 분리 저장된 컬럼 사용
+        df = _ensure_name_cols(df)
+        df.rename(columns={'adm_cd': 'admmCd', 'sido_nm': 'ctpvNm', 'sgg_nm': 'sggNm'}, inplace=True)
         return df[['admmCd', 'ctpvNm', 'sggNm']]
 
     def get_population(self, sgg_cd: str, year_month: str = "202412", lv: str = "3") -> pd.DataFrame:
@@ -68,7 +100,7 @@ class PopulationAPIClient:
                 prefix = sgg_cd[:5]
                 query = f"SELECT * FROM population_house WHERE adm_cd LIKE '{prefix}%' AND adm_cd != '{prefix}00000'"
                 
-            df = pd.read_sql_query(query, conn)
+            df = read_sql(query, conn)
             
         if df.empty:
             return pd.DataFrame()
@@ -82,10 +114,9 @@ class PopulationAPIClient:
             'female_pop': '여자인구수'
         }, inplace=True)
         
-        # 이름 분리
-        df['시도명'] = df['adm_nm'].apply(lambda x: x.split()[0] if isinstance(x, str) else "")
-        df['시군구명'] = df['adm_nm'].apply(lambda x: x.split()[1] if isinstance(x, str) and len(x.split()) > 1 else "")
-        df['행정동명'] = df['adm_nm'].apply(lambda x: x.split()[2] if isinstance(x, str) and len(x.split()) > 2 else "")
+        # 이름 분리 (적재 시 저장된 컬럼 사용)
+        df = _ensure_name_cols(df)
+        df.rename(columns={'sido_nm': '시도명', 'sgg_nm': '시군구명', 'dong_nm': '행정동명'}, inplace=True)
         
         # 기초 체계 정리 (기존 API 형식 호환)
         df['통계년월'] = year_month
@@ -105,7 +136,7 @@ class PopulationAPIClient:
                 prefix = sgg_cd[:5]
                 query = f"SELECT * FROM population_age WHERE adm_cd LIKE '{prefix}%' AND adm_cd != '{prefix}00000'"
                 
-            df = pd.read_sql_query(query, conn)
+            df = read_sql(query, conn)
 
         if df.empty:
             return pd.DataFrame()
@@ -135,7 +166,8 @@ class PopulationAPIClient:
 
         # 시스템 상 행정동명은 마지막 단어만 (읍면동) 리턴했었음
         if lv == "3":
-            df['행정동명'] = df['행정동명'].apply(lambda x: x.split()[-1] if isinstance(x, str) else "")
+            df['행정동명'] = df['dong_nm'] if 'dong_nm' in df.columns else split_adm_nm(df['행정동명'])['dong_nm']
+        df = df.drop(columns=['sido_nm', 'sgg_nm', 'dong_nm'], errors='ignore')
 
         return df
 
@@ -0,0 +1,84 @@
+"""
+아파트 평당가 분위수 스케치 (병합 가능한 로그 히스토그램)
+
+법정동·월 단위로 평당가 분포를 고정 로그 구간 히스토그램으로 저장하고,
+상위 레벨(행정동/시군구/시도)에서는 구간별 건수만 합산하여 중위값·분위수를 산출합니다.
+원본 거래 데이터 없이도 어느 레벨에서든 상대오차 SKETCH_ALPHA 이내의 분위수를 얻을 수 있습니다.
+
+저장 형식 (apt_price_sketch.sketch 컬럼):
+  "구간번호:건수,구간번호:건수,..."  예) "402:3,403:10,405:1"
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+# 분위수 상대오차 (1%) → 로그 구간 비율 gamma
+SKETCH_ALPHA = 0.01
+_GAMMA = (1 + SKETCH_ALPHA) / (1 - SKETCH_ALPHA)
+_LOG_GAMMA = math.log(_GAMMA)
+
+DEFAULT_QUANTILES = (0.25, 0.5, 0.75)
+
+
+def bin_index(values) -> np.ndarray:
+    """양수 값 → 로그 구간 번호 (ceil(log_gamma(v)))"""
+    v = np.asarray(values, dtype=float)
+    return np.ceil(np.log(v) / _LOG_GAMMA).astype("int64")
+
+
+def bin_value(idx) -> np.ndarray:
+    """구간 번호 → 구간 대표값 (상대오차가 최소가 되는 지점)"""
+    return 2.0 * np.power(_GAMMA, np.asarray(idx, dtype=float)) / (_GAMMA + 1.0)
+
+
+def encode_sketch(values) -> str:
+    """평당가 배열 → 스케치 문자열. 0 이하·결측값은 제외."""
+    v = pd.to_numeric(pd.Series(values), errors="coerce")
+    v = v[v > 0]
+    if v.empty:
+        return ""
+    counts = pd.Series(bin_index(v)).value_counts().sort_index()
+    return ",".join(f"{i}:{c}" for i, c in counts.items())
+
+
+def explode_sketches(df: pd.DataFrame, key_col: str, sketch_col: str = "sketch") -> pd.DataFrame:
+    """
+    스케치 문자열 컬럼을 (key_col, bin, cnt) 롱 포맷으로 펼친 뒤 key·구간별로 합산.
+    같은 key의 여러 스케치(여러 법정동·여러 달)가 이 단계에서 병합됩니다.
+    """
+    parts = df[[key_col, sketch_col]].dropna()
+    parts = parts[parts[sketch_col] != ""]
+    if parts.empty:
+        return pd.DataFrame(columns=[key_col, "bin", "cnt"])
+    long_df = parts.assign(_pair=parts[sketch_col].str.split(",")).explode("_pair")
+    pair = long_df["_pair"].str.split(":", n=1, expand=True)
+    long_df = pd.DataFrame({
+        key_col: long_df[key_col].values,
+        "bin": pair[0].astype("int64").values,
+        "cnt": pair[1].astype("int64").values,
+    })
+    return long_df.groupby([key_col, "bin"], as_index=False)["cnt"].sum()
+
+
+def sketch_quantiles(long_df: pd.DataFrame, key_col: str,
+                     quantiles: tuple = DEFAULT_QUANTILES) -> pd.DataFrame:
+    """
+    explode_sketches 결과 → key별 분위수 DataFrame (컬럼: key_col, q25, q50, q75 ...)
+    순위 q×(n-1) 을 처음 넘는 구간의 대표값을 분위수로 사용합니다.
+    """
+    cols = [key_col] + [f"q{int(round(q * 100))}" for q in quantiles]
+    if long_df.empty:
+        return pd.DataFrame(columns=cols)
+    df = long_df.sort_values([key_col, "bin"]).reset_index(drop=True)
+    df["cum"] = df.groupby(key_col)["cnt"].cumsum()
+    total = df.groupby(key_col)["cnt"].transform("sum")
+
+    out = pd.DataFrame({key_col: df[key_col].drop_duplicates().values})
+    for q, col in zip(quantiles, cols[1:]):
+        hit = df[df["cum"] > q * (total - 1)]
+        first = hit.groupby(key_col, as_index=False)["bin"].first()
+        first[col] = bin_value(first["bin"])
+        out = out.merge(first[[key_col, col]], on=key_col, how="left")
+    return out
@@ -0,0 +1,305 @@
+"""
+SQL 쿼리 프로파일러 (선택 기능)
+
+데이터 모듈의 조회는 모두 modules.db.read_sql() 을 거치며, 프로파일러가 켜져 있을 때만
+문장 형태(shape)·파라미터·소요 시간·결과 행 수·호출 위치를 기록합니다. 꺼져 있으면 비용 없음.
+
+  - shape: 공백 정리 + 문자열/숫자 리터럴 → ?, IN (?, ?, ...) 목록 축약
+           → 리터럴만 다른 f-string 쿼리들이 한 항목으로 묶임
+  - 실행계획: 형태별 가장 느린 실행을 다시 EXPLAIN
+           SQLite   : EXPLAIN QUERY PLAN  ("SCAN 테이블" = 전체 테이블 스캔)
+           DuckDB   : EXPLAIN             (필터 푸시다운 없는 Parquet 스캔)
+           PostgreSQL: EXPLAIN (ANALYZE, BUFFERS) ("Seq Scan on 테이블")
+  - 보고서: 형태별 호출 수·합계/최대 시간·행 수 + 실행계획 + 전체 스캔 경고 (Markdown)
+
+사용:
+    with profiling() as prof:
+        DataMerger().run(...)
+    prof.write_report("data/bench/query_profile.md")
+
+환경변수 QUERY_PROFILE=1 이면 프로세스 시작 시 켜지고, 종료 시 QUERY_PROFILE_OUT
+(기본 data/bench/query_profile.md)에 보고서를 씁니다.
+"""
+
+import atexit
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+DEFAULT_REPORT = Path(__file__).parent.parent / "data" / "bench" / "query_profile.md"
+
+_WS = re.compile(r"\s+")
+_STR = re.compile(r"'(?:[^']|'')*'")
+_NUM = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ALIAS = re.compile(r"\b(?:FROM|JOIN)\s+(\w+)\s+(?:AS\s+)?(\w+)", re.IGNORECASE)
+_FROM = re.compile(r"\b(?:FROM|JOIN)\s+\"?(\w+)", re.IGNORECASE)
+_NOT_ALIAS = {"WHERE", "JOIN", "INNER", "LEFT", "RIGHT", "ON", "GROUP", "ORDER", "LIMIT", "USING"}
+
+# 호출 위치 추적 시 건너뛸 모듈
+_SKIP_FRAMES = ("modules/db.py", "modules/query_profiler.py", "/pandas/")
+
+
+def statement_shape(sql: str) -> str:
+    """리터럴·플레이스홀더 개수만 다른 문장을 같은 형태로 정규화"""
+    s = _WS.sub(" ", sql.strip()).replace("%s", "?")
+    s = _STR.sub("?", s)
+    s = _NUM.sub("?", s)
+    return _IN_LIST.sub("(?, ...)", s)
+
+
+def _caller() -> str:
+    frame = sys._getframe(2)
+    while frame is not None:
+        path = frame.f_code.co_filename.replace("\\", "/")
+        if not any(p in path for p in _SKIP_FRAMES):
+            return f"{Path(path).stem}.{frame.f_code.co_name}:{frame.f_lineno}"
+        frame = frame.f_back
+    return ""
+
+
+def _backend(conn) -> tuple[str, str | None]:
+    """(백엔드, 재접속 정보) — SQLite 는 파일 경로, DuckDB 는 Parquet 디렉터리, PostgreSQL 은 DSN"""
+    if isinstance(conn, sqlite3.Connection):
+        row = conn.execute("PRAGMA database_list").fetchone()
+        return "sqlite", row[2] if row else None
+    from modules.db import is_duckdb
+    if is_duckdb(conn):
+        row = conn.execute("SELECT sql FROM duckdb_views() WHERE NOT internal LIMIT 1").fetchone()
+        m = re.search(r"read_parquet\('((?:[^']|'')+)'\)", row[0]) if row else None
+        return "duckdb", str(Path(m.group(1).replace("''", "'")).parent) if m else None
+    from config import SUPABASE_DB_URL  # conn.dsn 은 비밀번호가 가려져 있어 재접속 불가
+    return "postgresql", SUPABASE_DB_URL
+
+
+class QueryProfiler:
+    def __init__(self, explain_top: int = 10):
+        """explain_top: 보고서에서 EXPLAIN 을 수행할 느린 형태 개수"""
+        self.explain_top = explain_top
+        self._lock = threading.Lock()
+        # shape → {"calls", "total", "max", "rows", "callers", "slowest": {...}, "backend"}
+        self._shapes: dict[str, dict] = {}
+
+    # ── 기록 ──────────────────────────────────────────────────────────────
+    def read_sql(self, query: str, conn, params=None) -> pd.DataFrame:
+        from modules.db import execute_sql  # modules.db 가 이 모듈을 import
+        caller = _caller()
+        t = time.perf_counter()
+        df = execute_sql(query, conn, params)
+        seconds = time.perf_counter() - t
+        self.record(query, params, seconds, len(df), conn, caller)
+        return df
+
+    def record(self, query: str, params, seconds: float, rows: int, conn=None, caller: str = "") -> None:
+        shape = statement_shape(query)
+        with self._lock:
+            s = self._shapes.get(shape)
+            if s is None:
+                backend, source = _backend(conn) if conn is not None else ("", None)
+                s = self._shapes[shape] = {
+                    "calls": 0, "total": 0.0, "max": 0.0, "rows": 0, "callers": set(),
+                    "backend": backend, "source": source, "slowest": None,
+                }
+            s["calls"] += 1
+            s["total"] += seconds
+            s["rows"] += rows
+            if caller:
+                s["callers"].add(caller)
+            if seconds >= s["max"]:
+                s["max"] = seconds
+                s["slowest"] = {"sql": query, "params": list(params) if params else None,
+                                "seconds": seconds, "rows": rows}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._shapes.clear()
+
+    # ── 집계 ──────────────────────────────────────────────────────────────
+    def summary(self) -> list[dict]:
+        """형태별 집계 (합계 시간 내림차순)"""
+        with self._lock:
+            items = [(shape, dict(s, callers=sorted(s["callers"]))) for shape, s in self._shapes.items()]
+        out = [{
+            "shape": shape, "calls": s["calls"], "total_s": round(s["total"], 5),
+            "mean_s": round(s["total"] / s["calls"], 5), "max_s": round(s["max"], 5),
+            "rows": s["rows"], "callers": s["callers"], "backend": s["backend"],
+            "source": s["source"], "slowest": s["slowest"],
+        } for shape, s in items]
+        return sorted(out, key=lambda r: r["total_s"], reverse=True)
+
+    def explain(self, item: dict) -> dict:
+        """
+        형태의 가장 느린 실행을 다시 EXPLAIN.
+        Returns: {"plan": [줄...], "full_scans": [테이블...], "error": str|None}
+        """
+        slowest = item["slowest"]
+        try:
+            if item["backend"] == "duckdb":
+                # Parquet 는 인덱스가 없으므로 스캔 자체가 아니라 필터 푸시다운 없는 전체 읽기를 표시
+                plan, scans = _explain_duckdb(item["source"], slowest["sql"], slowest["params"])
+            elif item["backend"] == "sqlite":
+                plan = _explain_sqlite(item["source"], slowest["sql"], slowest["params"])
+                aliases = _table_aliases(slowest["sql"])
+                scans = sorted({aliases.get(m.group(1), m.group(1)) for line in plan
+                                if (m := re.match(r"\s*SCAN (?:TABLE )?(\w+)(?!.*USING)", line))
+                                and m.group(1) != "CONSTANT"})
+            else:
+                plan = _explain_postgres(item["source"], slowest["sql"], slowest["params"])
+                scans = sorted({m.group(1) for line in plan if (m := re.search(r"Seq Scan on (\S+)", line))})
+            return {"plan": plan, "full_scans": scans, "error": None}
+        except Exception as e:
+            return {"plan": [], "full_scans": [], "error": f"{type(e).__name__}: {e}"}
+
+    # ── 보고서 ────────────────────────────────────────────────────────────
+    def render_report(self) -> str:
+        items = self.summary()
+        total = sum(i["total_s"] for i in items)
+        lines = ["# SQL 쿼리 프로파일", "",
+                 f"- 문장 형태 {len(items)}개 / 실행 {sum(i['calls'] for i in items):,}회 / 합계 {total:.3f}s", ""]
+        lines += ["| # | 호출 | 합계(s) | 평균(s) | 최대(s) | 행 수 | 호출 위치 |",
+                  "|---|---:|---:|---:|---:|---:|---|"]
+        for n, i in enumerate(items, 1):
+            lines.append(f"| {n} | {i['calls']} | {i['total_s']:.4f} | {i['mean_s']:.4f} | {i['max_s']:.4f} "
+                         f"| {i['rows']:,} | {', '.join(i['callers'][:3])} |")
+
+        flagged = []
+        slow = sorted(items, key=lambda r: r["max_s"], reverse=True)[:self.explain_top]
+        lines += ["", f"## 실행계획 (가장 느린 {len(slow)}개 형태)", ""]
+        for i in slow:
+            n = items.index(i) + 1
+            ex = self.explain(i)
+            lines += [f"### #{n} — 최대 {i['max_s']:.4f}s, {i['calls']}회 ({i['backend']})", "",
+                      "```sql", i["shape"], "```", ""]
+            if i["slowest"]["params"]:
+                lines += [f"파라미터: `{i['slowest']['params']}`", ""]
+            if ex["error"]:
+                lines += [f"EXPLAIN 실패: {ex['error']}", ""]
+                continue
+            if ex["full_scans"]:
+                flagged.append((n, ex["full_scans"]))
+                lines += [f"**⚠ 전체 테이블 스캔: {', '.join(ex['full_scans'])}**", ""]
+            lines += ["```", *ex["plan"], "```", ""]
+
+        lines[4:4] = ["## 전체 테이블 스캔 경고", ""] + (
+            [f"- #{n}: {', '.join(t)}" for n, t in flagged] or ["- 없음"]) + [""]
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, path: str | Path = DEFAULT_REPORT) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.render_report(), encoding="utf-8")
+        return path
+
+
+def _table_aliases(sql: str) -> dict[str, str]:
+    """FROM/JOIN 별칭 → 테이블명 (SQLite 실행계획은 별칭으로 표시)"""
+    return {alias: table for table, alias in _ALIAS.findall(sql) if alias.upper() not in _NOT_ALIAS}
+
+
+def _explain_sqlite(db_file: str, sql: str, params) -> list[str]:
+    conn = sqlite3.connect(f"{Path(db_file).as_uri()}?mode=ro", uri=True)
+    try:
+        rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params or []).fetchall()
+    finally:
+        conn.close()
+    # (id, parent, notused, detail) → 트리 들여쓰기
+    depth = {0: -1}
+    out = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        out.append("  " * depth[node_id] + detail)
+    return out
+
+
+def _explain_duckdb(directory: str, sql: str, params) -> tuple[list[str], list[str]]:
+    """
+    (실행계획 줄, 필터 푸시다운 없이 읽는 테이블).
+    READ_PARQUET 노드에는 테이블명이 없으므로 읽는 컬럼이 모두 있는 쿼리 내 테이블로 추정
+    """
+    from modules.db import connect_duckdb
+    conn = connect_duckdb(directory)
+    try:
+        rows = conn.execute(f"EXPLAIN {sql}", params or []).fetchall()
+        tree = json.loads(conn.execute(f"EXPLAIN (FORMAT json) {sql}", params or []).fetchall()[0][1])
+        columns = {}
+        for table, col in conn.execute("SELECT table_name, column_name FROM information_schema.columns").fetchall():
+            columns.setdefault(table, set()).add(col)
+    finally:
+        conn.close()
+
+    used = set(_FROM.findall(sql)) & set(columns)
+    scans, stack = set(), list(tree)
+    while stack:
+        node = stack.pop()
+        stack += node.get("children", [])
+        info = node.get("extra_info", {})
+        if node.get("name") != "READ_PARQUET" or info.get("Filters"):
+            continue
+        proj = info.get("Projections", [])
+        proj = {proj} if isinstance(proj, str) else set(proj)
+        scans |= {t for t in used if proj <= columns[t]} or {"?"}
+    return [line for _, text in rows for line in text.splitlines()], sorted(scans)
+
+
+def _explain_postgres(dsn: str, sql: str, params) -> list[str]:
+    import psycopg2
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT TEXT) {sql}", params or None)
+            plan = [r[0] for r in cur.fetchall()]
+        conn.rollback()  # ANALYZE 는 실제 실행 — 부수효과 없도록 되돌림
+    finally:
+        conn.close()
+    return plan
+
+
+# ── 프로세스 전역 활성화 ────────────────────────────────────────────────────
+_active: QueryProfiler | None = None
+
+
+def active() -> QueryProfiler | None:
+    return _active
+
+
+def enable(explain_top: int = 10) -> QueryProfiler:
+    global _active
+    if _active is None:
+        _active = QueryProfiler(explain_top)
+    return _active
+
+
+def disable() -> QueryProfiler | None:
+    global _active
+    prof, _active = _active, None
+    return prof
+
+
+@contextmanager
+def profiling(explain_top: int = 10):
+    """블록 안의 조회만 기록 (이미 켜져 있으면 그 프로파일러를 그대로 사용)"""
+    was_active = _active is not None
+    prof = enable(explain_top)
+    try:
+        yield prof
+    finally:
+        if not was_active:
+            disable()
+
+
+def _write_at_exit() -> None:
+    if _active is not None and _active.summary():
+        _active.write_report(os.getenv("QUERY_PROFILE_OUT") or DEFAULT_REPORT)
+
+
+if os.getenv("QUERY_PROFILE", "") not in ("", "0"):
+    enable()
+    atexit.register(_write_at_exit)
@@ -0,0 +1,269 @@
+"""
+프로세스 공용 분석 결과 저장소
+
+DataMerger 결과(병원 목록·경계 GeoJSON 등 수 MB)를 세션마다 복사해 두지 않고
+프로세스 안에 한 벌만 보관합니다. 세션은 결과 키만 들고 있고, 같은 키를 요청한
+세션들은 같은 객체를 공유합니다.
+
+  - 참조 집계: 결과별로 현재 보고 있는 세션(holder) 집합을 관리
+  - 공유 블롭: 여러 결과가 같은 대용량 값(예: 같은 시도의 dissolve GeoJSON)을
+    쓰면 intern() 으로 한 벌만 보관
+  - 메모리 예산: 합계가 budget_bytes 를 넘으면 LRU 순으로 제거
+    (참조 없는 결과 우선, 그래도 넘으면 참조 중인 결과도 제거 — 해당 세션은 재계산)
+  - ttl: 생성 후 ttl 초가 지난 결과는 만료
+  - 디스크 보관(선택): persist_dir 지정 시 put(..., persist=True) 결과를 pickle 로 저장하고,
+    메모리에 없는 키는 디스크에서 다시 읽음 (프로세스 재시작·세션 재접속 후에도 즉시 조회)
+
+결과 객체는 공유되므로 호출 측에서 수정하면 안 됩니다 (읽기 전용).
+"""
+
+import os
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+
+def estimate_size(obj) -> int:
+    """DataFrame·배열·컨테이너의 대략적인 메모리 사용량 (바이트)"""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_size(k) + estimate_size(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(estimate_size(v) for v in obj)
+    return sys.getsizeof(obj)
+
+
+class ResultStore:
+    def __init__(self, budget_bytes: int, ttl: float | None = None,
+                 is_alive: Callable[[str], bool] | None = None,
+                 persist_dir: str | Path | None = None):
+        """
+        budget_bytes: 결과 + 공유 블롭 합계 상한
+        ttl: 결과 만료 시간(초). None 이면 만료 없음 (디스크 보관분에도 적용)
+        is_alive: holder(세션 id) 생존 확인 함수 — 종료된 세션의 참조를 정리할 때 사용
+        persist_dir: 디스크 보관 디렉터리 (None 이면 메모리 전용)
+        """
+        self.budget_bytes = budget_bytes
+        self.ttl = ttl
+        self._is_alive = is_alive
+        self.persist_dir = Path(persist_dir) if persist_dir else None
+        self._lock = threading.RLock()
+        self._key_locks: dict[str, threading.Lock] = {}
+        # key → {"result", "size", "holders", "blobs", "created"}
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        # blob_key → {"value", "size", "refs"}
+        self._blobs: dict[str, dict] = {}
+        # get_or_create 중인 스레드가 intern() 한 블롭 키 (factory 실패·미사용 시 정리)
+        self._tls = threading.local()
+
+    # ── 조회/저장 ──────────────────────────────────────────────────────────
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return self._load_persisted(key)
+            if self.ttl is not None and time.time() - entry["created"] > self.ttl:
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry["result"]
+
+    def intern(self, blob_key: str, value, size: int):
+        """
+        같은 blob_key 값이 이미 있으면 그 객체를 반환 (put 의 blobs 로 참조 등록).
+        put 으로 참조되지 않은 블롭은 get_or_create 가 끝날 때 정리됩니다.
+        """
+        with self._lock:
+            blob = self._blobs.get(blob_key)
+            if blob is None:
+                blob = self._blobs[blob_key] = {"value": value, "size": size, "refs": 0}
+            pending = getattr(self._tls, "interned", None)
+            if pending is not None:
+                pending.append(blob_key)
+            return blob["value"]
+
+    def put(self, key: str, result: dict, size: int | None = None,
+            blobs: dict[str, str] | None = None, persist: bool = False) -> dict:
+        """
+        결과 저장. 이미 같은 키가 있으면 기존 객체를 반환합니다.
+        blobs: intern() 으로 공유 중인 필드 → 블롭 키 (예: {"geojson_dissolved": geojson_key})
+        persist: persist_dir 에도 기록
+        """
+        with self._lock:
+            existing = self.get(key)
+            if existing is not None:
+                return existing
+            blobs = dict(blobs or {})
+            size = estimate_size(result) if size is None else size
+            for field, b in blobs.items():
+                if b not in self._blobs:  # intern 이후 clear()·정리됨 → 결과의 값으로 다시 등록
+                    self._blobs[b] = {"value": result[field], "size": estimate_size(result[field]), "refs": 0}
+            blob_sizes = {field: (b, self._blobs[b]["size"]) for field, b in blobs.items()}
+            self._add_entry(key, result, size, blobs, time.time())
+        if persist and self.persist_dir is not None:
+            self._write_persisted(key, {"result": result, "size": size, "blobs": blob_sizes})
+        return result
+
+    def _add_entry(self, key: str, result: dict, size: int, blobs: dict, created: float) -> None:
+        for b in blobs.values():
+            self._blobs[b]["refs"] += 1
+        self._entries[key] = {
+            "result": result,
+            "size": size,
+            "holders": set(),
+            "blobs": tuple(blobs.values()),
+            "created": created,
+        }
+        self._evict(protect=key)
+
+    # ── 디스크 보관 ────────────────────────────────────────────────────────
+    def _persist_path(self, key: str) -> Path:
+        return self.persist_dir / f"{key}.pkl"
+
+    def _write_persisted(self, key: str, payload: dict) -> None:
+        """payload: {"result", "size", "blobs": {필드: (블롭 키, 크기)}} — 임시 파일에 쓴 뒤 원자적 교체"""
+        self.persist_dir.mkdir(parents=True, exist_ok=True)
+        path = self._persist_path(key)
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.part")
+        with open(tmp, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def _load_persisted(self, key: str) -> dict | None:
+        if self.persist_dir is None:
+            return None
+        path = self._persist_path(key)
+        if not path.exists():
+            return None
+        created = path.stat().st_mtime
+        if self.ttl is not None and time.time() - created > self.ttl:
+            path.unlink(missing_ok=True)
+            return None
+        try:
+            with open(path, "rb") as f:
+                payload = pickle.load(f)
+        except Exception:
+            path.unlink(missing_ok=True)  # 기록 중단·버전 불일치 → 다시 계산
+            return None
+        result = payload["result"]
+        blobs = {}
+        for field, (b, size) in payload["blobs"].items():
+            result[field] = self.intern(b, result[field], size)
+            blobs[field] = b
+        self._add_entry(key, result, payload["size"], blobs, created)
+        return result
+
+    def get_or_create(self, key: str, factory: Callable[[], dict]) -> dict:
+        """
+        없으면 factory() 로 생성하여 저장. 같은 키를 동시에 요청하면 한 번만 계산합니다.
+        factory 는 내부에서 intern()/put() 을 직접 호출해도 되고, 결과 dict 만 반환해도 됩니다.
+        """
+        result = self.get(key)
+        if result is not None:
+            return result
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                result = self.get(key)
+                if result is None:
+                    outer, self._tls.interned = getattr(self._tls, "interned", None), []
+                    try:
+                        result = self.put(key, factory())
+                    finally:
+                        interned, self._tls.interned = self._tls.interned, outer
+                        self._release_unreferenced(interned)
+        finally:
+            with self._lock:
+                self._key_locks.pop(key, None)
+        return result
+
+    # ── 참조 집계 ──────────────────────────────────────────────────────────
+    def acquire(self, key: str, holder: str) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry["holders"].add(holder)
+
+    def release(self, key: str, holder: str) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry["holders"].discard(holder)
+
+    # ── 관리 ──────────────────────────────────────────────────────────────
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._blobs.clear()
+            if self.persist_dir is not None and self.persist_dir.exists():
+                for path in self.persist_dir.glob("*.pkl"):
+                    path.unlink(missing_ok=True)
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return (sum(e["size"] for e in self._entries.values())
+                    + sum(b["size"] for b in self._blobs.values()))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "blobs": len(self._blobs),
+                "holders": sum(len(e["holders"]) for e in self._entries.values()),
+                "total_mb": round(self.total_bytes() / 1024 / 1024, 1),
+                "budget_mb": round(self.budget_bytes / 1024 / 1024, 1),
+            }
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for b in entry["blobs"]:
+            blob = self._blobs.get(b)
+            if blob is not None:
+                blob["refs"] -= 1
+                if blob["refs"] <= 0:
+                    del self._blobs[b]
+
+    def _release_unreferenced(self, blob_keys: list[str]) -> None:
+        """intern() 됐지만 어떤 결과도 참조하지 않는 블롭 제거 (factory 실패 등)"""
+        with self._lock:
+            for b in blob_keys:
+                blob = self._blobs.get(b)
+                if blob is not None and blob["refs"] <= 0:
+                    del self._blobs[b]
+
+    def _prune_holders(self) -> None:
+        if self._is_alive is None:
+            return
+        for entry in self._entries.values():
+            dead = {h for h in entry["holders"] if not self._is_alive(h)}
+            entry["holders"] -= dead
+
+    def _evict(self, protect: str | None = None) -> None:
+        if self.total_bytes() <= self.budget_bytes:
+            return
+        self._prune_holders()
+        # 1차: 참조 없는 결과 (오래된 순) → 2차: 참조 중인 결과 (오래된 순)
+        for only_unheld in (True, False):
+            for key in list(self._entries):
+                if self.total_bytes() <= self.budget_bytes:
+                    return
+                if key == protect:
+                    continue
+                if only_unheld and self._entries[key]["holders"]:
+                    continue
+                self._drop(key)
@@ -0,0 +1,74 @@
+"""
+단계별 실행 추적 (벽시계 시간 · 입출력 행 수 · 캐시 적중 여부)
+
+사용:
+    tracer = Tracer("DataMerger.run")
+    with tracer.stage("hospitals") as rec:
+        df = ...
+        rec["rows_out"] = len(df)
+    result["timings"] = tracer.records
+
+각 기록은 {"stage", "start", "seconds", "rows_in", "rows_out", "cache", "error", ...} dict 이며
+start 는 추적 시작 시점으로부터의 초 (워터폴 표시용) 입니다.
+처리하고 넘어간 예외는 tracer.error() 로 남깁니다.
+
+환경변수 TRACE_LOG=1 이면 logger "saturation.trace" 로 단계마다 JSON 한 줄을 출력합니다.
+"""
+
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("saturation.trace")
+
+_LOG_ENABLED = os.getenv("TRACE_LOG", "") not in ("", "0")
+
+
+class Tracer:
+    def __init__(self, name: str, offset: float = 0.0, log: bool | None = None):
+        """
+        name: 로그에 붙는 추적 이름
+        offset: 이어서 기록할 때 시작 시각 보정(초) — 이전 기록 뒤에 이어 붙이기
+        log: 구조화 로그 출력 여부 (None 이면 TRACE_LOG 환경변수)
+        """
+        self.name = name
+        self.records: list[dict] = []
+        self._t0 = time.perf_counter() - offset
+        self._log = _LOG_ENABLED if log is None else log
+
+    @contextmanager
+    def stage(self, stage: str, rows_in: int | None = None, cache: str | None = None, **fields):
+        rec = {"stage": stage, "start": round(time.perf_counter() - self._t0, 4), "seconds": None,
+               "rows_in": rows_in, "rows_out": None, "cache": cache, "error": None, **fields}
+        t = time.perf_counter()
+        try:
+            yield rec
+        except Exception as e:
+            rec["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            rec["seconds"] = round(time.perf_counter() - t, 4)
+            self.records.append(rec)
+            self._emit(rec)
+
+    def error(self, stage: str, exc: Exception, **fields) -> None:
+        """처리하고 넘어간 예외 기록 (소요 시간 0)"""
+        rec = {"stage": stage, "start": round(time.perf_counter() - self._t0, 4), "seconds": 0.0,
+               "rows_in": None, "rows_out": None, "cache": None,
+               "error": f"{type(exc).__name__}: {exc}", **fields}
+        self.records.append(rec)
+        self._emit(rec, level=logging.WARNING)
+
+    def total(self) -> float:
+        return round(time.perf_counter() - self._t0, 4)
+
+    def _emit(self, rec: dict, level: int = logging.INFO) -> None:
+        if self._log:
+            logger.log(level, json.dumps({"trace": self.name, **rec}, ensure_ascii=False, default=str))
+
+
+def records_end(records: list[dict]) -> float:
+    """기록 목록의 마지막 종료 시각(초) — Tracer(offset=...) 로 이어 붙일 때 사용"""
+    return max((r["start"] + (r["seconds"] or 0.0) for r in records), default=0.0)
@@ -0,0 +1,263 @@
+"""
+전 시군구 × 전 진료과목 포화도 일괄 산출 (분기 계획용)
+
+시도 단위 작업을 프로세스 풀에 나눠 실행합니다. 각 작업은
+  1. 시도 병원 목록을 전 과목·종별로 한 번 조회하고, 행정동 경계에 한 번만 공간 매핑
+     (Supabase 사용 시 생략 — 시군구마다 서버측 집계, DataMerger.run(summary_only=True))
+  2. 시군구마다 DataMerger.run(..., hospitals=그 시군구 행정동에 매핑된 병원만) — 인구 조회·지수 산출만 수행
+     (평당가 통계·소득 등급표는 작업 프로세스의 DataMerger 가 레벨마다 한 번만 읽음)
+  3. 시도 결과를 <out>/sido_cd=XX/part.parquet (또는 .csv) 로 기록
+행정동 경계는 풀 생성 전에 부모 프로세스에서 읽어 두므로 (fork) 작업 프로세스가 다시 읽지 않습니다.
+
+출력 (<out>):
+  manifest.json               실행 인자·데이터 버전 (재개 시 같은 조건인지 확인)
+  sido_cd=11/part.parquet     행정동 × 과목 포화도 표 (시도·시군구·과목 컬럼 포함)
+  sido_cd=11/_summary.csv     시군구 × 과목 요약 (파티션별)
+  summary.csv                 전체 요약 (파티션 요약을 합친 것)
+
+재개: 파티션은 임시 파일에 쓴 뒤 원자적으로 교체하므로, 중단 후 다시 실행하면
+완료된 시도는 건너뛰고 나머지만 계산합니다. (--force 로 전부 다시)
+시군구 분석 중 조회 오류가 기록된 시도는 _summary.csv 만 남기고 실패로 보고하므로 다음 실행에서 다시 계산합니다.
+
+실행:
+  python scripts/batch_report.py --out data/reports/2025Q1
+  python scripts/batch_report.py --out data/reports/2025Q1 --format csv --workers 4
+  python scripts/batch_report.py --out data/reports/test --sido 서울특별시 세종특별자치시
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from modules.analysis import (CLINIC_TYPES, DENOMINATORS, GEOJSON_PATH, NUMERATORS,  # noqa: E402
+                              SPECIALTY_SELECT, data_version, default_year_month)
+from modules.hospital_api import HIRA_SIDO_CODES  # noqa: E402
+from modules.population_api import SIDO_CODES, PopulationAPIClient  # noqa: E402
+
+# 결과 표 앞쪽 식별 컬럼
+_ID_COLS = ["sido_nm", "sgg_nm", "sgg_cd", "specialty_cd", "specialty_nm"]
+_SP_NAMES = {cd: nm for nm, cd in SPECIALTY_SELECT.items()}
+
+
+def _partition_dir(out_dir: Path, sido_cd: str) -> Path:
+    return out_dir / f"sido_cd={sido_cd[:2]}"
+
+
+def _part_file(out_dir: Path, sido_cd: str, fmt: str) -> Path:
+    return _partition_dir(out_dir, sido_cd) / f"part.{fmt}"
+
+
+def _atomic_write(path: Path, write) -> None:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.part")
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def _summarize(df: pd.DataFrame) -> dict:
+    """시군구·과목 요약 (앱 과목 패널 상단 지표와 같은 기준)"""
+    valid_si = df[(df["SI_normalized"] != 3.0) & df["SI_normalized"].notna()]["SI_normalized"]
+    return {
+        "regions":       len(df),
+        "total_clinics": int(df["clinic_count"].sum()),
+        "total_specialists": int(df["specialist_count"].sum()),
+        "avg_si":        round(float(valid_si.mean()), 4) if not valid_si.empty else None,
+        "saturated":     int((df["saturation_level"] == "포화").sum()),
+        "blue_ocean":    int((df["clinic_count"] == 0).sum()),
+    }
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 시도 작업 (작업 프로세스)
+# ══════════════════════════════════════════════════════════════════════════════
+
+def run_sido(sido_nm: str, sgg_items: list[tuple[str, str]], opts: dict) -> dict:
+    """
+    한 시도의 전 시군구 × 과목 포화도 산출 후 파티션 기록.
+    sgg_items: [(시군구명, 인구 행정코드)] — 비어 있으면 시도 단위 1회 분석 (앱과 동일)
+    Returns: {"sido_nm", "rows", "sgg", "seconds", "stages": {단계: 초}}
+    """
+    from config import SUPABASE_DB_URL
+    from modules.data_merge import DataMerger, _standard_adm_cd, map_hospitals_to_dong
+    from modules.hospital_api import HospitalAPIClient
+
+    t0 = time.perf_counter()
+    out_dir = Path(opts["out"])
+    sido_cd, hira_sido = SIDO_CODES[sido_nm], HIRA_SIDO_CODES.get(sido_nm, "")
+    stages = {}
+
+    # 1. 시도 병원 목록 조회 + 공간 매핑 (시군구·과목 공통)
+    #    Supabase 는 시군구마다 서버측 집계(summary_only)를 쓰므로 병원 목록을 내려받지 않음
+    t = time.perf_counter()
+    mapped = None
+    if not SUPABASE_DB_URL:
+        hosp = HospitalAPIClient().get_hospitals_multi(hira_sido, sgg_cd=None, specialty_codes=opts["specialties"],
+                                                       cl_codes=opts["cl"])
+        mapped = map_hospitals_to_dong(hosp, opts["geojson"])
+        # 병원별 시군구(인구 코드 체계 5자리) — 시군구마다 해당 행만 넘겨 match_key 산출을 시군구 규모로 제한
+        #  (행정동 분석의 인구 행정동은 모두 시군구 코드 5자리로 시작하며, 경계 밖 병원은 어차피 제외됨)
+        sgg_of = mapped["adm_cd2"].map(lambda a: _standard_adm_cd(str(a))[:5] if pd.notna(a) else None)
+    stages["hospitals"] = round(time.perf_counter() - t, 3)
+
+    # 2. 시군구별 지수 산출
+    t = time.perf_counter()
+    merger = DataMerger(opts["geojson"])
+    targets = [(nm, cd, "dong") for nm, cd in sgg_items] or [("전체", sido_cd, "sido")]
+    frames, summary, failed = [], [], []
+    for sgg_nm, sgg_cd, level in targets:
+        hospitals = mapped if mapped is None or level != "dong" else mapped[sgg_of == sgg_cd[:5]]
+        res = merger.run(sgg_cd_pop=sgg_cd, hira_sido_cd=hira_sido, sgg_name=sgg_nm,
+                         specialty_codes=opts["specialties"], year_month=opts["year_month"],
+                         cl_codes=opts["cl"], num_col=opts["num"], den_col=opts["den"],
+                         analysis_level=level, hospitals=hospitals, summary_only=True)
+        errors = [f"{r['stage']}: {r['error']}" for r in res["timings"] if r.get("error")]
+        if errors:
+            failed.append(sgg_nm)
+        for sp_cd in opts["specialties"]:
+            df = res["saturation"].get(sp_cd)
+            ids = {"sido_nm": sido_nm, "sgg_nm": sgg_nm, "sgg_cd": sgg_cd,
+                   "specialty_cd": sp_cd, "specialty_nm": _SP_NAMES.get(sp_cd, sp_cd)}
+            if df is None or df.empty:
+                summary.append({**ids, "regions": 0, "error": "; ".join(errors) or "인구 데이터 없음"})
+                continue
+            frames.append(df.assign(**ids))
+            summary.append({**ids, **_summarize(df), "error": "; ".join(errors) or None})
+    stages["indices"] = round(time.perf_counter() - t, 3)
+
+    # 3. 파티션 기록 (요약 → 본 파일 순: 본 파일이 있으면 완료된 파티션)
+    #    조회 오류가 기록된 시군구가 있으면 요약만 남기고 본 파일은 쓰지 않음 → 실패로 보고, 다음 실행에서 재산출
+    t = time.perf_counter()
+    table = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=_ID_COLS)
+    table = table[_ID_COLS + [c for c in table.columns if c not in _ID_COLS]]
+    part_dir = _partition_dir(out_dir, sido_cd)
+    part_dir.mkdir(parents=True, exist_ok=True)
+    _atomic_write(part_dir / "_summary.csv",
+                  lambda p: pd.DataFrame(summary).to_csv(p, index=False, encoding="utf-8-sig"))
+    if failed:
+        raise RuntimeError(f"오류가 기록된 시군구 {len(failed)}개 ({', '.join(failed[:5])}) — "
+                           f"{part_dir / '_summary.csv'} 의 error 컬럼 참고")
+    if opts["format"] == "parquet":
+        _atomic_write(_part_file(out_dir, sido_cd, "parquet"), lambda p: table.to_parquet(p, index=False))
+    else:
+        _atomic_write(_part_file(out_dir, sido_cd, "csv"),
+                      lambda p: table.to_csv(p, index=False, encoding="utf-8-sig"))
+    stages["write"] = round(time.perf_counter() - t, 3)
+
+    return {"sido_nm": sido_nm, "rows": len(table), "sgg": len(targets),
+            "seconds": round(time.perf_counter() - t0, 2), "stages": stages}
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 실행 관리
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _check_manifest(out_dir: Path, manifest: dict, force: bool) -> None:
+    path = out_dir / "manifest.json"
+    if force and out_dir.exists():
+        for d in out_dir.glob("sido_cd=*"):
+            shutil.rmtree(d)
+        (out_dir / "summary.csv").unlink(missing_ok=True)
+    elif path.exists():
+        prev = json.loads(path.read_text(encoding="utf-8"))
+        diff = [k for k in manifest if k != "sido" and prev.get(k) != manifest[k]]
+        if diff:
+            sys.exit(f"[ERROR] {out_dir} 는 다른 조건으로 만든 결과입니다 ({', '.join(diff)}). "
+                     "다른 --out 을 쓰거나 --force 로 다시 만드세요.")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def _write_summary(out_dir: Path) -> Path:
+    parts = sorted(out_dir.glob("sido_cd=*/_summary.csv"))
+    summary = pd.concat([pd.read_csv(p, dtype={"sgg_cd": str, "specialty_cd": str}) for p in parts],
+                        ignore_index=True) if parts else pd.DataFrame()
+    path = out_dir / "summary.csv"
+    summary.to_csv(path, index=False, encoding="utf-8-sig")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="전 시군구 × 전 진료과목 포화도 일괄 산출")
+    parser.add_argument("--out", required=True, help="출력 디렉터리 (재개 시 같은 경로)")
+    parser.add_argument("--format", choices=["parquet", "csv"], default="parquet")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="작업 프로세스 수")
+    parser.add_argument("--sido", nargs="+", default=list(SIDO_CODES), help="대상 시도명 (기본 전체)")
+    parser.add_argument("--specialty", nargs="+", default=list(SPECIALTY_SELECT.values()),
+                        help="과목 코드 (기본 SPECIALTY_SELECT 전체)")
+    parser.add_argument("--num", default=NUMERATORS["총 인구수"], choices=list(NUMERATORS.values()))
+    parser.add_argument("--den", default=DENOMINATORS["의원 수"], choices=list(DENOMINATORS.values()))
+    parser.add_argument("--year-month", default=default_year_month())
+    parser.add_argument("--cl", nargs="+", default=[CLINIC_TYPES["의원"]], help="의료기관 종별 코드 (기본 31)")
+    parser.add_argument("--geojson", default=str(GEOJSON_PATH), help="행정동 경계 GeoJSON")
+    parser.add_argument("--force", action="store_true", help="완료된 파티션도 지우고 다시 산출")
+    args = parser.parse_args()
+
+    unknown = [s for s in args.sido if s not in SIDO_CODES]
+    if unknown:
+        sys.exit(f"[ERROR] 알 수 없는 시도: {', '.join(unknown)}")
+    if args.format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            sys.exit("[ERROR] Parquet 출력에는 pyarrow 가 필요합니다 (pip install pyarrow 또는 --format csv)")
+
+    out_dir = Path(args.out)
+    opts = {"out": str(out_dir), "format": args.format, "specialties": args.specialty, "num": args.num,
+            "den": args.den, "year_month": args.year_month, "cl": args.cl, "geojson": args.geojson}
+    manifest = {**{k: v for k, v in opts.items() if k != "out"}, "sido": args.sido,
+                "data_version": data_version(args.geojson)}
+    _check_manifest(out_dir, manifest, args.force)
+
+    pending = [s for s in args.sido if not _part_file(out_dir, SIDO_CODES[s], args.format).exists()]
+    print(f"대상 {len(args.sido)}개 시도 · 과목 {len(args.specialty)}개 · 완료 {len(args.sido) - len(pending)} · "
+          f"남은 작업 {len(pending)}")
+    if not pending:
+        print(f"요약: {_write_summary(out_dir)}")
+        return
+
+    # 시군구 목록 (시군구 수 많은 시도부터 — 긴 작업을 먼저 배정)
+    pop_client = PopulationAPIClient()
+    tasks = []
+    for sido_nm in pending:
+        df = pop_client.get_sgg_list(SIDO_CODES[sido_nm])
+        tasks.append((sido_nm, list(zip(df["sggNm"], df["admmCd"])) if not df.empty else []))
+    tasks.sort(key=lambda t: len(t[1]), reverse=True)
+
+    # 경계는 fork 전에 읽어 작업 프로세스와 공유 (spawn 환경에서는 프로세스당 1회 로드)
+    from modules.data_merge import _dong_polygons
+    _dong_polygons(args.geojson)
+
+    t0 = time.perf_counter()
+    failed = []
+    workers = max(1, min(args.workers, len(tasks)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_sido, sido_nm, sgg_items, opts): sido_nm for sido_nm, sgg_items in tasks}
+        for n, fut in enumerate(as_completed(futures), 1):
+            sido_nm = futures[fut]
+            try:
+                r = fut.result()
+            except Exception as e:
+                failed.append(sido_nm)
+                print(f"  [{n}/{len(tasks)}] {sido_nm} 실패: {type(e).__name__}: {e}")
+                continue
+            stages = " · ".join(f"{k} {v:.1f}s" for k, v in r["stages"].items())
+            print(f"  [{n}/{len(tasks)}] {sido_nm}: 시군구 {r['sgg']}개 · {r['rows']:,}행 · {r['seconds']:.1f}s ({stages})")
+
+    print(f"\n총 {time.perf_counter() - t0:.1f}s (작업 프로세스 {workers}개)")
+    print(f"요약: {_write_summary(out_dir)}")
+    if failed:
+        print(f"[WARN] 실패한 시도 {len(failed)}개: {', '.join(failed)} — 같은 명령으로 다시 실행하면 이어서 산출합니다.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,494 @@
+"""
+포화도 파이프라인 성능 벤치마크 (회귀 감시용)
+
+합성 데이터셋(scripts/generate_synthetic_data.py)을 대상으로 다음을 측정합니다.
+  pipeline.*  : DataMerger.run — analysis_level 별 (dong / sido / national)
+  stage.*     : modules/data_merge.py 단계 함수 (경계 읽기, 공간 조인, 병합, 지수, 평당가 보강 등)
+  query.*     : PopulationAPIClient / HospitalAPIClient 조회 메서드
+  figure.*    : app.py 지도·막대·산점도 figure 생성 (캐시 비운 상태)
+
+항목마다 시간(반복 측정 중앙값·최솟값)과 최대 메모리(tracemalloc peak, 별도 1회 실행)를 기록하고
+JSON 으로 저장합니다. 기준선(--baseline)이 있으면 비교하여 허용치(--tolerance)를 넘게
+느려지거나 메모리가 늘어난 항목을 표시하고 종료코드 1 로 끝납니다.
+
+데이터셋: --db/--geojson 을 주지 않으면 data/bench/ 아래에 --scale/--seed 로 합성 데이터셋을
+만들어(이미 있으면 재사용) 사용합니다. SUPABASE_DB_URL 이 설정되어 있으면 조회는 Supabase 로 갑니다.
+
+백엔드 비교(--backends): 같은 항목을 SQLite / DuckDB(Parquet) / PostgreSQL 로 각각 측정해
+첫 번째 백엔드 대비 배율을 표로 보여 줍니다 (기준선 비교 없음, figure 항목 제외).
+  duckdb   : 데이터셋 옆 parquet/ 가 없거나 오래됐으면 scripts/build_parquet.py 로 먼저 만듭니다.
+  postgres : --pg-url 의 DB 에 같은 데이터셋이 적재되어 있어야 합니다 (migrate_to_supabase.py).
+             pipeline.*.summary 는 서버측 집계 경로(summary_only=True)입니다.
+
+실행 (프로젝트 루트에서):
+  python scripts/benchmark.py                              # 전국 규모 합성 데이터, 전체 항목
+  python scripts/benchmark.py --scale 0.2 --repeat 5
+  python scripts/benchmark.py --only pipeline. figure.     # 이름 접두어로 선택
+  python scripts/benchmark.py --save-baseline              # 결과를 기준선으로 저장
+  python scripts/benchmark.py --tolerance 0.3              # 기준선 대비 30% 초과 시 실패
+  python scripts/benchmark.py --profile-sql                # SQL 실행계획·전체 스캔 보고서 함께 저장
+  python scripts/benchmark.py --db data/saturation.db --levels national \
+      --backends sqlite duckdb postgres --pg-url postgresql://...   # 백엔드별 전국 실행 비교
+"""
+
+import argparse
+import gc
+import json
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import config  # noqa: E402
+from modules import analysis, query_profiler  # noqa: E402
+
+BENCH_DIR = BASE_DIR / "data" / "bench"
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+LEVELS = ("dong", "sido", "national")
+BACKENDS = ("sqlite", "duckdb", "postgres")
+
+# 벤치마크 조건 (기준선과 같아야 비교 의미가 있음)
+SPECIALTIES = ["01", "05", "11", "12", "14"]
+NUM_COL, DEN_COL = "총인구수", "clinic_count"
+YEAR_MONTH = "202512"
+BENCH_SIDO = "서울특별시"
+
+# 이 값보다 작은 차이는 측정 잡음으로 보고 회귀로 판정하지 않음
+MIN_DELTA_SEC = 0.005
+MIN_DELTA_MB = 1.0
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 데이터셋
+# ─────────────────────────────────────────────────────────────────────────────
+def prepare_dataset(db: Path | None, geojson: Path | None, scale: float, seed: int) -> tuple[Path, Path]:
+    if db is not None:
+        if geojson is None:
+            from modules.data_merge import _DEFAULT_GEOJSON
+            geojson = _DEFAULT_GEOJSON
+        return Path(db), Path(geojson)
+    from scripts.generate_synthetic_data import default_out_dir, generate
+    out_dir = default_out_dir(scale, seed)
+    db_path = out_dir / "saturation.db"
+    geo_path = out_dir / "geojson" / "national_dong.geojson"
+    if not (db_path.exists() and geo_path.exists()):
+        generate(out_dir, seed=seed, scale=scale, force=True)
+    return db_path, geo_path
+
+
+def use_dataset(db_path: Path, geojson_path: Path) -> None:
+    """데이터 모듈·앱이 읽는 DB·경계 경로를 벤치마크 데이터셋으로 교체"""
+    import modules.data_merge as data_merge
+    import modules.hospital_api as hospital_api
+    import modules.population_api as population_api
+    population_api.DB_PATH = str(db_path)
+    hospital_api.DB_PATH = str(db_path)
+    data_merge._DB_PATH = db_path
+    data_merge._DEFAULT_GEOJSON = geojson_path
+
+
+def dataset_info(db_path: Path, geojson_path: Path) -> dict:
+    conn = sqlite3.connect(f"{db_path.as_uri()}?mode=ro", uri=True)
+    try:
+        tables = [r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")]
+        rows = {t: conn.execute(f'SELECT COUNT(*) FROM "{t}"').fetchone()[0] for t in tables}
+    finally:
+        conn.close()
+    return {"db": str(db_path), "geojson": str(geojson_path),
+            "db_mb": round(db_path.stat().st_size / 1024 / 1024, 1), "rows": rows}
+
+
+def use_backend(backend: str, pg_url: str = "") -> None:
+    """데이터 모듈이 조회할 DB 엔진 전환 (연결 시점마다 config 를 읽으므로 즉시 반영)"""
+    config.SUPABASE_DB_URL = pg_url if backend == "postgres" else ""
+    config.LOCAL_DB_ENGINE = "duckdb" if backend == "duckdb" else "sqlite"
+
+
+def prepare_backend(backend: str, db_path: Path, pg_url: str, rows: dict) -> None:
+    """duckdb: Parquet 준비 / postgres: 접속·행 수 확인 (다르면 경고)"""
+    if backend == "duckdb":
+        from scripts.build_parquet import build_parquet, is_fresh
+        if not is_fresh(db_path):
+            print(f"Parquet 생성: {db_path.parent / 'parquet'}")
+            build_parquet(db_path)
+    elif backend == "postgres":
+        if not pg_url:
+            raise SystemExit("[ERROR] postgres 백엔드에는 --pg-url 또는 SUPABASE_DB_URL 이 필요합니다")
+        from modules.data_merge import _get_conn
+        use_backend(backend, pg_url)
+        conn = _get_conn()
+        try:
+            cur = conn.cursor()
+            for table in ("population_house", "hospital_info"):
+                cur.execute(f"SELECT COUNT(*) FROM {table}")
+                n = cur.fetchone()[0]
+                if n != rows.get(table):
+                    print(f"⚠ PostgreSQL {table} {n:,}행 ≠ 데이터셋 {rows.get(table, 0):,}행 — 같은 데이터가 아닙니다.")
+        finally:
+            conn.close()
+
+
+def _load_app(geojson_path: Path):
+    """app.py 를 streamlit run 없이 import (figure 함수만 사용)"""
+    from streamlit import config as st_config
+    from streamlit import logger as st_logger
+    st_config.get_option("logger.level")  # 설정 파싱 시 로그 레벨이 초기화되므로 먼저 파싱
+    st_logger.set_log_level("error")      # bare mode 경고 억제
+    import app
+    app.GEOJSON_PATH = geojson_path
+    app._load_geojson.clear()
+    return app
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 측정
+# ─────────────────────────────────────────────────────────────────────────────
+def _rows(out) -> int | None:
+    if isinstance(out, (pd.DataFrame, pd.Series)):
+        return len(out)
+    if isinstance(out, dict) and "saturation" in out:
+        return sum(len(df) for df in out["saturation"].values() if df is not None)
+    if isinstance(out, dict) and "rows_by_key" not in out:
+        return len(out)
+    return None
+
+
+def measure(fn: Callable, reset: Callable | None, repeat: int, warmup: int) -> dict:
+    """반복 측정 시간 + tracemalloc 최대 메모리 (추적 오버헤드가 시간에 섞이지 않도록 별도 1회)"""
+    for _ in range(warmup):
+        if reset: reset()
+        fn()
+    times, out = [], None
+    for _ in range(repeat):
+        if reset: reset()
+        gc.collect()
+        t = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t)
+    if reset: reset()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    result = {
+        "median": round(statistics.median(times), 5),
+        "min": round(min(times), 5),
+        "seconds": [round(t, 5) for t in times],
+        "peak_mb": round(peak / 1024 / 1024, 2),
+        "rows": _rows(out),
+    }
+    if isinstance(out, dict) and "timings" in out:
+        result["stages"] = {r["stage"]: r["seconds"] for r in out["timings"] if r.get("seconds")}
+    return result
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 항목 정의
+# ─────────────────────────────────────────────────────────────────────────────
+def _run_args(level: str, sgg: tuple[str, str]) -> dict:
+    from modules.hospital_api import HIRA_SIDO_CODES
+    from modules.population_api import SIDO_CODES
+    sgg_cd, sgg_nm = sgg
+    if level == "national":
+        return {"sgg_cd_pop": "", "hira_sido_cd": "", "sgg_name": ""}
+    if level == "sido":
+        return {"sgg_cd_pop": SIDO_CODES[BENCH_SIDO], "hira_sido_cd": HIRA_SIDO_CODES[BENCH_SIDO], "sgg_name": ""}
+    return {"sgg_cd_pop": sgg_cd, "hira_sido_cd": HIRA_SIDO_CODES[BENCH_SIDO], "sgg_name": sgg_nm}
+
+
+def build_cases(geojson_path: Path, levels: list[str], with_app: bool,
+                with_summary: bool = False) -> list[tuple[str, Callable, Callable | None]]:
+    """(이름, 측정 함수, 반복 전 초기화 함수) 목록. with_summary: pipeline.*.summary(summary_only=True) 추가"""
+    from modules import data_merge as dm
+    from modules.hospital_api import HIRA_SIDO_CODES, HospitalAPIClient
+    from modules.population_api import SIDO_CODES, PopulationAPIClient
+
+    pop_client, hosp_client = PopulationAPIClient(), HospitalAPIClient()
+    sido_cd, hira_sido = SIDO_CODES[BENCH_SIDO], HIRA_SIDO_CODES[BENCH_SIDO]
+    sgg_list = pop_client.get_sgg_list(sido_cd)
+    if sgg_list.empty:
+        raise RuntimeError(f"{BENCH_SIDO} 시군구가 DB 에 없습니다")
+    sgg = (str(sgg_list["admmCd"].iloc[0]), str(sgg_list["sggNm"].iloc[0]))
+    merger = dm.DataMerger(geojson_path)
+    sp = SPECIALTIES[0]
+
+    cases = []
+    # ── 조회 메서드 ──
+    cases += [
+        ("query.population.get_sgg_list", lambda: pop_client.get_sgg_list(sido_cd), None),
+        ("query.population.get_merged[lv1]", lambda: pop_client.get_merged(sido_cd, YEAR_MONTH, lv="1"), None),
+        ("query.population.get_merged[lv2]", lambda: pop_client.get_merged(sido_cd, YEAR_MONTH, lv="2"), None),
+        ("query.population.get_merged[lv3]", lambda: pop_client.get_merged(sgg[0], YEAR_MONTH, lv="3"), None),
+        ("query.population.get_population[lv3]", lambda: pop_client.get_population(sgg[0], YEAR_MONTH, lv="3"), None),
+        ("query.population.get_age_population[lv3]",
+         lambda: pop_client.get_age_population(sgg[0], YEAR_MONTH, lv="3"), None),
+        ("query.hospital.get_sgg_list", lambda: hosp_client.get_sgg_list(hira_sido), None),
+        ("query.hospital.get_hospitals", lambda: hosp_client.get_hospitals(hira_sido, specialty_cd=sp), None),
+        ("query.hospital.get_hospitals_multi",
+         lambda: hosp_client.get_hospitals_multi(hira_sido, specialty_codes=SPECIALTIES), None),
+        ("stage._get_hira_to_pop_map", dm._get_hira_to_pop_map, None),
+    ]
+
+    # ── 경계 읽기 (프로세스 캐시 미적중 비용) ──
+    geo_mtime = geojson_path.stat().st_mtime
+    cases.append(("stage.read_dong_polygons",
+                  lambda: dm._read_dong_polygons.__wrapped__(str(geojson_path), geo_mtime), None))
+    gdf_dong, _ = dm._dong_polygons(geojson_path)
+
+    app = _load_app(geojson_path) if with_app else None
+    for level in levels:
+        args = _run_args(level, sgg)
+        run = lambda a=args, lv=level: merger.run(specialty_codes=SPECIALTIES, year_month=YEAR_MONTH,
+                                                    num_col=NUM_COL, den_col=DEN_COL, analysis_level=lv, **a)
+        cases.append((f"pipeline.{level}", run, None))
+        if with_summary:
+            cases.append((f"pipeline.{level}.summary", lambda a=args, lv=level: merger.run(
+                specialty_codes=SPECIALTIES, year_month=YEAR_MONTH, num_col=NUM_COL, den_col=DEN_COL,
+                analysis_level=lv, summary_only=True, **a), None))
+
+        # 단계 함수 입력 준비 (측정 대상 아님)
+        res = run()
+        pop_df, hosp_mapped, summary = res["population"], res["hospitals"], res["hospital_summary"]
+        hosp_raw = hosp_mapped.drop(columns=["adm_cd2", "match_key"], errors="ignore")
+        merged = dm.merge_with_population(pop_df, summary, sp)
+        si_base = dm.calc_saturation_index(merged, NUM_COL, DEN_COL)
+        mk_len = dm._MK_LEN.get(level, 10)
+
+        def _price_stats(n=mk_len):
+            conn = dm._get_conn()
+            try:
+                return dm._load_price_stats(conn, n)
+            finally:
+                conn.close()
+
+        cases += [
+            (f"stage.map_hospitals_to_dong[{level}]",
+             lambda h=hosp_raw: dm.map_hospitals_to_dong(h, geojson_path, gdf_dong=gdf_dong), None),
+            (f"stage.merge_with_population[{level}]",
+             lambda p=pop_df, s=summary: dm.merge_with_population(p, s, sp), None),
+            (f"stage.calc_saturation_index[{level}]",
+             lambda m=merged: dm.calc_saturation_index(m, NUM_COL, DEN_COL), None),
+            (f"stage._load_price_stats[{level}]", _price_stats, None),
+            (f"stage.enrich_with_apt_price[{level}]",
+             lambda s=si_base, lv=level: dm.enrich_with_apt_price(s, lv), None),
+            (f"stage.calc_income_index[{level}]",
+             lambda s=si_base, lv=level: dm.calc_income_index(dm.enrich_with_apt_price(s, lv), lv), None),
+            (f"stage.build_hospital_index[{level}]", lambda h=hosp_mapped: dm.build_hospital_index(h), None),
+        ]
+
+        if app is None:
+            continue
+        # ── figure (sido/national 은 앱과 같이 dissolve 된 경계 사용) ──
+        if level == "dong":
+            geojson, geo_key = app._load_geojson(), "base"
+        else:
+            full = analysis.load_data(args["sgg_cd_pop"], args["hira_sido_cd"], args["sgg_name"], tuple(SPECIALTIES),
+                                      YEAR_MONTH, NUM_COL, DEN_COL, analysis_level=level,
+                                      geojson_path=app.GEOJSON_PATH)
+            geojson, geo_key = full["geojson_dissolved"], full["geojson_key"]
+        si_df = res["saturation"][sp]
+        index = res["hospital_index"]
+        markers = analysis.clinics_in(hosp_mapped, index, None, sp)
+        markers = markers[(markers["XPos"] != 0) & (markers["YPos"] != 0)]
+
+        def _clear_figures():
+            app._region_layer.clear()
+
+        cases += [
+            (f"figure.choropleth[{level}]",
+             lambda s=si_df, g=geojson, k=geo_key, lv=level: app._make_choropleth(s, g, geo_key=k, analysis_level=lv),
+             _clear_figures),
+            (f"figure.choropleth_markers[{level}]",
+             lambda s=si_df, g=geojson, k=geo_key, m=markers, lv=level:
+                 app._make_choropleth(s, g, hospital_markers=m, geo_key=k, analysis_level=lv),
+             _clear_figures),
+            (f"figure.bar_chart[{level}]", lambda s=si_df: app._make_bar_chart(s), None),
+            (f"figure.scatter_chart[{level}]", lambda s=si_df: app._make_scatter_chart(s), None),
+        ]
+    return cases
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 기준선 비교
+# ─────────────────────────────────────────────────────────────────────────────
+def compare(current: dict, baseline: dict, tolerance: float, mem_tolerance: float) -> list[dict]:
+    rows = []
+    for name, cur in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        t_ratio = cur["median"] / base["median"] if base["median"] else float("inf")
+        m_ratio = cur["peak_mb"] / base["peak_mb"] if base["peak_mb"] else float("inf")
+        slow = t_ratio > 1 + tolerance and cur["median"] - base["median"] > MIN_DELTA_SEC
+        fat = m_ratio > 1 + mem_tolerance and cur["peak_mb"] - base["peak_mb"] > MIN_DELTA_MB
+        rows.append({"name": name, "base_s": base["median"], "cur_s": cur["median"], "time_ratio": t_ratio,
+                     "base_mb": base["peak_mb"], "cur_mb": cur["peak_mb"], "mem_ratio": m_ratio,
+                     "regression": slow or fat})
+    return rows
+
+
+def run_backends(args, db_path: Path, geo_path: Path, info: dict) -> dict:
+    """백엔드별로 같은 항목 측정 → {"백엔드": {"항목": 결과}} (표 출력 포함)"""
+    by_backend = {}
+    for backend in args.backends:
+        prepare_backend(backend, db_path, args.pg_url, info["rows"])
+        use_backend(backend, args.pg_url)
+        cases = build_cases(geo_path, args.levels, with_app=False, with_summary=True)
+        if args.only:
+            cases = [c for c in cases if any(c[0].startswith(p) for p in args.only)]
+        print(f"\n[{backend}]")
+        results = {}
+        for name, fn, reset in cases:
+            results[name] = measure(fn, reset, args.repeat, args.warmup)
+            print(f"  {name:<46}{results[name]['median']:>10.4f}s")
+        by_backend[backend] = results
+
+    base = args.backends[0]
+    names = list(dict.fromkeys(n for res in by_backend.values() for n in res))
+    print(f"\n백엔드 비교 (중앙값 초, 괄호는 {base} 대비 배율)")
+    print(f"{'항목':<48}" + "".join(f"{b:>20}" for b in args.backends))
+    for name in names:
+        ref = by_backend[base].get(name, {}).get("median")
+        cells = []
+        for b in args.backends:
+            cur = by_backend[b].get(name)
+            if cur is None:
+                cells.append(f"{'-':>20}")
+            elif b == base or not ref:
+                cells.append(f"{cur['median']:>20.4f}")
+            else:
+                cells.append(f"{cur['median']:>12.4f} ({cur['median'] / ref:>5.2f}x)")
+        print(f"{name:<48}" + "".join(cells))
+    return by_backend
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return ""
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="포화도 파이프라인 성능 벤치마크")
+    parser.add_argument("--db", type=Path, default=None, help="대상 SQLite DB (기본: 합성 데이터셋)")
+    parser.add_argument("--geojson", type=Path, default=None, help="행정동 경계 GeoJSON (--db 와 함께)")
+    parser.add_argument("--scale", type=float, default=1.0, help="합성 데이터셋 규모 (generate_synthetic_data --scale)")
+    parser.add_argument("--seed", type=int, default=42, help="합성 데이터셋 시드")
+    parser.add_argument("--levels", nargs="+", default=list(LEVELS), choices=LEVELS)
+    parser.add_argument("--only", nargs="*", default=None, help="이름 접두어 필터 (예: pipeline. stage.map)")
+    parser.add_argument("--no-app", action="store_true", help="app.py figure 항목 제외")
+    parser.add_argument("--repeat", type=int, default=3, help="측정 반복 횟수 (기본 3)")
+    parser.add_argument("--warmup", type=int, default=1, help="측정 전 예열 실행 횟수 (기본 1)")
+    parser.add_argument("--out", type=Path, default=None, help="결과 JSON 경로 (기본: data/bench/results-<시각>.json)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="비교할 기준선 JSON")
+    parser.add_argument("--save-baseline", action="store_true", help="이번 결과를 기준선으로 저장")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="허용 시간 증가율 (기본 0.25 = 25%%)")
+    parser.add_argument("--profile-sql", action="store_true",
+                        help="SQL 쿼리 프로파일 보고서(EXPLAIN 포함)를 결과 JSON 옆에 저장")
+    parser.add_argument("--mem-tolerance", type=float, default=0.25, help="허용 메모리 증가율 (기본 0.25)")
+    parser.add_argument("--backends", nargs="+", default=None, choices=BACKENDS,
+                        help="백엔드별 비교 측정 (첫 번째가 배율 기준, 예: sqlite duckdb postgres)")
+    parser.add_argument("--pg-url", default=config.SUPABASE_DB_URL,
+                        help="postgres 백엔드 접속 URI (기본 SUPABASE_DB_URL)")
+    args = parser.parse_args()
+
+    db_path, geo_path = prepare_dataset(args.db, args.geojson, args.scale, args.seed)
+    use_dataset(db_path, geo_path)
+    info = dataset_info(db_path, geo_path)
+    print(f"데이터셋: {db_path} ({info['db_mb']} MB, 병의원 {info['rows'].get('hospital_info', 0):,}곳)")
+
+    if args.backends:
+        prof = query_profiler.enable() if args.profile_sql else None
+        by_backend = run_backends(args, db_path, geo_path, info)
+        report = {
+            "meta": {
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "commit": _git_commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "repeat": args.repeat, "warmup": args.warmup,
+                "scale": None if args.db else args.scale, "seed": None if args.db else args.seed,
+                "dataset": info, "backends": args.backends,
+            },
+            "backends": by_backend,
+        }
+        out = args.out or BENCH_DIR / f"backends-{datetime.now():%Y%m%d-%H%M%S}.json"
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n결과 저장: {out}")
+        if prof is not None:
+            print(f"쿼리 프로파일: {prof.write_report(out.with_suffix('.queries.md'))}")
+        return 0
+
+    cases = build_cases(geo_path, args.levels, with_app=not args.no_app)
+    if args.only:
+        cases = [c for c in cases if any(c[0].startswith(p) for p in args.only)]
+
+    prof = query_profiler.enable() if args.profile_sql else None
+    results = {}
+    print(f"\n{'항목':<48}{'중앙값(s)':>11}{'최소(s)':>10}{'메모리(MB)':>12}{'행':>9}")
+    for name, fn, reset in cases:
+        r = measure(fn, reset, args.repeat, args.warmup)
+        results[name] = r
+        rows = f"{r['rows']:,}" if r["rows"] is not None else "-"
+        print(f"{name:<48}{r['median']:>11.4f}{r['min']:>10.4f}{r['peak_mb']:>12.1f}{rows:>9}")
+
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat, "warmup": args.warmup,
+            "scale": None if args.db else args.scale, "seed": None if args.db else args.seed,
+            "dataset": info,
+        },
+        "results": results,
+    }
+    out = args.out or BENCH_DIR / f"results-{datetime.now():%Y%m%d-%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\n결과 저장: {out}")
+    if prof is not None:
+        print(f"쿼리 프로파일: {prof.write_report(out.with_suffix('.queries.md'))}")
+
+    failed = False
+    if args.baseline.exists() and not args.save_baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if baseline.get("meta", {}).get("dataset", {}).get("rows") != info["rows"]:
+            print("⚠ 기준선과 데이터셋 행 수가 다릅니다 — 비교 결과를 참고용으로만 보세요.")
+        rows = compare(report, baseline, args.tolerance, args.mem_tolerance)
+        print(f"\n기준선 비교: {args.baseline} (허용 시간 +{args.tolerance:.0%}, 메모리 +{args.mem_tolerance:.0%})")
+        for r in rows:
+            mark = "✗ 회귀" if r["regression"] else "  ok"
+            print(f"{mark}  {r['name']:<48}{r['base_s']:>9.4f}s → {r['cur_s']:>9.4f}s ({r['time_ratio']:>5.2f}x)"
+                  f"  {r['base_mb']:>8.1f} → {r['cur_mb']:>8.1f} MB ({r['mem_ratio']:>5.2f}x)")
+        regressions = [r for r in rows if r["regression"]]
+        failed = bool(regressions)
+        print(f"\n회귀 {len(regressions)}건 / 비교 {len(rows)}건")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"기준선 저장: {args.baseline}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
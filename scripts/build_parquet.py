@@ -0,0 +1,165 @@
+"""
+DuckDB 백엔드용 Parquet 내보내기
+
+data/saturation.db (create_local_db.py / import_apt_price.py 결과)의 테이블을
+data/parquet/<테이블>.parquet 로 내보냅니다.
+  1. 컬럼 타입은 실제 저장 값 기준 (정수→int64, 실수→float64, 문자열 섞임→string)
+  2. 테이블별 주 조회 키로 정렬해 기록
+     → 행 그룹 min/max 통계로 DuckDB 가 조건(adm_cd LIKE '11%', sido_cd = ? 등)에 맞지 않는 행 그룹을 건너뜀
+  3. 테이블마다 임시 파일에 쓴 뒤 원자적으로 교체하고, 마지막에 _manifest.json 기록
+
+앱은 LOCAL_DB_ENGINE=duckdb 일 때 이 디렉터리를 조회합니다 (modules/db.py).
+DB를 재구축한 뒤에는 이 스크립트를 다시 실행하세요.
+
+실행:
+  python scripts/build_parquet.py
+  python scripts/build_parquet.py --db data/bench/synthetic_s1_seed42/saturation.db
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from modules.db import DB_PATH, PARQUET_MANIFEST, parquet_dir  # noqa: E402
+
+# 행 그룹 크기 (DuckDB 자체 행 그룹과 같은 122,880행)
+ROW_GROUP_SIZE = 122_880
+BATCH_ROWS = 100_000
+
+# 테이블별 정렬 키 — population_api / hospital_api / data_merge 조회 조건 기준 (컬럼이 있을 때만)
+SORT_KEYS = {
+    "population_house":    ["adm_cd"],
+    "population_age":      ["adm_cd"],
+    "hospital_info":       ["sido_cd", "cl_cd", "ykiho"],
+    "hospital_specialty":  ["ykiho", "dgsbjt_cd"],
+    "region_code_mapping": ["bjd_cd"],
+    "region_crosswalk":    ["hira_sggu_cd"],
+    "apt_price_bjd":       ["bjd_cd"],
+    "apt_price_sketch":    ["bjd_cd", "ym"],
+}
+
+
+def _arrow_type(declared: str):
+    """SQLite 선언 타입 → Arrow 타입 (타입 친화성 규칙과 같은 순서로 판정)"""
+    import pyarrow as pa
+    t = (declared or "").upper()
+    if "INT" in t:
+        return pa.int64()
+    if any(k in t for k in ("REAL", "FLOA", "DOUB")):
+        return pa.float64()
+    return pa.string()
+
+
+def _schema(conn: sqlite3.Connection, table: str):
+    """
+    컬럼별 실제 저장 타입(typeof)으로 Arrow 스키마 결정.
+    정수만 → int64, 실수(정수 섞임 포함) → float64, 문자열·BLOB 이 섞이면 string, 전부 NULL 이면 선언 타입
+    """
+    import pyarrow as pa
+    fields = []
+    for _, name, declared, *_rest in conn.execute(f'PRAGMA table_info("{table}")').fetchall():
+        kinds = {r[0] for r in conn.execute(f'SELECT DISTINCT typeof("{name}") FROM "{table}"')} - {"null"}
+        if not kinds:
+            typ = _arrow_type(declared)
+        elif kinds == {"integer"}:
+            typ = pa.int64()
+        elif kinds <= {"integer", "real"}:
+            typ = pa.float64()
+        else:
+            typ = pa.string()
+        fields.append(pa.field(name, typ))
+    return pa.schema(fields)
+
+
+def _export_table(conn: sqlite3.Connection, table: str, path: Path) -> int:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    cols = [r[1] for r in conn.execute(f'PRAGMA table_info("{table}")')]
+    keys = [c for c in SORT_KEYS.get(table, []) if c in cols]
+    order = " ORDER BY " + ", ".join(f'"{k}"' for k in keys) if keys else ""
+    schema = _schema(conn, table)
+
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.part")
+    rows = 0
+    cur = conn.execute(f'SELECT * FROM "{table}"{order}')
+    try:
+        with pq.ParquetWriter(tmp, schema, compression="zstd") as writer:
+            while batch := cur.fetchmany(BATCH_ROWS):
+                arrays = []
+                for i, field in enumerate(schema):
+                    values = [r[i] for r in batch]
+                    if field.type == pa.string():
+                        values = [None if v is None else str(v) for v in values]
+                    arrays.append(pa.array(values, type=field.type))
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema), row_group_size=ROW_GROUP_SIZE)
+                rows += len(batch)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    return rows
+
+
+def build_parquet(src: Path = DB_PATH, out_dir: Path | None = None) -> Path:
+    src = Path(src)
+    out_dir = Path(out_dir) if out_dir else parquet_dir(src)
+    if not src.exists():
+        raise FileNotFoundError(f"원본 DB를 찾을 수 없습니다: {src}")
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect(f"{src.as_uri()}?mode=ro", uri=True)
+    try:
+        tables = [r[0] for r in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name")]
+        counts = {}
+        for table in tables:
+            counts[table] = _export_table(conn, table, out_dir / f"{table}.parquet")
+            size = (out_dir / f"{table}.parquet").stat().st_size / 1024 / 1024
+            print(f"  [{table}] {counts[table]:,}행 → {size:.1f} MB")
+    finally:
+        conn.close()
+
+    # 이전 빌드에만 있던 테이블 파일 정리
+    for stale in out_dir.glob("*.parquet"):
+        if stale.stem not in counts:
+            stale.unlink()
+
+    manifest = {"source": str(src), "source_mtime_ns": src.stat().st_mtime_ns,
+                "created": datetime.now().isoformat(timespec="seconds"), "tables": counts}
+    tmp = out_dir / f"{PARQUET_MANIFEST}.part"
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, out_dir / PARQUET_MANIFEST)
+
+    src_mb = src.stat().st_size / 1024 / 1024
+    out_mb = sum(p.stat().st_size for p in out_dir.glob("*.parquet")) / 1024 / 1024
+    print(f"\n[OK] Parquet 저장: {out_dir}")
+    print(f"  크기: {src_mb:.1f} MB → {out_mb:.1f} MB ({len(counts)}개 테이블)")
+    return out_dir
+
+
+def is_fresh(src: Path = DB_PATH, out_dir: Path | None = None) -> bool:
+    """Parquet 이 현재 원본 DB 로 만들어졌는지 (manifest 의 원본 수정 시각 비교)"""
+    manifest = (Path(out_dir) if out_dir else parquet_dir(src)) / PARQUET_MANIFEST
+    if not manifest.exists():
+        return False
+    return json.loads(manifest.read_text(encoding="utf-8")).get("source_mtime_ns") == Path(src).stat().st_mtime_ns
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DuckDB 백엔드용 Parquet 내보내기")
+    parser.add_argument("--db", type=Path, default=DB_PATH, help="원본 SQLite DB (기본 data/saturation.db)")
+    parser.add_argument("--out", type=Path, default=None, help="출력 디렉터리 (기본: DB 옆 parquet/)")
+    args = parser.parse_args()
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        sys.exit("[ERROR] pyarrow 가 필요합니다 (pip install pyarrow)")
+    build_parquet(args.db, args.out)
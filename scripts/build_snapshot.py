@@ -0,0 +1,127 @@
+"""
+서빙용 읽기 전용 DB 스냅샷 빌드
+
+data/saturation.db (create_local_db.py / import_apt_price.py 결과)를 복사하여
+  1. population_api / hospital_api / data_merge 조회 경로용 (커버링) 인덱스 생성
+  2. ANALYZE 로 쿼리 플래너 통계 수집
+  3. page_size 조정 후 VACUUM 으로 압축
+한 뒤 data/saturation.snapshot.db 로 원자적 교체합니다.
+
+앱(modules/db.py)은 스냅샷이 원본보다 최신이면 읽기 전용·immutable·mmap 모드로 엽니다.
+DB를 재구축한 뒤에는 이 스크립트를 다시 실행하세요.
+
+실행:
+  python scripts/build_snapshot.py
+  python scripts/build_snapshot.py --page-size 8192
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from modules.db import DB_PATH, snapshot_path  # noqa: E402
+
+# 분석성 스캔 위주 워크로드 → 기본 4096보다 큰 페이지가 유리
+DEFAULT_PAGE_SIZE = 16384
+
+# (인덱스명, 테이블, 컬럼 정의) — 테이블·컬럼이 있는 경우에만 생성
+SNAPSHOT_INDEXES = [
+    # population_api: adm_cd LIKE '11110%' → NOCASE 인덱스여야 LIKE 최적화 적용
+    ("idx_snap_house_adm_cd", "population_house", ["adm_cd COLLATE NOCASE"]),
+    ("idx_snap_age_adm_cd", "population_age", ["adm_cd COLLATE NOCASE"]),
+    # calc_income_index: total_pop > 0 스캔 + 30~59세 컬럼 (커버링)
+    ("idx_snap_age_active", "population_age",
+     ["total_pop", "adm_cd", "age_30_39", "age_40_49", "age_50_59"]),
+    # hospital_api.get_hospitals(_multi): sido_cd = ? AND cl_cd IN (...) → ykiho 조인
+    ("idx_snap_hosp_sido_cl", "hospital_info", ["sido_cd", "cl_cd", "ykiho"]),
+    # hospital_api.get_sgg_list: DISTINCT sigungu_cd, sgg_nm WHERE sido_cd = ? (커버링)
+    ("idx_snap_hosp_sido_sgg", "hospital_info", ["sido_cd", "sigungu_cd", "sgg_nm"]),
+    # hospital_specialty 조인 측 (커버링)
+    ("idx_snap_spec_cover", "hospital_specialty", ["ykiho", "dgsbjt_cd", "dgsbjt_cd_nm", "dr_cnt"]),
+    # 아파트 평당가 조인: bjd_cd → hjd_cd (커버링)
+    ("idx_snap_map_bjd_hjd", "region_code_mapping", ["bjd_cd", "hjd_cd"]),
+    ("idx_snap_apt_bjd_cover", "apt_price_bjd", ["bjd_cd", "avg_price_per_pyeong", "trade_count"]),
+    ("idx_snap_sketch_bjd", "apt_price_sketch", ["bjd_cd", "ym"]),
+    # _get_hira_to_pop_map (커버링)
+    ("idx_snap_xw_hira_pop", "region_crosswalk", ["hira_sggu_cd", "pop_sgg_cd"]),
+]
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> set:
+    return {r[1] for r in conn.execute(f'PRAGMA table_info("{table}")')}
+
+
+def _create_indexes(conn: sqlite3.Connection) -> int:
+    created = 0
+    for name, table, cols in SNAPSHOT_INDEXES:
+        existing = _columns(conn, table)
+        if not existing or not all(c.split()[0] in existing for c in cols):
+            print(f"  - {name}: {table} 테이블/컬럼 없음 — 건너뜀")
+            continue
+        conn.execute(f'CREATE INDEX IF NOT EXISTS {name} ON "{table}" ({", ".join(cols)})')
+        created += 1
+    conn.commit()
+    return created
+
+
+def build_snapshot(src: Path = DB_PATH, dst: Path | None = None,
+                   page_size: int = DEFAULT_PAGE_SIZE) -> Path:
+    src = Path(src)
+    dst = Path(dst) if dst else snapshot_path(src)
+    if not src.exists():
+        raise FileNotFoundError(f"원본 DB를 찾을 수 없습니다: {src}")
+
+    tmp = dst.with_name(dst.name + ".building")
+    if tmp.exists():
+        tmp.unlink()
+
+    try:
+        # 1) 일관된 복사본 (원본은 읽기 전용으로만 열기)
+        print(f"1. 복사: {src.name} → {tmp.name}")
+        src_conn = sqlite3.connect(f"{src.as_uri()}?mode=ro", uri=True)
+        conn = sqlite3.connect(tmp)
+        src_conn.backup(conn)
+        src_conn.close()
+
+        # 2) 인덱스 + 통계
+        print("2. 조회 경로 인덱스 생성 중...")
+        n_idx = _create_indexes(conn)
+        print(f"  - {n_idx}개 인덱스 적용")
+        print("3. ANALYZE ...")
+        conn.execute("ANALYZE")
+        conn.commit()
+
+        # 3) 페이지 크기 변경은 rollback 저널 모드에서 VACUUM 시 적용됨
+        print(f"4. VACUUM (page_size={page_size}) ...")
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.execute(f"PRAGMA page_size={page_size}")
+        conn.execute("VACUUM")
+        actual = conn.execute("PRAGMA page_size").fetchone()[0]
+        integrity = conn.execute("PRAGMA quick_check").fetchone()[0]
+        conn.close()
+        if integrity != "ok":
+            raise RuntimeError(f"스냅샷 무결성 검사 실패: {integrity}")
+
+        os.replace(tmp, dst)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+    src_mb = src.stat().st_size / 1024 / 1024
+    dst_mb = dst.stat().st_size / 1024 / 1024
+    print(f"\n[OK] 스냅샷 저장: {dst}")
+    print(f"  크기: {src_mb:.1f} MB → {dst_mb:.1f} MB (page_size={actual})")
+    return dst
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="서빙용 읽기 전용 DB 스냅샷 빌드")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE,
+                        help=f"SQLite 페이지 크기 (기본 {DEFAULT_PAGE_SIZE})")
+    args = parser.parse_args()
+    build_snapshot(page_size=args.page_size)
@@ -0,0 +1,264 @@
+"""
+Supabase 마이그레이션(staging·교체·차분) 동작 확인
+
+PostgreSQL 에 임시 스키마를 만들고, 작은 SQLite DB 를 migrate_to_supabase.sync 로 적재해 확인합니다.
+  1. 전체 재적재     : 원격 내용 = 로컬 내용 (중복 행·NULL·탭/줄바꿈·정수형 실수 포함)
+  2. 교체 중 조회    : 교체 후 커밋 전, 다른 세션의 조회가 잠금 대기 없이(lock_timeout) 기존 데이터를 읽음
+  3. 차분 동기화     : 수정·삭제·추가·중복 건수 변경이 반영되고 달라진 행만 전송됨
+  4. 실패 시 롤백    : 목록 밖 FK 참조 테이블이 있으면 교체가 오류로 중단되고 운영 테이블·참조 행이 그대로
+  5. 데이터 버전     : 적재마다 data_version 행이 바뀌고 analysis.data_version() 에 반영, 실패한 적재는 그대로
+
+PostgreSQL 접속 정보(--pg-url 또는 환경변수 SUPABASE_DB_URL)가 없으면 건너뜁니다 (종료코드 0).
+임시 스키마는 끝나면 삭제합니다.
+
+실행 (프로젝트 루트에서):
+  python scripts/check_migration.py --pg-url postgresql://postgres@localhost/postgres
+실패가 있으면 종료코드 1.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+from collections import Counter
+from pathlib import Path
+from urllib.parse import quote
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from modules import analysis  # noqa: E402
+from scripts import migrate_to_supabase as mig  # noqa: E402
+
+# (SQLite 컬럼 정의, PostgreSQL 컬럼 정의) — 테이블명은 migrate_to_supabase.TABLES 에 있어야 적재 대상
+# 목록 안 FK(hospital_specialty → hospital_info)는 --diff 의 부모 행 수정을 위해 DEFERRABLE
+SCHEMA = {
+    "population_house": ("adm_cd TEXT, total_pop INTEGER, ratio REAL",
+                         "adm_cd text, total_pop integer, ratio double precision"),
+    "hospital_info": ("ykiho TEXT, hosp_nm TEXT, x_pos REAL, dr_tot_cnt INTEGER",
+                      "ykiho text PRIMARY KEY, hosp_nm text, x_pos double precision, dr_tot_cnt integer"),
+    "hospital_specialty": ("ykiho TEXT, dgsbjt_cd TEXT, dr_cnt INTEGER",
+                           "ykiho text REFERENCES hospital_info (ykiho) DEFERRABLE, dgsbjt_cd text, dr_cnt integer"),
+}
+
+
+def _seed(sqlite_conn: sqlite3.Connection) -> None:
+    for table, (cols, _) in SCHEMA.items():
+        sqlite_conn.execute(f'CREATE TABLE "{table}" ({cols})')
+    sqlite_conn.executemany("INSERT INTO population_house VALUES (?, ?, ?)", [
+        ("1111051500", 1200, 0.25), ("1111051500", 1200, 0.25),  # 같은 내용의 중복 행
+        ("1111053000", None, 3000.0), ("2611051000", 980, float("nan")),
+    ])
+    sqlite_conn.executemany("INSERT INTO hospital_info VALUES (?, ?, ?, ?)", [
+        (f"Y{i:04d}", f"의원\t{i}" if i % 7 == 0 else f"의원 {i}\n2층" if i % 11 == 0 else f"의원 {i}",
+         127.0 + i / 1000, i % 5) for i in range(200)
+    ])
+    sqlite_conn.executemany("INSERT INTO hospital_specialty VALUES (?, ?, ?)", [
+        (f"Y{i:04d}", f"{i % 30:02d}", 1 + i % 3) for i in range(200)
+    ])
+    sqlite_conn.commit()
+
+
+def _counts(pg_conn, sqlite_conn, table: str) -> tuple[Counter, Counter]:
+    """(원격, 로컬) 행 해시 건수"""
+    cols = mig._local_columns(sqlite_conn, table)
+    with pg_conn.cursor() as cur:
+        cur.execute(f'SELECT {mig._pg_hash_expr(cols)} FROM "{table}"')
+        remote = Counter(h for (h,) in cur.fetchall())
+    pg_conn.rollback()
+    local = Counter(mig._row_hash(r) for r in mig._iter_local_rows(sqlite_conn, table, cols))
+    return remote, local
+
+
+def _same_content(pg_conn, sqlite_conn) -> list[str]:
+    problems = []
+    for table in SCHEMA:
+        remote, local = _counts(pg_conn, sqlite_conn, table)
+        if remote != local:
+            problems.append(f"{table}: 원격 {sum(remote.values())}행 / 로컬 {sum(local.values())}행, "
+                            f"해시 차이 {len(set(remote.items()) ^ set(local.items()))}종")
+    return problems
+
+
+def _quiet_sync(pg_conn, sqlite_conn, **kwargs) -> str:
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        mig.sync(pg_conn, sqlite_conn, **kwargs)
+    return out.getvalue()
+
+
+def check_full(pg_conn, sqlite_conn) -> list[str]:
+    _quiet_sync(pg_conn, sqlite_conn)
+    return _same_content(pg_conn, sqlite_conn)
+
+
+def check_reader_not_blocked(pg_conn, reader, sqlite_conn) -> list[str]:
+    """교체 SQL 실행 후 커밋 전: 다른 세션 조회가 잠금에 막히지 않고 이전 건수를 읽는지"""
+    problems = []
+    with reader.cursor() as rcur:
+        rcur.execute("SELECT COUNT(*) FROM hospital_info")
+        before = rcur.fetchone()[0]
+    reader.commit()
+
+    sqlite_conn.execute("DELETE FROM hospital_specialty WHERE ykiho >= 'Y0150'")
+    sqlite_conn.execute("DELETE FROM hospital_info WHERE ykiho >= 'Y0150'")
+    sqlite_conn.commit()
+    cols_by_table = {t: mig._local_columns(sqlite_conn, t) for t in SCHEMA}
+    tables = [t for t in mig.TABLES if t in SCHEMA]
+    with pg_conn.cursor() as cur:
+        for t in tables:
+            mig._stage_full(cur, sqlite_conn, t, cols_by_table[t])
+        mig._swap_full(cur, tables, cols_by_table)
+        try:
+            with reader.cursor() as rcur:
+                rcur.execute("SET lock_timeout = '1s'")
+                for t in tables:
+                    rcur.execute(f'SELECT COUNT(*) FROM "{t}"')
+                rcur.execute("SELECT COUNT(*) FROM hospital_info")
+                during = rcur.fetchone()[0]
+            reader.commit()
+            if during != before:
+                problems.append(f"커밋 전 조회 {during}행 — 기존 {before}행이어야 함")
+        except Exception as e:
+            reader.rollback()
+            problems.append(f"교체 중 조회가 막힘: {type(e).__name__}: {str(e).strip()}")
+    pg_conn.commit()
+    return problems + _same_content(pg_conn, sqlite_conn)
+
+
+def check_diff(pg_conn, sqlite_conn) -> list[str]:
+    sqlite_conn.execute("UPDATE hospital_info SET dr_tot_cnt = 99 WHERE ykiho = 'Y0003'")
+    sqlite_conn.execute("DELETE FROM hospital_specialty WHERE ykiho = 'Y0004'")
+    sqlite_conn.execute("INSERT INTO hospital_info VALUES ('Y9999', '신규 의원', 127.5, 1)")
+    sqlite_conn.execute("DELETE FROM population_house WHERE rowid = (SELECT MIN(rowid) FROM population_house)")
+    sqlite_conn.execute("INSERT INTO population_house VALUES ('1111053000', NULL, 3000.0)")
+    sqlite_conn.commit()
+
+    # 달라진 해시의 로컬 행 전체가 전송 대상 (중복 건수가 바뀐 행은 모든 사본 재전송)
+    expected = 0
+    for table in SCHEMA:
+        remote, local = _counts(pg_conn, sqlite_conn, table)
+        expected += sum(n for h, n in local.items() if remote[h] != n)
+
+    log = _quiet_sync(pg_conn, sqlite_conn, diff=True)
+    shipped = sum(int(n.replace(",", "")) for n in re.findall(r"변경 행 ([\d,]+)건", log))
+    problems = [] if shipped == expected else [f"전송 {shipped}행 — 변경 행 {expected}행이어야 함"]
+    return problems + _same_content(pg_conn, sqlite_conn)
+
+
+def check_fk_rollback(pg_conn, sqlite_conn) -> list[str]:
+    """목록 밖 FK 참조 테이블 → DELETE 가 실패해야 하고(CASCADE 로 비우지 않음) 아무것도 바뀌지 않아야 함"""
+    with pg_conn.cursor() as cur:
+        cur.execute("CREATE TABLE clinic_note (ykiho text REFERENCES hospital_info (ykiho), note text)")
+        cur.execute("INSERT INTO clinic_note VALUES ('Y0001', '메모')")
+    pg_conn.commit()
+    remote_before = {t: _counts(pg_conn, sqlite_conn, t)[0] for t in SCHEMA}
+
+    sqlite_conn.execute("UPDATE hospital_info SET hosp_nm = '변경' WHERE ykiho = 'Y0010'")
+    sqlite_conn.commit()
+    try:
+        _quiet_sync(pg_conn, sqlite_conn)
+        return ["FK 참조 테이블이 있는데 전체 교체가 성공함"]
+    except Exception:
+        pass
+
+    problems = [f"{t}: 실패한 교체 후 내용이 바뀜" for t in SCHEMA if _counts(pg_conn, sqlite_conn, t)[0] != remote_before[t]]
+    with pg_conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM clinic_note")
+        if cur.fetchone()[0] != 1:
+            problems.append("clinic_note 행이 사라짐")
+    pg_conn.rollback()
+    return problems
+
+
+def _app_version(scoped_url: str) -> str:
+    """앱·API 가 보는 데이터 버전 (PostgreSQL 모드, 조회 캐시 무시)"""
+    analysis._pg_version_cache.clear()
+    return analysis._pg_data_version(scoped_url)
+
+
+def check_data_version(pg_conn, sqlite_conn, scoped_url: str) -> list[str]:
+    """재적재(변경 없는 --diff 포함)마다 버전이 바뀌고, 실패한 적재(check_fk_rollback 이후)는 버전을 바꾸지 않음"""
+    problems = []
+    before = _app_version(scoped_url)
+    if not before:
+        problems.append("앞선 적재 후에도 data_version 행이 없음")
+    try:
+        _quiet_sync(pg_conn, sqlite_conn)
+    except Exception:
+        pass  # clinic_note FK 로 실패 — 버전 유지되어야 함
+    if _app_version(scoped_url) != before:
+        problems.append("실패한 적재가 data_version 을 바꿈")
+
+    with pg_conn.cursor() as cur:
+        cur.execute("DROP TABLE clinic_note")
+    pg_conn.commit()
+    versions = [before]
+    for diff in (False, True):
+        _quiet_sync(pg_conn, sqlite_conn, diff=diff)
+        versions.append(_app_version(scoped_url))
+    if len(set(versions)) != len(versions):
+        problems.append(f"적재 후 버전이 바뀌지 않음: {versions}")
+    return problems + _same_content(pg_conn, sqlite_conn)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Supabase 마이그레이션 staging·교체·차분 동작 확인")
+    parser.add_argument("--pg-url", default=os.getenv("SUPABASE_DB_URL", ""),
+                        help="PostgreSQL 접속 URI (기본 환경변수 SUPABASE_DB_URL) — 임시 스키마만 사용")
+    opts = parser.parse_args()
+    if not opts.pg_url:
+        print("[SKIP] PostgreSQL 접속 정보 없음 (--pg-url 또는 SUPABASE_DB_URL)")
+        sys.exit(0)
+    import psycopg2
+
+    schema = f"migration_check_{os.getpid()}"
+    admin = psycopg2.connect(opts.pg_url)
+    admin.autocommit = True
+    admin.cursor().execute(f'CREATE SCHEMA "{schema}"')
+    options = f"-c search_path={schema}"
+    scoped_url = f"{opts.pg_url}{'&' if '?' in opts.pg_url else '?'}options={quote(options)}"
+    connect = lambda: psycopg2.connect(opts.pg_url, options=options)
+    pg_conn, reader = connect(), connect()
+    failed = 0
+    try:
+        with pg_conn.cursor() as cur:
+            for table, (_, pg_cols) in SCHEMA.items():
+                cur.execute(f'CREATE TABLE "{table}" ({pg_cols})')
+        pg_conn.commit()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            sqlite_conn = sqlite3.connect(Path(tmp) / "check.db")
+            _seed(sqlite_conn)
+            checks = [
+                ("전체 재적재", lambda: check_full(pg_conn, sqlite_conn)),
+                ("교체 중 조회", lambda: check_reader_not_blocked(pg_conn, reader, sqlite_conn)),
+                ("차분 동기화", lambda: check_diff(pg_conn, sqlite_conn)),
+                ("실패 시 롤백", lambda: check_fk_rollback(pg_conn, sqlite_conn)),
+                ("데이터 버전", lambda: check_data_version(pg_conn, sqlite_conn, scoped_url)),
+            ]
+            try:
+                for name, fn in checks:
+                    problems = fn()
+                    print(f"[{'OK  ' if not problems else 'FAIL'}] {name}")
+                    for p in problems:
+                        print(f"        {p}")
+                    failed += bool(problems)
+            finally:
+                sqlite_conn.close()
+    finally:
+        pg_conn.close()
+        reader.close()
+        admin.cursor().execute(f'DROP SCHEMA "{schema}" CASCADE')
+        admin.close()
+
+    print(f"\n{'모두 통과' if not failed else f'실패 {failed}건'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+PostGIS 공간 연산 ↔ geopandas 경로 결과 일치 확인
+
+USE_POSTGIS 경로(migrate_to_supabase.py --postgis 가 만드는 hospital_dong·dong_boundary)가
+로컬 geopandas 경로와 같은 결과를 내는지 PostgreSQL 임시 스키마에서 확인합니다.
+  1. 병원 → 행정동 배정 : migrate_to_supabase 의 경계 적재·ST_Within 산출(HOSPITAL_DONG_POSTGIS_SQL)을 실행하고
+                          map_hospitals_to_dong_pg 결과를 map_hospitals_to_dong(sjoin, within) 과 병원별로 비교
+  2. 경계 dissolve       : dissolve_boundaries_pg(ST_Union) 결과를 analysis.dissolve_boundaries(geopandas) 와
+                          키 집합·면적(대칭차 비율)으로 비교 — 전국 + --sido 시도별
+
+병원 좌표·경계는 로컬 DB(--db)와 경계 파일(--geojson)을 씁니다.
+PostgreSQL 접속 정보(--pg-url 또는 환경변수 SUPABASE_DB_URL)가 없거나 서버에 PostGIS 가 없으면
+건너뜁니다 (종료코드 0). 임시 스키마는 끝나면 삭제합니다.
+
+실행 (프로젝트 루트에서):
+  python scripts/check_postgis_parity.py --pg-url postgresql://postgres@localhost/postgres
+  python scripts/check_postgis_parity.py --sido 서울특별시 경기도 --area-tol 1e-6
+불일치가 있으면 종료코드 1.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+from pathlib import Path
+from urllib.parse import quote
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import config  # noqa: E402
+from modules.analysis import GEOJSON_PATH, dissolve_boundaries  # noqa: E402
+from modules.db import DB_PATH  # noqa: E402
+from modules.population_api import SIDO_CODES, PopulationAPIClient  # noqa: E402
+from scripts import migrate_to_supabase as mig  # noqa: E402
+
+
+def _local_hospitals(db_path: Path) -> pd.DataFrame:
+    """migrate_to_supabase._stage_hospital_dong 과 같은 입력 (ykiho, XPos, YPos)"""
+    with sqlite3.connect(db_path) as conn:
+        hosp = pd.read_sql_query("SELECT ykiho, x_pos AS \"XPos\", y_pos AS \"YPos\" FROM hospital_info", conn)
+    hosp = hosp.drop_duplicates("ykiho").reset_index(drop=True)
+    for col in ["XPos", "YPos"]:
+        hosp[col] = pd.to_numeric(hosp[col], errors="coerce").fillna(0.0)
+    return hosp
+
+
+def _sgg_codes(sido_nm: str) -> set:
+    """DataMerger._collect_population 의 sido 분석 구→시 통합 키 집합 (로컬 DB 기준)"""
+    sgg = PopulationAPIClient().get_sgg_list(SIDO_CODES[sido_nm])
+    return set(str(c)[:5] for c in sgg["admmCd"]) if not sgg.empty else set()
+
+
+def load_postgis(pg_conn, db_path: Path, geojson_path: str) -> tuple[int, int]:
+    """임시 스키마에 hospital_info(좌표 원문) 적재 → 경계 적재·hospital_dong 산출. Returns: (병원 수, 배정 수)"""
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute("SELECT ykiho, x_pos, y_pos FROM hospital_info").fetchall()
+    with pg_conn.cursor() as cur:
+        cur.execute("CREATE TABLE hospital_info (ykiho text, x_pos text, y_pos text)")
+        n = mig._copy_into(cur, "hospital_info", ["ykiho", "x_pos", "y_pos"],
+                           ([mig._pg_text(v) for v in r] for r in rows))
+        mig._stage_dong_boundary(cur, geojson_path)
+        assigned = mig._swap_postgis(cur)
+    pg_conn.commit()
+    return n, assigned
+
+
+def check_hospital_dong(hosp: pd.DataFrame, geojson_path: str) -> list[str]:
+    from modules.data_merge import map_hospitals_to_dong, map_hospitals_to_dong_pg
+
+    local = map_hospitals_to_dong(hosp, geojson_path).set_index("ykiho")["adm_cd2"]
+    remote = map_hospitals_to_dong_pg(hosp).set_index("ykiho")["adm_cd2"]
+    both = pd.DataFrame({"local": local, "postgis": remote.reindex(local.index)})
+    same = (both["local"] == both["postgis"]) | (both["local"].isna() & both["postgis"].isna())  # 경계 밖 = NULL
+    bad = both[~same]
+    if bad.empty:
+        return []
+    return [f"배정 불일치 {len(bad):,}/{len(both):,}건 (ykiho, geopandas, PostGIS): "
+            f"{bad.reset_index().head(5).values.tolist()}"]
+
+
+def check_dissolve(geojson_path: str, level: str, prefix: str, sgg_codes: set, area_tol: float) -> list[str]:
+    from shapely.geometry import shape
+    from modules.data_merge import dissolve_boundaries_pg
+
+    local = dissolve_boundaries(geojson_path, level, prefix, sgg_codes).set_index("dissolve_key")["geometry"]
+    remote = {ft["properties"]["dissolve_key"]: shape(ft["geometry"])
+              for ft in dissolve_boundaries_pg(level, prefix, sgg_codes)["features"]}
+    problems = []
+    for label, keys in [("geopandas 에만", set(local.index) - set(remote)),
+                        ("PostGIS 에만", set(remote) - set(local.index))]:
+        if keys:
+            problems.append(f"{label} 있는 키 {len(keys)}개: {sorted(keys)[:5]}")
+    for key in sorted(set(local.index) & set(remote)):
+        a, b = local[key], remote[key]
+        ratio = a.symmetric_difference(b).area / max(a.area, b.area, 1e-12)
+        if ratio > area_tol:
+            problems.append(f"{key}: 경계 차이 {ratio:.2e} (면적 대비)")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PostGIS 공간 연산 ↔ geopandas 경로 결과 일치 확인")
+    parser.add_argument("--pg-url", default=os.getenv("SUPABASE_DB_URL", ""),
+                        help="PostgreSQL 접속 URI (기본 환경변수 SUPABASE_DB_URL) — 임시 스키마만 사용")
+    parser.add_argument("--db", default=str(DB_PATH), help="병원 좌표를 읽을 로컬 SQLite DB")
+    parser.add_argument("--geojson", default=str(GEOJSON_PATH), help="행정동 경계 GeoJSON")
+    parser.add_argument("--sido", nargs="+", default=["서울특별시", "경기도", "세종특별자치시"],
+                        help="sido dissolve 를 비교할 시도")
+    parser.add_argument("--area-tol", type=float, default=1e-6, help="dissolve 경계 대칭차 면적 허용 비율")
+    opts = parser.parse_args()
+    if not opts.pg_url:
+        print("[SKIP] PostgreSQL 접속 정보 없음 (--pg-url 또는 SUPABASE_DB_URL)")
+        sys.exit(0)
+    unknown = [s for s in opts.sido if s not in SIDO_CODES]
+    if unknown:
+        sys.exit(f"[ERROR] 알 수 없는 시도: {', '.join(unknown)}")
+    import psycopg2
+
+    admin = psycopg2.connect(opts.pg_url)
+    admin.autocommit = True
+    with admin.cursor() as cur:
+        cur.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'postgis'")
+        has_postgis = cur.fetchone() is not None
+    if not has_postgis:
+        admin.close()
+        print("[SKIP] 서버에 PostGIS 확장이 없음")
+        sys.exit(0)
+
+    # 시도별 구→시 키·병원 좌표는 로컬 DB 기준 (config 를 PostgreSQL 로 바꾸기 전에 조회)
+    config.SUPABASE_DB_URL, config.LOCAL_DB_ENGINE = "", "sqlite"
+    cases = [("national", "전국", "", set())] + [("sido", s, SIDO_CODES[s], _sgg_codes(s)) for s in opts.sido]
+    hosp = _local_hospitals(Path(opts.db))
+
+    # 임시 스키마 우선 — postgis 가 설치되어 있지 않으면 DONG_BOUNDARY_DDL 이 임시 스키마에 설치(함께 삭제)
+    schema = f"postgis_check_{os.getpid()}"
+    admin.cursor().execute(f'CREATE SCHEMA "{schema}"')
+    options = f"-c search_path={schema},public"
+    scoped_url = f"{opts.pg_url}{'&' if '?' in opts.pg_url else '?'}options={quote(options)}"
+    pg_conn = psycopg2.connect(opts.pg_url, options=options)
+    failed = 0
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            n, assigned = load_postgis(pg_conn, Path(opts.db), opts.geojson)
+        print(f"PostGIS 적재: 병원 {n:,}개 · 행정동 배정 {assigned:,}개")
+        config.SUPABASE_DB_URL = scoped_url  # data_merge 의 PostGIS 함수가 임시 스키마를 조회
+        checks = [("병원 → 행정동 배정", lambda: check_hospital_dong(hosp, opts.geojson))]
+        checks += [(f"dissolve {level:<8} {name}",
+                    lambda level=level, prefix=prefix, codes=codes:
+                    check_dissolve(opts.geojson, level, prefix, codes, opts.area_tol))
+                   for level, name, prefix, codes in cases]
+        for name, fn in checks:
+            problems = fn()
+            print(f"[{'OK  ' if not problems else 'FAIL'}] {name}")
+            for p in problems:
+                print(f"        {p}")
+            failed += bool(problems)
+    finally:
+        pg_conn.close()
+        admin.cursor().execute(f'DROP SCHEMA "{schema}" CASCADE')
+        admin.close()
+
+    print(f"\n{'모두 일치' if not failed else f'불일치 {failed}건'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+포화도 산출 경로 간 결과 일치 확인
+
+같은 분석 조건을 여러 경로로 실행해 지역 × 과목 결과를 비교합니다.
+  sqlite        : 로컬 SQLite + pandas 집계 (기존 경로, 기준)
+  duckdb        : 로컬 Parquet(DuckDB) + pandas 집계 (LOCAL_DB_ENGINE=duckdb, build_parquet.py 결과가 있을 때)
+  pg-pandas     : Supabase(PostgreSQL) 조회 + pandas 집계   (--pg-url 또는 SUPABASE_DB_URL 이 있을 때)
+  pg-server     : Supabase 서버측 집계 (DataMerger.run(summary_only=True) → calc_saturation_pg)
+
+비교 컬럼: match_key, 분자 인구, clinic_count, specialist_count, SI_raw, SI_normalized(허용 오차), saturation_level
+Supabase·Parquet 에는 로컬 DB 와 같은 데이터가 적재되어 있어야 합니다
+(migrate_to_supabase.py — hospital_dong 포함, build_parquet.py).
+
+실행 (프로젝트 루트에서):
+  python scripts/check_saturation_parity.py
+  python scripts/check_saturation_parity.py --sido 서울특별시 경기도 --specialty 01 05 49
+  python scripts/check_saturation_parity.py --pg-url postgresql://... --no-sqlite
+  python scripts/check_saturation_parity.py --no-pg     # SQLite ↔ DuckDB 만
+불일치가 있으면 종료코드 1.
+"""
+
+import argparse
+import math
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import config  # noqa: E402
+from modules.analysis import CLINIC_TYPES, DENOMINATORS, GEOJSON_PATH, NUMERATORS, default_year_month  # noqa: E402
+from modules.db import DB_PATH, PARQUET_MANIFEST, parquet_dir  # noqa: E402
+from modules.hospital_api import HIRA_SIDO_CODES  # noqa: E402
+from modules.population_api import SIDO_CODES, PopulationAPIClient  # noqa: E402
+
+_KEY = ["match_key", "specialty_cd"]
+_EXACT = ["clinic_count", "specialist_count", "saturation_level"]
+_FLOAT = ["SI_raw", "SI_normalized"]
+
+
+def _cases(sido_names: list[str], per_sido: int) -> list[tuple[str, str, str, str]]:
+    """(이름, 인구 코드, HIRA 시도 코드, 분석 단위) — 시도마다 앞쪽 시군구 몇 개(dong) + 시도 전체 + 전국"""
+    config_url, engine = config.SUPABASE_DB_URL, config.LOCAL_DB_ENGINE
+    config.SUPABASE_DB_URL, config.LOCAL_DB_ENGINE = "", "sqlite"  # 목록은 로컬 SQLite 기준
+    try:
+        cases = []
+        for sido_nm in sido_names:
+            sgg = PopulationAPIClient().get_sgg_list(SIDO_CODES[sido_nm])
+            for _, r in sgg.head(per_sido).iterrows():
+                cases.append((f"{sido_nm} {r['sggNm']}", str(r["admmCd"]), HIRA_SIDO_CODES.get(sido_nm, ""), "dong"))
+            cases.append((sido_nm, SIDO_CODES[sido_nm], HIRA_SIDO_CODES.get(sido_nm, ""), "sido"))
+        cases.append(("전국", "", "", "national"))
+        return cases
+    finally:
+        config.SUPABASE_DB_URL, config.LOCAL_DB_ENGINE = config_url, engine
+
+
+def _run(db_url: str, engine: str, summary_only: bool, case, opts) -> tuple[pd.DataFrame, list[str]]:
+    """한 경로 실행 → (과목별 결과를 쌓은 표, 기록된 오류)"""
+    from modules.data_merge import DataMerger
+
+    name, code, hira, level = case
+    config.SUPABASE_DB_URL, config.LOCAL_DB_ENGINE = db_url, engine
+    res = DataMerger(opts.geojson).run(sgg_cd_pop=code, hira_sido_cd=hira, sgg_name=name,
+                                       specialty_codes=opts.specialty, year_month=opts.year_month,
+                                       cl_codes=opts.cl, num_col=opts.num, den_col=opts.den,
+                                       analysis_level=level, summary_only=summary_only)
+    errors = [f"{r['stage']}: {r['error']}" for r in res["timings"] if r.get("error")]
+    frames = [df[["match_key", opts.num] + _EXACT + _FLOAT].assign(specialty_cd=cd)
+              for cd, df in res["saturation"].items() if df is not None and not df.empty]
+    out = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=_KEY)
+    out["match_key"] = out["match_key"].astype(str)
+    return out.sort_values(_KEY).reset_index(drop=True), errors
+
+
+def _same_float(a, b, tol: float) -> bool:
+    if pd.isna(a) and pd.isna(b):
+        return True
+    if math.isinf(a) or math.isinf(b):
+        return a == b
+    return abs(a - b) <= tol * max(1.0, abs(a), abs(b))
+
+
+def compare(base: pd.DataFrame, other: pd.DataFrame, num_col: str, tol: float) -> list[str]:
+    """불일치 설명 목록 (비어 있으면 일치)"""
+    problems = []
+    merged = base.merge(other, on=_KEY, how="outer", suffixes=("", "_o"), indicator=True)
+    for side, label in [("left_only", "기준에만"), ("right_only", "비교 대상에만")]:
+        keys = merged.loc[merged["_merge"] == side, _KEY].values.tolist()
+        if keys:
+            problems.append(f"{label} 있는 (지역, 과목) {len(keys)}개: {keys[:5]}")
+    both = merged[merged["_merge"] == "both"]
+    for col in _EXACT:
+        bad = both[both[col].astype(str) != both[f"{col}_o"].astype(str)]
+        if not bad.empty:
+            problems.append(f"{col} 불일치 {len(bad)}건: {bad[_KEY + [col, col + '_o']].head(3).values.tolist()}")
+    for col in _FLOAT + [num_col]:
+        bad = both[[not _same_float(float(a), float(b), tol) for a, b in zip(both[col], both[f"{col}_o"])]]
+        if not bad.empty:
+            problems.append(f"{col} 불일치 {len(bad)}건: {bad[_KEY + [col, col + '_o']].head(3).values.tolist()}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="포화도 산출 경로(SQLite / DuckDB / PostgreSQL pandas / 서버측 집계) 결과 비교")
+    parser.add_argument("--pg-url", default=config.SUPABASE_DB_URL, help="PostgreSQL 접속 URI (기본 SUPABASE_DB_URL)")
+    parser.add_argument("--no-sqlite", action="store_true", help="로컬 SQLite 경로 생략 (다음 경로를 기준으로)")
+    parser.add_argument("--no-duckdb", action="store_true", help="로컬 DuckDB(Parquet) 경로 생략")
+    parser.add_argument("--no-pg", action="store_true", help="PostgreSQL 경로 생략")
+    parser.add_argument("--sido", nargs="+", default=["서울특별시", "경기도", "세종특별자치시"])
+    parser.add_argument("--per-sido", type=int, default=2, help="시도별 dong 분석 시군구 수")
+    parser.add_argument("--specialty", nargs="+", default=["01", "05", "11", "49"])
+    parser.add_argument("--num", default=NUMERATORS["총 인구수"], choices=list(NUMERATORS.values()))
+    parser.add_argument("--den", default=DENOMINATORS["의원 수"], choices=list(DENOMINATORS.values()))
+    parser.add_argument("--cl", nargs="+", default=[CLINIC_TYPES["의원"]])
+    parser.add_argument("--year-month", default=default_year_month())
+    parser.add_argument("--geojson", default=str(GEOJSON_PATH))
+    parser.add_argument("--tol", type=float, default=1e-9, help="SI·인구 상대 허용 오차")
+    opts = parser.parse_args()
+
+    unknown = [s for s in opts.sido if s not in SIDO_CODES]
+    if unknown:
+        sys.exit(f"[ERROR] 알 수 없는 시도: {', '.join(unknown)}")
+
+    # (이름, SUPABASE_DB_URL, LOCAL_DB_ENGINE, summary_only)
+    paths = [] if opts.no_sqlite else [("sqlite", "", "sqlite", False)]
+    if not opts.no_duckdb:
+        if (parquet_dir(DB_PATH) / PARQUET_MANIFEST).exists():
+            paths.append(("duckdb", "", "duckdb", False))
+        else:
+            print("[SKIP] duckdb — Parquet 없음 (python scripts/build_parquet.py)")
+    if not opts.no_pg:
+        if opts.pg_url:
+            paths += [("pg-pandas", opts.pg_url, "sqlite", False), ("pg-server", opts.pg_url, "sqlite", True)]
+        else:
+            print("[SKIP] PostgreSQL — 접속 정보 없음 (--pg-url 또는 .env 의 SUPABASE_DB_URL)")
+    if len(paths) < 2:
+        sys.exit("[ERROR] 비교할 경로가 2개 이상 필요합니다")
+    failed = 0
+    for case in _cases(opts.sido, opts.per_sido):
+        results = {label: _run(url, engine, summary_only, case, opts) for label, url, engine, summary_only in paths}
+        base_label, (base, _) = next(iter(results.items()))
+        problems = []
+        for label, (df, errors) in results.items():
+            if errors:
+                problems.append(f"{label} 오류: {'; '.join(errors)}")
+            if label != base_label:
+                problems += [f"{label}: {p}" for p in compare(base, df, opts.num, opts.tol)]
+        status = "OK  " if not problems else "FAIL"
+        print(f"[{status}] {case[3]:<8} {case[0]} — {len(base):,}행")
+        for p in problems:
+            print(f"        {p}")
+        failed += bool(problems)
+
+    print(f"\n{'모두 일치' if not failed else f'불일치 {failed}건'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import pandas as pd
 import sqlite3
 import os
+import sys
 import warnings
 
 # 경고 무시
@@ -12,6 +13,58 @@ DATA_DIR = os.path.join(BASE_DIR, 'data')
 DB_DATA_DIR = os.path.join(BASE_DIR, 'DB_data')
 DB_PATH = os.path.join(DATA_DIR, 'saturation.db')
 
+sys.path.insert(0, BASE_DIR)
+from modules.population_api import split_adm_nm  # noqa: E402
+
+
+def build_region_crosswalk(conn) -> pd.DataFrame | None:
+    """
+    인구 시군구코드 ↔ HIRA sgguCd ↔ 행정동코드(hjd_cd) ↔ 법정동코드(bjd_cd) 통합 코드표 생성.
+
+    - hjd_cd ↔ bjd_cd       : region_code_mapping
+    - pop_sgg_cd            : hjd_cd 앞 5자리 (인구 데이터와 동일한 신코드 체계)
+    - hira_sggu_cd          : hospital_info 주소의 (시도, 시군구) 이름을 region_code_mapping과 맞춰
+                              시군구별로 가장 많이 일치한 HIRA 시군구코드 채택
+                              1순위 "수원시 장안구"처럼 2단어 시군구, 2순위 1단어 시군구
+    """
+    tables = set(pd.read_sql_query("SELECT name FROM sqlite_master WHERE type='table'", conn)["name"])
+    if "region_code_mapping" not in tables:
+        return None
+
+    xw = pd.read_sql_query(
+        "SELECT DISTINCT hjd_cd, bjd_cd, sido_nm, sigungu_nm FROM region_code_mapping "
+        "WHERE hjd_cd IS NOT NULL AND LENGTH(hjd_cd) = 10",
+        conn,
+    )
+    xw['sigungu_nm'] = xw['sigungu_nm'].fillna('')
+    xw['pop_sgg_cd'] = xw['hjd_cd'].str[:5]
+
+    hira = pd.DataFrame(columns=['pop_sgg_cd', 'hira_sggu_cd'])
+    if "hospital_info" in tables:
+        hosp = pd.read_sql_query(
+            "SELECT sigungu_cd, addr FROM hospital_info WHERE addr IS NOT NULL AND sigungu_cd IS NOT NULL",
+            conn,
+        )
+        parts = hosp['addr'].str.split(n=3, expand=True).reindex(columns=range(3))
+        names = xw.drop_duplicates(['sido_nm', 'sigungu_nm'])
+        lookup = dict(zip(zip(names.sido_nm, names.sigungu_nm), names.pop_sgg_cd))
+
+        two = pd.Series(list(zip(parts[0], parts[1] + ' ' + parts[2])), index=hosp.index).map(lookup)
+        one = pd.Series(list(zip(parts[0], parts[1])), index=hosp.index).map(lookup)
+        hosp['pop_sgg_cd'] = two.fillna(one)
+
+        votes = (
+            hosp.dropna(subset=['pop_sgg_cd'])
+            .groupby(['pop_sgg_cd', 'sigungu_cd']).size().reset_index(name='n')
+            .sort_values('n', ascending=False)
+            .drop_duplicates('pop_sgg_cd')
+        )
+        hira = votes.rename(columns={'sigungu_cd': 'hira_sggu_cd'})[['pop_sgg_cd', 'hira_sggu_cd']]
+
+    xw = xw.merge(hira, on='pop_sgg_cd', how='left')
+    xw = xw.rename(columns={'sigungu_nm': 'sgg_nm'})
+    return xw[['hjd_cd', 'bjd_cd', 'pop_sgg_cd', 'hira_sggu_cd', 'sido_nm', 'sgg_nm']]
+
 def create_local_db():
     print(f"[{'='*40}]")
     print(f"로컬 SQLite DB 구축 시작: {DB_PATH}")
@@ -62,6 +115,8 @@ def create_local_db():
             }, inplace=True)
             
             df_age['adm_cd'] = df_age['adm_cd'].astype(str)
+            # 조회 시 분리 작업이 없도록 시도/시군구/읍면동 명칭을 미리 저장
+            df_age[['sido_nm', 'sgg_nm', 'dong_nm']] = split_adm_nm(df_age['adm_nm'])
             df_age.to_sql('population_age', conn, if_exists='replace', index=False)
             print(f" - [연령 인구] 적용 완료: {len(df_age)}행")
 
@@ -78,6 +133,7 @@ def create_local_db():
                 df_house[col] = df_house[col].astype(str).str.replace(',', '').apply(pd.to_numeric, errors='coerce').fillna(0).astype('int64')
 
             df_house['adm_cd'] = df_house['adm_cd'].astype(str)
+            df_house[['sido_nm', 'sgg_nm', 'dong_nm']] = split_adm_nm(df_house['adm_nm'])
             df_house.to_sql('population_house', conn, if_exists='replace', index=False)
             print(f" - [세대 인구] 적용 완료: {len(df_house)}행")
 
@@ -104,6 +160,7 @@ def create_local_db():
             }
             df_hosp = df_hosp[list(hosp_cols.keys())].rename(columns=hosp_cols)
             df_hosp['estb_dd'] = df_hosp['estb_dd'].str.replace('-', '') # 숫자형식 통일 (ex: 20240101)
+            df_hosp['sgg_nm'] = df_hosp['addr'].str.split().str[1] # "서울특별시 종로구 ..." → "종로구"
             df_hosp.to_sql('hospital_info', conn, if_exists='replace', index=False)
             print(f" - 적용 완료: {len(df_hosp)}행")
 
@@ -124,8 +181,18 @@ def create_local_db():
             df_spec.to_sql('hospital_specialty', conn, if_exists='replace', index=False)
             print(f" - 적용 완료: {len(df_spec)}행")
 
+        # =====================================================================
+        # 5. 코드 크로스워크 (region_crosswalk)
+        # =====================================================================
+        print("\n5. 인구/HIRA/행정동/법정동 코드 크로스워크 생성 중...")
+        df_xw = build_region_crosswalk(conn)
+        if df_xw is not None:
+            df_xw.to_sql('region_crosswalk', conn, if_exists='replace', index=False)
+            n_hira = df_xw.dropna(subset=['hira_sggu_cd'])['pop_sgg_cd'].nunique()
+            print(f" - 적용 완료: {len(df_xw)}행 (HIRA 코드 연결 시군구 {n_hira}/{df_xw['pop_sgg_cd'].nunique()}개)")
+
         # 인덱스 생성
-        print("\n5. DB 인덱스 생성 중...")
+        print("\n6. DB 인덱스 생성 중...")
         cur = conn.cursor()
         cur.execute("CREATE INDEX IF NOT EXISTS idx_pop_age_adm_cd ON population_age(adm_cd)")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_pop_house_adm_cd ON population_house(adm_cd)")
@@ -133,6 +200,11 @@ def create_local_db():
         cur.execute("CREATE INDEX IF NOT EXISTS idx_map_hjd ON region_code_mapping(hjd_cd)")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_spec_ykiho ON hospital_specialty(ykiho)")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_spec_dgsbjt ON hospital_specialty(dgsbjt_cd)")
+        if df_xw is not None:
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_xw_hira ON region_crosswalk(hira_sggu_cd)")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_xw_pop_sgg ON region_crosswalk(pop_sgg_cd)")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_xw_hjd ON region_crosswalk(hjd_cd)")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_xw_bjd ON region_crosswalk(bjd_cd)")
         conn.commit()
 
     except Exception as e:
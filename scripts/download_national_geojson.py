@@ -3,6 +3,7 @@
 
 실행 방법 (프로젝트 루트에서):
   python scripts/download_national_geojson.py
+  python scripts/download_national_geojson.py --source 로컬파일.geojson --precision 6
 
 출력 파일:
   data/geojson/national_dong.geojson
@@ -10,13 +11,21 @@
 속성 정규화:
   - adm_cd2 : 행정동 10자리 코드 (예: 1168051000)
   - adm_nm  : 행정동 전체 명칭 (예: 서울특별시 강남구 역삼1동)
+
+스트리밍 처리:
+  - 응답(또는 로컬 파일)을 청크 단위로 읽으며 features 배열의 Feature를 하나씩 파싱
+  - Feature마다 속성 정규화 + 좌표 소수점 반올림(기본 5자리 ≈ 1.1m) 후 즉시 파일에 기록
+  → 전체 파일을 메모리에 올리지 않으므로 전국 파일도 일정한 메모리로 생성
 """
 
+import argparse
+import codecs
 import json
+import os
+import re
 import sys
 from pathlib import Path
-
-import requests
+from typing import Iterable, Iterator
 
 SOURCES = [
     # vuski/admdongkor — 전국 행정동 경계 (2023-04 기준)
@@ -27,6 +36,11 @@ SOURCES = [
 
 OUT_PATH = Path(__file__).parent.parent / "data" / "geojson" / "national_dong.geojson"
 
+# 좌표 소수점 자릿수 (5자리 ≈ 1.1m, 6자리 ≈ 0.11m)
+DEFAULT_PRECISION = 5
+
+_CHUNK_SIZE = 1024 * 512
+
 
 def _normalize_properties(feature: dict) -> dict:
     """
@@ -65,67 +79,205 @@ def _normalize_properties(feature: dict) -> dict:
     return feature
 
 
-def download(url: str) -> dict | None:
-    print(f"  → 다운로드 시도: {url}")
-    try:
-        r = requests.get(url, timeout=120, stream=True)
+def _quantize_ring(ring: list, precision: int) -> list:
+    """링 좌표 반올림 + 반올림으로 생긴 연속 중복점 제거 (닫힌 링 최소 4점 유지)"""
+    out = []
+    for pt in ring:
+        q = [round(c, precision) for c in pt]
+        if not out or q != out[-1]:
+            out.append(q)
+    if len(out) < 4:
+        return [[round(c, precision) for c in pt] for pt in ring]
+    return out
+
+
+def _quantize_coords(coords, precision: int):
+    """임의 깊이의 좌표 배열 반올림 (Polygon/MultiPolygon은 링 단위 중복점 제거)"""
+    if not coords:
+        return coords
+    if isinstance(coords[0], (int, float)):
+        return [round(c, precision) for c in coords]
+    if isinstance(coords[0][0], (int, float)):
+        return _quantize_ring(coords, precision)
+    return [_quantize_coords(c, precision) for c in coords]
+
+
+def _quantize_geometry(geom: dict | None, precision: int) -> dict | None:
+    if not geom:
+        return geom
+    if geom.get("type") == "GeometryCollection":
+        return {**geom, "geometries": [_quantize_geometry(g, precision) for g in geom.get("geometries", [])]}
+    if "coordinates" in geom:
+        return {**geom, "coordinates": _quantize_coords(geom["coordinates"], precision)}
+    return geom
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 입력 소스 (URL 또는 로컬 파일) → 바이트 청크
+# ─────────────────────────────────────────────────────────────────────────────
+def iter_source(source: str | Path) -> Iterator[bytes]:
+    """http(s) URL이면 스트리밍 다운로드, 그 외에는 로컬 파일로 간주하여 청크 단위로 읽음"""
+    src = str(source)
+    if src.startswith(("http://", "https://")):
+        import requests
+
+        r = requests.get(src, timeout=120, stream=True)
         r.raise_for_status()
         total = int(r.headers.get("content-length", 0))
-        chunks = []
         downloaded = 0
-        for chunk in r.iter_content(chunk_size=1024 * 512):
-            chunks.append(chunk)
+        for chunk in r.iter_content(chunk_size=_CHUNK_SIZE):
             downloaded += len(chunk)
             if total:
                 pct = downloaded / total * 100
                 print(f"\r     {pct:.1f}% ({downloaded // 1024 // 1024} MB)", end="", flush=True)
+            yield chunk
         print()
-        return json.loads(b"".join(chunks))
-    except Exception as e:
-        print(f"  ✗ 실패: {e}")
-        return None
+    else:
+        with open(src, "rb") as f:
+            while chunk := f.read(_CHUNK_SIZE):
+                yield chunk
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 증분 파서: FeatureCollection 텍스트 → (헤더, Feature..., 꼬리)
+# ─────────────────────────────────────────────────────────────────────────────
+_FEATURES_KEY = re.compile(r'"features"\s*:\s*\[')
+_WS_COMMA = re.compile(r"[\s,]*")
+
+
+def iter_features(chunks: Iterable[bytes]) -> Iterator[tuple[str, object]]:
+    """
+    바이트 청크를 읽으며 features 배열 원소를 하나씩 파싱합니다.
+
+    Yields:
+      ("head", str)    : features 배열 이전 텍스트 ('{"type": ..., "crs": ..., ')
+      ("feature", dict): Feature 객체 (배열 순서대로)
+      ("tail", str)    : 배열 종료 이후 텍스트 (보통 "}")
+    버퍼에는 최대 Feature 1개 + 청크 1개 분량만 유지됩니다.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    it = iter(chunks)
+    buf, eof = "", False
+
+    def _more() -> bool:
+        nonlocal buf, eof
+        if eof:
+            return False
+        chunk = next(it, None)
+        if chunk is None:
+            buf += utf8.decode(b"", final=True)
+            eof = True
+            return False
+        buf += utf8.decode(chunk)
+        return True
+
+    # 1) features 배열 시작 찾기
+    while not (m := _FEATURES_KEY.search(buf)):
+        if not _more():
+            raise ValueError("GeoJSON에 features 배열이 없습니다.")
+    yield "head", buf[: m.start()]
+    buf = buf[m.end():]
+
+    # 2) 배열 원소 순차 디코드
+    while True:
+        pos = _WS_COMMA.match(buf).end()
+        if pos == len(buf):
+            buf = ""
+            if not _more():
+                raise ValueError("features 배열이 닫히지 않았습니다.")
+            continue
+        if buf[pos] == "]":
+            buf = buf[pos + 1:]
+            break
+        try:
+            obj, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if not _more():
+                raise
+            continue
+        yield "feature", obj
+        buf = buf[end:]
+
+    # 3) 나머지 (닫는 중괄호 등)
+    while _more():
+        pass
+    yield "tail", buf
+
+
+def stream_normalize(source: str | Path, out_path: Path = OUT_PATH,
+                     precision: int = DEFAULT_PRECISION) -> int:
+    """
+    source(URL/로컬 파일)를 스트리밍으로 읽어 정규화·좌표 반올림한 GeoJSON을 out_path에 기록.
+    임시 파일에 쓴 뒤 완료 시 교체하므로 실패해도 기존 파일은 유지됩니다.
+    Returns: 저장된 Feature 수
+    """
+    out_path = Path(out_path)
+    tmp_path = out_path.with_suffix(out_path.suffix + ".part")
+    count = 0
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for kind, item in iter_features(iter_source(source)):
+                if kind == "head":
+                    f.write(item + '"features":[')
+                elif kind == "feature":
+                    feat = _normalize_properties(item)
+                    feat["geometry"] = _quantize_geometry(feat.get("geometry"), precision)
+                    if count:
+                        f.write(",")
+                    f.write(json.dumps(feat, ensure_ascii=False, separators=(",", ":")))
+                    count += 1
+                else:
+                    f.write("]" + item)
+        os.replace(tmp_path, out_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return count
 
 
 def main():
+    parser = argparse.ArgumentParser(description="전국 행정동 경계 GeoJSON 다운로드·정규화")
+    parser.add_argument("--source", help="URL 또는 로컬 GeoJSON 경로 (미지정 시 SOURCES 순서대로 시도)")
+    parser.add_argument("--out", default=str(OUT_PATH), help="출력 파일 경로")
+    parser.add_argument("--precision", type=int, default=DEFAULT_PRECISION,
+                        help=f"좌표 소수점 자릿수 (기본 {DEFAULT_PRECISION})")
+    args = parser.parse_args()
+
     print("=" * 60)
     print("전국 행정동 GeoJSON 다운로드")
     print("=" * 60)
 
-    OUT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    out_path = Path(args.out)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
 
-    gj = None
-    for url in SOURCES:
-        gj = download(url)
-        if gj:
+    sources = [args.source] if args.source else SOURCES
+    count = None
+    for src in sources:
+        print(f"  → 처리 시도: {src}")
+        try:
+            count = stream_normalize(src, out_path, args.precision)
             break
+        except Exception as e:
+            print(f"\n  ✗ 실패: {e}")
 
-    if gj is None:
+    if count is None:
         print("\n✗ 모든 소스 다운로드 실패.")
         print("  아래 URL에서 수동으로 다운로드 후")
-        print(f"  {OUT_PATH} 에 저장하세요:")
+        print(f"  --source 옵션으로 로컬 파일을 지정하거나 {out_path} 에 저장하세요:")
         for url in SOURCES:
             print(f"  {url}")
         sys.exit(1)
 
-    # 속성 정규화
-    print("  속성 정규화 중...")
-    features = [_normalize_properties(f) for f in gj.get("features", [])]
-    gj["features"] = features
+    size_mb = out_path.stat().st_size / 1024 / 1024
+    print(f"\n[OK] 완료: {count}개 행정동 경계 저장 ({size_mb:.1f} MB, 좌표 {args.precision}자리)")
 
-    # 저장
-    print(f"  저장 중: {OUT_PATH}")
-    with open(OUT_PATH, "w", encoding="utf-8") as f:
-        json.dump(gj, f, ensure_ascii=False)
-
-    print(f"\n[OK] 완료: {len(features)}개 행정동 경계 저장")
-
-    # 샘플 속성 출력
-    sample = next(
-        (f["properties"] for f in features if f.get("properties", {}).get("adm_cd2")),
-        None,
-    )
-    if sample:
-        print(f"  샘플 속성: adm_cd2={sample.get('adm_cd2')}, adm_nm={sample.get('adm_nm')}")
+    # 샘플 속성 출력 (첫 Feature만 다시 읽음)
+    for kind, item in iter_features(iter_source(out_path)):
+        if kind == "feature":
+            sample = item.get("properties", {})
+            print(f"  샘플 속성: adm_cd2={sample.get('adm_cd2')}, adm_nm={sample.get('adm_nm')}")
+            break
 
 
 if __name__ == "__main__":
@@ -0,0 +1,467 @@
+"""
+합성(가상) 전국 데이터셋 생성 스크립트 — 벤치마크·부하 테스트용
+
+원본 Excel(DB_data/) 없이도 성능 문제를 재현할 수 있도록
+create_local_db.py · import_apt_price.py 가 만드는 테이블을 같은 스키마로 생성합니다.
+
+  population_age / population_house   : 시도·시군구·행정동 행 (인구 신코드 체계)
+  hospital_info / hospital_specialty  : 종별·진료과목 분포를 흉내 낸 병의원
+  region_code_mapping / region_crosswalk
+  apt_price_bjd / apt_price_sketch    : 법정동·월별 평당가 (분위수 스케치 포함)
+
+함께 생성하는 행정동 경계 GeoJSON 은 시도 → 시군구 → 행정동 격자 사각형이며,
+병의원 좌표는 소속 행정동 사각형 안에 찍힙니다.
+경계 파일의 adm_cd2 는 실제 경계 파일처럼 강원(51)·전북(52)을 구코드 42·45 로 기록하므로
+앱/DataMerger 의 코드 재매핑(42→51, 45→52) 경로를 그대로 거칩니다.
+(세종은 현행 경계 파일과 같이 36 코드 그대로 기록 — 41000 접두 재매핑은
+ _standardize_code 와 _finalize_key 가 가정하는 자리수가 달라 10자리 코드로 역변환할 수 없음)
+
+같은 --seed 와 옵션이면 항상 같은 데이터가 생성됩니다.
+
+실행 (프로젝트 루트에서):
+  python scripts/generate_synthetic_data.py                       # 전국 규모 → data/bench/synthetic_s1_seed42/
+  python scripts/generate_synthetic_data.py --scale 0.1 --seed 7  # 시군구 수 10% → data/bench/synthetic_s0.1_seed7/
+  python scripts/generate_synthetic_data.py --sido 서울특별시 경기도 --out /tmp/bench
+  python scripts/generate_synthetic_data.py --force               # 기존 DB·경계 파일 덮어쓰기
+
+기본 출력 위치는 앱이 읽는 data/ 가 아니라 data/bench/ 아래(benchmark.py 와 같은 경로)이며,
+saturation.db 나 경계 파일이 이미 있으면 --force 없이는 덮어쓰지 않습니다.
+"""
+
+import argparse
+import json
+import math
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from modules.hospital_api import HIRA_SIDO_CODES, SPECIALTY_CODES  # noqa: E402
+from modules.population_api import SIDO_CODES, split_adm_nm  # noqa: E402
+from modules.price_sketch import bin_index  # noqa: E402
+from scripts.create_local_db import build_region_crosswalk  # noqa: E402
+
+BENCH_DIR = BASE_DIR / "data" / "bench"
+DEFAULT_SEED = 42
+
+
+def default_out_dir(scale: float = 1.0, seed: int = DEFAULT_SEED) -> Path:
+    """data/bench/synthetic_s{scale}_seed{seed} — 운영 데이터(data/saturation.db, data/geojson/)와 분리"""
+    return BENCH_DIR / f"synthetic_s{scale:g}_seed{seed}"
+
+# (시도명, 시군구 수(전국 규모), 격자 위치(열, 행), 평당가 중앙값(만원))
+SIDO_LAYOUT = [
+    ("인천광역시", 10, (0, 4), 2000), ("서울특별시", 25, (1, 4), 4500),
+    ("경기도", 31, (2, 4), 2300),     ("강원특별자치도", 18, (3, 4), 1000),
+    ("충청남도", 15, (0, 3), 1000),   ("세종특별자치시", 1, (1, 3), 1600),
+    ("충청북도", 11, (2, 3), 1000),   ("경상북도", 22, (3, 3), 900),
+    ("전북특별자치도", 14, (0, 2), 900), ("대전광역시", 5, (1, 2), 1500),
+    ("대구광역시", 9, (2, 2), 1600),  ("울산광역시", 5, (3, 2), 1400),
+    ("광주광역시", 5, (0, 1), 1300),  ("전라남도", 22, (1, 1), 800),
+    ("경상남도", 18, (2, 1), 1000),   ("부산광역시", 16, (3, 1), 1800),
+    ("제주특별자치도", 2, (0, 0), 1500),
+]
+
+# 격자 원점(경도, 위도)과 시도 칸 크기(도)
+_ORIGIN = (125.5, 33.2)
+_SIDO_CELL = 0.9
+
+# 시군구당 행정동 수 범위 (전국 약 3,500개)
+_DONGS_PER_SGG = (8, 24)
+# 행정동 인구 중앙값, 병의원 1곳당 인구 (전국 약 7~8만 곳)
+_DONG_POP_MEDIAN = 14000
+_POP_PER_HOSPITAL = 650
+# 좌표 누락 병의원 비율 (실데이터의 좌표 없는 기관)
+_MISSING_XY_RATE = 0.003
+
+# 종별코드 → (종별명, 비율, 총의사수 범위)
+CLINIC_TYPES = {
+    "31": ("의원", 0.47, (1, 4)),
+    "51": ("치과의원", 0.24, (1, 3)),
+    "93": ("한의원", 0.19, (1, 2)),
+    "21": ("병원", 0.02, (5, 40)),
+    "28": ("요양병원", 0.02, (3, 15)),
+    "71": ("보건소", 0.035, (1, 5)),
+    "92": ("한방병원", 0.006, (3, 15)),
+    "41": ("치과병원", 0.003, (3, 20)),
+    "11": ("종합병원", 0.004, (50, 300)),
+    "01": ("상급종합", 0.001, (300, 1500)),
+}
+
+# 의과 진료과목 가중치 (의원 개설 분포 근사, "00" = 일반의)
+_MED_WEIGHTS = {
+    "00": 12, "01": 22, "23": 8, "13": 7, "11": 6, "05": 7, "14": 4, "12": 4,
+    "10": 4, "09": 5, "21": 4, "04": 4, "15": 3, "03": 3, "08": 3, "02": 2,
+    "06": 2, "16": 2, "24": 1, "25": 1,
+}
+_MED_CODES = list(_MED_WEIGHTS)
+_MED_P = np.array(list(_MED_WEIGHTS.values()), dtype=float) / sum(_MED_WEIGHTS.values())
+_DENTAL = ["49", "52", "53", "54", "55", "61"]
+_ORIENTAL = ["80", "81", "82", "83", "84", "85", "86", "87"]
+
+_AGE_COLS = ["age_0_9", "age_10_19", "age_20_29", "age_30_39", "age_40_49", "age_50_59",
+             "age_60_69", "age_70_79", "age_80_89", "age_90_99", "age_100_plus"]
+_AGE_SHARE = np.array([0.07, 0.09, 0.12, 0.13, 0.15, 0.16, 0.14, 0.08, 0.04, 0.009, 0.001])
+
+_APT_MONTHS = 12
+_APT_END_YM = "202512"
+
+# create_local_db.py 6단계와 같은 기본 인덱스
+_BASE_INDEXES = [
+    ("idx_pop_age_adm_cd", "population_age", "adm_cd"),
+    ("idx_pop_house_adm_cd", "population_house", "adm_cd"),
+    ("idx_hosp_ykiho", "hospital_info", "ykiho"),
+    ("idx_map_hjd", "region_code_mapping", "hjd_cd"),
+    ("idx_spec_ykiho", "hospital_specialty", "ykiho"),
+    ("idx_spec_dgsbjt", "hospital_specialty", "dgsbjt_cd"),
+    ("idx_xw_hira", "region_crosswalk", "hira_sggu_cd"),
+    ("idx_xw_pop_sgg", "region_crosswalk", "pop_sgg_cd"),
+    ("idx_xw_hjd", "region_crosswalk", "hjd_cd"),
+    ("idx_xw_bjd", "region_crosswalk", "bjd_cd"),
+    ("idx_apt_bjd_cd", "apt_price_bjd", "bjd_cd"),
+    ("idx_apt_sketch_bjd_cd", "apt_price_sketch", "bjd_cd"),
+]
+
+
+def legacy_geo_code(adm_cd: str) -> str:
+    """인구 신코드 → 경계 파일 구코드 (강원 51→42, 전북 52→45)"""
+    if adm_cd.startswith("51"): return "42" + adm_cd[2:]
+    if adm_cd.startswith("52"): return "45" + adm_cd[2:]
+    return adm_cd
+
+
+def _grid(n: int) -> tuple[int, int]:
+    """n칸을 담는 (열, 행) 격자"""
+    cols = math.ceil(math.sqrt(n))
+    return cols, math.ceil(n / cols)
+
+
+def _rect_ring(x0: float, y0: float, x1: float, y1: float, vertices: int) -> list:
+    """사각형 외곽선 (변마다 vertices개 점으로 세분 — 실제 경계의 꼭짓점 수 흉내)"""
+    t = np.linspace(0.0, 1.0, vertices, endpoint=False)
+    xs = np.concatenate([x0 + (x1 - x0) * t, np.full(vertices, x1), x1 - (x1 - x0) * t, np.full(vertices, x0)])
+    ys = np.concatenate([np.full(vertices, y0), y0 + (y1 - y0) * t, np.full(vertices, y1), y1 - (y1 - y0) * t])
+    ring = np.round(np.column_stack([xs, ys]), 6).tolist()
+    return ring + [ring[0]]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 1. 행정구역 (시도 → 시군구 → 행정동)
+# ─────────────────────────────────────────────────────────────────────────────
+def build_regions(rng: np.random.Generator, scale: float, sido_names: list[str] | None) -> pd.DataFrame:
+    """행정동 1행 = 코드·명칭·격자 사각형(x0, y0, x1, y1)"""
+    rows = []
+    for sido_nm, n_sgg_full, (col, row), price in SIDO_LAYOUT:
+        if sido_names and sido_nm not in sido_names:
+            continue
+        sido2 = SIDO_CODES[sido_nm][:2]
+        hira_sido = HIRA_SIDO_CODES[sido_nm]
+        n_sgg = max(1, round(n_sgg_full * scale))
+        sx0, sy0 = _ORIGIN[0] + col * _SIDO_CELL, _ORIGIN[1] + row * _SIDO_CELL
+        g_cols, g_rows = _grid(n_sgg)
+        gw, gh = _SIDO_CELL / g_cols, _SIDO_CELL / g_rows
+        for j in range(n_sgg):
+            sgg_cd = f"{sido2}{110 + 10 * j:03d}"
+            sgg_nm = "세종특별자치시" if sido_nm == "세종특별자치시" else f"제{j + 1}구"
+            hira_sgg = f"{hira_sido[:2]}{j + 1:04d}"
+            gx0, gy0 = sx0 + (j % g_cols) * gw, sy0 + (j // g_cols) * gh
+            n_dong = int(rng.integers(*_DONGS_PER_SGG, endpoint=True))
+            d_cols, d_rows = _grid(n_dong)
+            dw, dh = gw / d_cols, gh / d_rows
+            for k in range(n_dong):
+                dx0, dy0 = gx0 + (k % d_cols) * dw, gy0 + (k // d_cols) * dh
+                rows.append({
+                    "adm_cd": f"{sgg_cd}{510 + 3 * k:03d}00",
+                    "sido_nm": sido_nm, "sgg_nm": sgg_nm, "dong_nm": f"제{k + 1}동",
+                    "sgg_cd": sgg_cd, "hira_sido_cd": hira_sido, "hira_sgg_cd": hira_sgg,
+                    "price_median": price,
+                    "x0": dx0, "y0": dy0, "x1": dx0 + dw, "y1": dy0 + dh,
+                })
+    dongs = pd.DataFrame(rows)
+    dongs["adm_nm"] = dongs["sido_nm"] + " " + dongs["sgg_nm"] + " " + dongs["dong_nm"]
+    return dongs
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 2. 인구 (population_house / population_age)
+# ─────────────────────────────────────────────────────────────────────────────
+def build_population(rng: np.random.Generator, dongs: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    n = len(dongs)
+    total = np.maximum(300, rng.lognormal(math.log(_DONG_POP_MEDIAN), 0.6, n)).astype("int64")
+    shares = rng.dirichlet(_AGE_SHARE * 200, n)
+    ages = np.floor(shares * total[:, None]).astype("int64")
+    ages[:, 0] += total - ages.sum(axis=1)  # 반올림 오차는 0~9세에 반영
+
+    dong_rows = pd.DataFrame({"adm_cd": dongs["adm_cd"], "adm_nm": dongs["adm_nm"], "total_pop": total})
+    dong_rows["households"] = (total / rng.uniform(1.9, 2.6, n)).astype("int64")
+    dong_rows["male_pop"] = rng.binomial(total, 0.49)
+    dong_rows["female_pop"] = total - dong_rows["male_pop"]
+    dong_rows[_AGE_COLS] = ages
+    dong_rows["_sgg"] = dongs["sgg_cd"].values
+    dong_rows["_sido"] = dongs["sgg_cd"].str[:2].values
+
+    num_cols = ["total_pop", "households", "male_pop", "female_pop"] + _AGE_COLS
+    # 시군구·시도 합계 행 (인구 통계 원본처럼 상위 행정기관 행 포함)
+    names = dongs.drop_duplicates("sgg_cd").set_index("sgg_cd")
+    sgg_rows = dong_rows.groupby("_sgg", as_index=False)[num_cols].sum()
+    sgg_rows["adm_cd"] = sgg_rows["_sgg"] + "00000"
+    sgg_rows["adm_nm"] = sgg_rows["_sgg"].map(names["sido_nm"] + " " + names["sgg_nm"])
+    sido_rows = dong_rows.groupby("_sido", as_index=False)[num_cols].sum()
+    sido_rows["adm_cd"] = sido_rows["_sido"] + "00000000"
+    sido_rows["adm_nm"] = sido_rows["_sido"].map(
+        {cd[:2]: nm for nm, cd in SIDO_CODES.items()})
+
+    full = pd.concat([sido_rows, sgg_rows, dong_rows], ignore_index=True)[["adm_cd", "adm_nm"] + num_cols]
+    full[["sido_nm", "sgg_nm", "dong_nm"]] = split_adm_nm(full["adm_nm"])
+
+    house = full[["adm_cd", "adm_nm", "total_pop", "households", "male_pop", "female_pop",
+                  "sido_nm", "sgg_nm", "dong_nm"]]
+    age = full[["adm_cd", "adm_nm", "total_pop"] + _AGE_COLS + ["sido_nm", "sgg_nm", "dong_nm"]]
+    return house, age
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 3. 병의원 (hospital_info / hospital_specialty)
+# ─────────────────────────────────────────────────────────────────────────────
+def _specialties_for(rng: np.random.Generator, cl_cd: str) -> list[str]:
+    if cl_cd in ("51", "41"):
+        extra = rng.choice(_DENTAL[1:], int(rng.integers(0, 3 if cl_cd == "51" else 5)), replace=False)
+        return ["49"] + list(extra)
+    if cl_cd in ("93", "92"):
+        return list(rng.choice(_ORIENTAL, int(rng.integers(1, 3 if cl_cd == "93" else 7)), replace=False))
+    if cl_cd == "31":
+        return list(rng.choice(_MED_CODES, int(rng.integers(1, 4)), replace=False, p=_MED_P))
+    n = {"21": (3, 8), "28": (2, 5), "71": (1, 4), "11": (8, 16), "01": (15, 19)}[cl_cd]
+    return list(rng.choice(_MED_CODES[1:], int(rng.integers(*n, endpoint=True)), replace=False))
+
+
+def build_hospitals(rng: np.random.Generator, dongs: pd.DataFrame,
+                    dong_pop: np.ndarray) -> tuple[pd.DataFrame, pd.DataFrame]:
+    counts = rng.poisson(dong_pop / _POP_PER_HOSPITAL)
+    idx = np.repeat(np.arange(len(dongs)), counts)
+    n = len(idx)
+    d = dongs.iloc[idx].reset_index(drop=True)
+
+    cl_codes = list(CLINIC_TYPES)
+    cl_p = np.array([v[1] for v in CLINIC_TYPES.values()])
+    cl = rng.choice(cl_codes, n, p=cl_p / cl_p.sum())
+    cl_nm = pd.Series(cl).map({k: v[0] for k, v in CLINIC_TYPES.items()})
+    lo = np.array([CLINIC_TYPES[c][2][0] for c in cl])
+    hi = np.array([CLINIC_TYPES[c][2][1] for c in cl])
+    dr_tot = rng.integers(lo, hi, endpoint=True)
+
+    # 행정동 사각형 내부 (경계에서 2% 안쪽)
+    fx, fy = rng.uniform(0.02, 0.98, n), rng.uniform(0.02, 0.98, n)
+    x = d["x0"].values + (d["x1"].values - d["x0"].values) * fx
+    y = d["y0"].values + (d["y1"].values - d["y0"].values) * fy
+    x_pos = pd.Series(np.round(x, 7).astype(str))
+    y_pos = pd.Series(np.round(y, 7).astype(str))
+    missing = rng.random(n) < _MISSING_XY_RATE
+    x_pos[missing], y_pos[missing] = None, None
+
+    days = rng.integers(0, (pd.Timestamp("2025-12-31") - pd.Timestamp("1980-01-01")).days, n)
+    estb = (pd.Timestamp("1980-01-01") + pd.to_timedelta(days, unit="D")).strftime("%Y%m%d")
+
+    seq = pd.Series(np.arange(n))
+    road = rng.integers(1, 40, n).astype(str)
+    bldg = rng.integers(1, 300, n).astype(str)
+    addr = d["sido_nm"] + " " + d["sgg_nm"] + " 합성로" + road + " " + bldg + " (" + d["dong_nm"] + ")"
+
+    info = pd.DataFrame({
+        "ykiho": "SYN" + seq.map("{:08d}".format),
+        "hosp_nm": d["dong_nm"] + cl_nm + seq.astype(str),
+        "cl_cd": cl, "cl_cd_nm": cl_nm,
+        "sido_cd": d["hira_sido_cd"], "sigungu_cd": d["hira_sgg_cd"],
+        "emdong_nm": d["dong_nm"], "addr": addr,
+        "estb_dd": estb, "dr_tot_cnt": dr_tot.astype(str),
+        "x_pos": x_pos, "y_pos": y_pos,
+    })
+    info["sgg_nm"] = info["addr"].str.split().str[1]  # create_local_db.py 와 동일 규칙
+
+    spec_rows = []
+    for ykiho, c, tot in zip(info["ykiho"], cl, dr_tot):
+        codes = _specialties_for(rng, c)
+        # 과목별 전문의수: 첫 과목에 몰리고 나머지는 0~1명 (일반의 "00" 은 0명)
+        dr = [int(tot) if i == 0 else int(rng.integers(0, 2)) for i in range(len(codes))]
+        for code, cnt in zip(codes, dr):
+            nm = "일반의" if code == "00" else SPECIALTY_CODES[code]
+            spec_rows.append((ykiho, code, nm, str(0 if code == "00" else cnt)))
+    spec = pd.DataFrame(spec_rows, columns=["ykiho", "dgsbjt_cd", "dgsbjt_cd_nm", "dr_cnt"])
+    return info, spec
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 4. 법정동 코드 매핑 · 아파트 평당가
+# ─────────────────────────────────────────────────────────────────────────────
+def build_code_mapping(rng: np.random.Generator, dongs: pd.DataFrame) -> pd.DataFrame:
+    """행정동 1곳당 법정동 1~3개, 일부 법정동은 이웃 행정동과 공유 (실데이터의 N:M 관계)"""
+    rows = []
+    prev = None
+    for r in dongs.itertuples():
+        n_bjd = int(rng.integers(1, 3, endpoint=True))
+        base = int(r.adm_cd[5:8])
+        for b in range(n_bjd):
+            bjd_cd = f"{r.sgg_cd}{base + b:03d}00"
+            rows.append((r.adm_cd, r.sido_nm, r.sgg_nm, r.dong_nm, bjd_cd, f"{r.dong_nm[:-1]}{b + 1}가"))
+        if prev is not None and prev.sgg_cd == r.sgg_cd and rng.random() < 0.1:
+            shared = f"{prev.sgg_cd}{int(prev.adm_cd[5:8]):03d}00"
+            rows.append((r.adm_cd, r.sido_nm, r.sgg_nm, r.dong_nm, shared, f"{prev.dong_nm[:-1]}1가"))
+        prev = r
+    return pd.DataFrame(rows, columns=["hjd_cd", "sido_nm", "sigungu_nm", "dong_nm", "bjd_cd", "bjd_nm"])
+
+
+def build_apt_prices(rng: np.random.Generator, mapping: pd.DataFrame,
+                     dongs: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """법정동 70% 에 월별 거래 생성 → 스케치 + 법정동 집계 (import_apt_price.py 4~5단계와 같은 형식)"""
+    price_by_hjd = dict(zip(dongs["adm_cd"], dongs["price_median"]))
+    bjd = mapping.drop_duplicates("bjd_cd")[["bjd_cd", "hjd_cd"]]
+    bjd = bjd[rng.random(len(bjd)) < 0.7]
+    months = pd.period_range(end=pd.Period(_APT_END_YM, freq="M"), periods=_APT_MONTHS, freq="M").strftime("%Y%m")
+
+    # 법정동 × 월 거래 건수 → 거래 1건 = 1행 (법정동 중심가격 주변 로그정규)
+    center = bjd["hjd_cd"].map(price_by_hjd).to_numpy() * rng.lognormal(0.0, 0.25, len(bjd))
+    counts = rng.poisson(4, (len(bjd), len(months)))
+    cell = np.flatnonzero(counts)
+    reps = counts.ravel()[cell]
+    b_idx = np.repeat(cell // len(months), reps)
+    trades = pd.DataFrame({
+        "bjd_cd": bjd["bjd_cd"].to_numpy()[b_idx],
+        "ym": np.asarray(months)[np.repeat(cell % len(months), reps)],
+        "price_per_pyeong": np.round(rng.lognormal(np.log(center[b_idx]), 0.2), 1),
+    })
+
+    sketch = (
+        trades.groupby(["bjd_cd", "ym"])["price_per_pyeong"]
+        .agg(trade_count="count", price_sum="sum")
+        .reset_index()
+    )
+    # encode_sketch 와 같은 "구간:건수" 문자열 — 법정동·월마다 호출하지 않고 한 번에 집계
+    trades["bin"] = bin_index(trades["price_per_pyeong"])
+    bins = trades.groupby(["bjd_cd", "ym", "bin"]).size().reset_index(name="n")
+    bins["tok"] = bins["bin"].astype(str) + ":" + bins["n"].astype(str)
+    tokens = bins.groupby(["bjd_cd", "ym"])["tok"].agg(",".join).rename("sketch").reset_index()
+    sketch = sketch.merge(tokens, on=["bjd_cd", "ym"], how="left")
+    agg = (
+        trades.groupby("bjd_cd")["price_per_pyeong"]
+        .agg(avg_price_per_pyeong="mean", med_price_per_pyeong="median", trade_count="count")
+        .reset_index()
+    )
+    agg["avg_price_per_pyeong"] = agg["avg_price_per_pyeong"].round(0).astype(int)
+    agg["med_price_per_pyeong"] = agg["med_price_per_pyeong"].round(0).astype(int)
+    agg["base_ym_from"] = months[0]
+    agg["base_ym_to"] = months[-1]
+    return agg, sketch
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 5. 행정동 경계 GeoJSON
+# ─────────────────────────────────────────────────────────────────────────────
+def write_geojson(dongs: pd.DataFrame, path: Path, vertices: int) -> int:
+    """download_national_geojson.py 출력과 같은 속성(adm_cd2, adm_nm) — Feature 단위로 기록"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".part")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write('{"type": "FeatureCollection", "features": [\n')
+        for i, r in enumerate(dongs.itertuples()):
+            feature = {
+                "type": "Feature",
+                "properties": {"adm_cd2": legacy_geo_code(r.adm_cd), "adm_nm": r.adm_nm},
+                "geometry": {"type": "MultiPolygon",
+                             "coordinates": [[_rect_ring(r.x0, r.y0, r.x1, r.y1, vertices)]]},
+            }
+            f.write(("," if i else "") + json.dumps(feature, ensure_ascii=False) + "\n")
+        f.write("]}\n")
+    os.replace(tmp, path)
+    return len(dongs)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+def generate(out_dir: Path | None = None, seed: int = DEFAULT_SEED, scale: float = 1.0,
+             sido_names: list[str] | None = None, vertices: int = 8,
+             geojson_path: Path | None = None, force: bool = False) -> tuple[Path, Path]:
+    out_dir = Path(out_dir) if out_dir else default_out_dir(scale, seed)
+    db_path = out_dir / "saturation.db"
+    geojson_path = Path(geojson_path) if geojson_path else out_dir / "geojson" / "national_dong.geojson"
+    existing = [str(p) for p in (db_path, geojson_path) if p.exists()]
+    if existing and not force:
+        raise FileExistsError(f"{', '.join(existing)} 가 이미 있습니다 (덮어쓰려면 --force)")
+
+    rng = np.random.default_rng(seed)
+    print(f"[{'=' * 40}]")
+    print(f"합성 데이터셋 생성: seed={seed}, scale={scale}")
+    print(f"[{'=' * 40}]")
+
+    print("\n1. 행정구역 격자 생성 중...")
+    dongs = build_regions(rng, scale, sido_names)
+    print(f" - 시도 {dongs['sido_nm'].nunique()}개 / 시군구 {dongs['sgg_cd'].nunique()}개 / 행정동 {len(dongs):,}개")
+
+    print("\n2. 인구 데이터 생성 중...")
+    house, age = build_population(rng, dongs)
+    dong_pop = house.set_index("adm_cd").loc[dongs["adm_cd"], "total_pop"].to_numpy()
+    print(f" - {len(house):,}행 (총인구 {int(dong_pop.sum()):,}명)")
+
+    print("\n3. 병의원·진료과목 생성 중...")
+    info, spec = build_hospitals(rng, dongs, dong_pop)
+    print(f" - 병의원 {len(info):,}곳 / 진료과목 {len(spec):,}행")
+
+    print("\n4. 법정동 매핑·아파트 평당가 생성 중...")
+    mapping = build_code_mapping(rng, dongs)
+    apt_bjd, apt_sketch = build_apt_prices(rng, mapping, dongs)
+    print(f" - 매핑 {len(mapping):,}행 / 평당가 법정동 {len(apt_bjd):,}개 / 스케치 {len(apt_sketch):,}개")
+
+    print(f"\n5. DB 저장: {db_path}")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tmp_db = db_path.with_name(db_path.name + ".building")
+    tmp_db.unlink(missing_ok=True)
+    conn = sqlite3.connect(tmp_db)
+    try:
+        mapping.to_sql("region_code_mapping", conn, index=False)
+        age.to_sql("population_age", conn, index=False)
+        house.to_sql("population_house", conn, index=False)
+        info.to_sql("hospital_info", conn, index=False)
+        spec.to_sql("hospital_specialty", conn, index=False)
+        build_region_crosswalk(conn).to_sql("region_crosswalk", conn, index=False)
+        apt_bjd.to_sql("apt_price_bjd", conn, index=False)
+        apt_sketch.to_sql("apt_price_sketch", conn, index=False)
+        for name, table, col in _BASE_INDEXES:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table}({col})")
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_db, db_path)
+
+    print(f"\n6. 행정동 경계 저장: {geojson_path}")
+    write_geojson(dongs, geojson_path, vertices)
+
+    print(f"\n[OK] {db_path.stat().st_size / 1024 / 1024:.1f} MB, "
+          f"경계 {geojson_path.stat().st_size / 1024 / 1024:.1f} MB")
+    return db_path, geojson_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="합성 전국 데이터셋 생성 (벤치마크·부하 테스트용)")
+    parser.add_argument("--out", type=Path, default=None,
+                        help="출력 디렉터리 (saturation.db, geojson/national_dong.geojson) "
+                             "— 기본 data/bench/synthetic_s<scale>_seed<seed>")
+    parser.add_argument("--geojson", type=Path, default=None, help="경계 파일 경로 (기본: <out>/geojson/national_dong.geojson)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help=f"난수 시드 (기본 {DEFAULT_SEED})")
+    parser.add_argument("--scale", type=float, default=1.0, help="시군구 수 배율 (1.0 = 전국 규모, 약 230개 시군구)")
+    parser.add_argument("--sido", nargs="*", default=None, help="생성할 시도명 (기본: 전체 17개)")
+    parser.add_argument("--vertices", type=int, default=8, help="경계 사각형 변당 꼭짓점 수 (기본 8)")
+    parser.add_argument("--force", action="store_true", help="기존 saturation.db·경계 파일 덮어쓰기")
+    args = parser.parse_args()
+
+    unknown = set(args.sido or []) - set(SIDO_CODES)
+    if unknown:
+        parser.error(f"알 수 없는 시도명: {', '.join(sorted(unknown))}")
+    try:
+        generate(args.out, args.seed, args.scale, args.sido, args.vertices, args.geojson, args.force)
+    except FileExistsError as e:
+        print(f"오류: {e}")
+        sys.exit(1)
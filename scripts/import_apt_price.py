@@ -3,14 +3,18 @@
 법정동별 평균/중위 평당가 테이블(apt_price_bjd)을 saturation.db에 저장합니다.
 
 데이터 출처 : DB_data/아파트 실거래가/*.xlsx  (국토교통부 실거래가 공개시스템)
-저장 테이블 : apt_price_bjd  (bjd_cd, avg_price_per_pyeong, med_price_per_pyeong,
-                               trade_count, base_ym_from, base_ym_to)
+저장 테이블 : apt_price_bjd     (bjd_cd, avg_price_per_pyeong, med_price_per_pyeong,
+                                  trade_count, base_ym_from, base_ym_to)
+              apt_price_sketch  (bjd_cd, ym, trade_count, price_sum, sketch)
+                                 — 법정동·월별 병합 가능한 평당가 분위수 스케치
+                                   (modules/price_sketch.py 참조)
 
 실행 방법:
     python scripts/import_apt_price.py
 """
 
 import sqlite3
+import sys
 import warnings
 from pathlib import Path
 
@@ -19,6 +23,10 @@ import pandas as pd
 warnings.simplefilter(action='ignore')
 
 BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from modules.price_sketch import encode_sketch  # noqa: E402
+
 DB_PATH  = BASE_DIR / 'data' / 'saturation.db'
 APT_DIR  = BASE_DIR / 'DB_data' / '아파트 실거래가'
 
@@ -240,11 +248,22 @@ def main():
 
     print(f"  집계 법정동 수: {len(agg):,}개  (기간: {base_ym_from} ~ {base_ym_to})")
 
+    # 법정동·월별 분위수 스케치 (상위 레벨 중위값/분위수 산출용)
+    sketch = (
+        apt_valid.groupby(['bjd_cd', '계약년월'])['price_per_pyeong']
+        .agg(trade_count='count', price_sum='sum', sketch=encode_sketch)
+        .reset_index()
+        .rename(columns={'계약년월': 'ym'})
+    )
+    print(f"  분위수 스케치: {len(sketch):,}개 (법정동 × 월)")
+
     # ── 5. DB 저장 ────────────────────────────────────────────────────────────
-    print("\n5. saturation.db → apt_price_bjd 저장 ...")
+    print("\n5. saturation.db → apt_price_bjd / apt_price_sketch 저장 ...")
     agg.to_sql('apt_price_bjd', conn, if_exists='replace', index=False)
+    sketch.to_sql('apt_price_sketch', conn, if_exists='replace', index=False)
     cur = conn.cursor()
     cur.execute("CREATE INDEX IF NOT EXISTS idx_apt_bjd_cd ON apt_price_bjd(bjd_cd)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_apt_sketch_bjd_cd ON apt_price_sketch(bjd_cd)")
     conn.commit()
     conn.close()
 
@@ -112,6 +112,8 @@ def update_hospital_data():
         keep_cols = [c for c in hosp_cols.keys() if c in df_new.columns]
         df_new = df_new[keep_cols]
         df_new.rename(columns=hosp_cols, inplace=True)
+        if 'addr' in df_new.columns:
+            df_new['sgg_nm'] = df_new['addr'].str.split().str[1]  # create_local_db.py와 동일한 파생 컬럼
         
         # SQLite Upsert 로직 (간소화: 기존 테이블 읽어서 ykiho 기준으로 병합 후 덮어쓰기)
         print(" - 수집 완료. 로컬 DB 병합 중...")